@@ -3,8 +3,14 @@ from django.contrib.auth.admin import UserAdmin
 from import_export.admin import ImportExportModelAdmin
 
 from apps.authentification.models import (
+    ApplicationDailyRollup,
+    ApplicationStatusTransition,
+    IdempotencyKey,
+    MatchTerm,
+    MediaBlob,
     LevelEducation,
     ResumeUser,
+    SavedSearch,
     HrCompany,
     Favourites,
     Countries,
@@ -87,6 +93,36 @@ class JobTypeAdmin(ImportExportModelAdmin, admin.ModelAdmin):
     list_display = ['id', 'type']
 
 
+class ApplicationDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['id', 'day', 'category', 'company', 'status', 'count']
+    list_filter = ['status']
+
+
+class ApplicationStatusTransitionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'job_apply', 'from_status', 'to_status', 'changed_by', 'created_at']
+    list_filter = ['to_status']
+
+
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'key', 'route', 'status_code', 'created_at', 'expires_at']
+    search_fields = ['key', 'route']
+
+
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'size', 'refcount', 'created_at', 'released_at']
+    search_fields = ['sha256', 'name']
+
+
+class MatchTermAdmin(admin.ModelAdmin):
+    list_display = ['id', 'term', 'resumes', 'vacancies']
+    search_fields = ['term']
+
+
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'name', 'job_category', 'country', 'salary_min', 'salary_max', 'keywords', 'is_active']
+    list_filter = ['is_active']
+
+
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(SmsHistory)
 admin.site.register(CompanyReview, CompanyReviewsAdmin)
@@ -101,3 +137,9 @@ admin.site.register(JobApply, JobApplyAdmin)
 admin.site.register(StatusApply, StatusApplyAdmin)
 admin.site.register(NotificationJobs, NotificationJobsAdmin)
 admin.site.register(JobType, JobTypeAdmin)
+admin.site.register(ApplicationDailyRollup, ApplicationDailyRollupAdmin)
+admin.site.register(ApplicationStatusTransition, ApplicationStatusTransitionAdmin)
+admin.site.register(IdempotencyKey, IdempotencyKeyAdmin)
+admin.site.register(MediaBlob, MediaBlobAdmin)
+admin.site.register(MatchTerm, MatchTermAdmin)
+admin.site.register(SavedSearch, SavedSearchAdmin)
@@ -0,0 +1,22 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from services.storage import collect, recount
+
+
+class Command(BaseCommand):
+    help = "Delete stored media blobs that no upload references any more"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recount", action="store_true", help="Rebuild refcounts from the referencing rows first")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--grace", type=int, default=None, help="Seconds a blob stays released before removal")
+        parser.add_argument("--max-batches", type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            changed = recount(options["batch_size"])
+            self.stdout.write(f"Corrected {changed} refcounts")
+        result = collect(options["batch_size"], options["grace"], options["max_batches"])
+        self.stdout.write(json.dumps(result))
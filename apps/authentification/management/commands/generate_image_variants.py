@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.authentification.models import HrCompany
+from apps.chat.models import Message
+from services.images import refresh_variants
+
+FIELDS = {
+    "avatar": lambda: get_user_model(),
+    "logo": lambda: HrCompany,
+    "attachment": lambda: Message,
+}
+
+
+class Command(BaseCommand):
+    help = "Render thumbnails for existing avatars, company logos and chat image attachments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--field", choices=sorted(FIELDS), action="append", help="Defaults to every field")
+        parser.add_argument("--force", action="store_true", help="Render again even when variants exist")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        for field_name in options["field"] or FIELDS:
+            model = FIELDS[field_name]()
+            queryset = model.objects.exclude(**{f"{field_name}__isnull": True}).exclude(**{field_name: ""})
+            if not options["force"]:
+                queryset = queryset.filter(**{f"{field_name}_variants": {}})
+
+            rendered = skipped = 0
+            last_id = 0
+            while True:
+                batch = list(queryset.filter(pk__gt=last_id).order_by("pk")[:options["batch_size"]])
+                if not batch:
+                    break
+                for instance in batch:
+                    try:
+                        variants = refresh_variants(instance, field_name)
+                    except (FileNotFoundError, OSError) as error:
+                        self.stderr.write(f"{model.__name__} {instance.pk}: {error}")
+                        variants = None
+                    if variants:
+                        rendered += 1
+                    else:
+                        skipped += 1
+                last_id = batch[-1].pk
+            self.stdout.write(f"{field_name}: rendered {rendered}, skipped {skipped}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from services.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Delete stored Idempotency-Key responses past IDEMPOTENCY_TTL"
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+        self.stdout.write(f"Deleted {deleted} expired idempotency keys")
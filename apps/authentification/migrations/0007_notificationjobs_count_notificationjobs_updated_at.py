@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0006_notificationjobs_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationjobs',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='notificationjobs',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:53
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0007_notificationjobs_count_notificationjobs_updated_at'),
+    ]
+
+    operations = [
+        # Existing codes keep a NULL timestamp instead of the migration time
+        migrations.AddField(
+            model_name='smshistory',
+            name='created_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='smshistory',
+            name='created_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='notificationjobs',
+            index=models.Index(condition=models.Q(('is_seen', False)), fields=['user', 'jobs_status'], name='job_notification_unseen_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:55
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_rollups(apps, schema_editor):
+    JobApply = apps.get_model('authentification', 'JobApply')
+    ApplicationDailyRollup = apps.get_model('authentification', 'ApplicationDailyRollup')
+    ApplicationDailyRollup.objects.bulk_create(
+        [
+            ApplicationDailyRollup(
+                day=row['created_at'],
+                category_id=row['jobs__job_category'],
+                company_id=row['jobs__company'],
+                status_id=row['jobs_status'],
+                count=row['number'],
+            )
+            for row in JobApply.objects.values(
+                'created_at', 'jobs__job_category', 'jobs__company', 'jobs_status'
+            ).annotate(number=Count('id')).order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0008_smshistory_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='authentification.jobcategories')),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='authentification.hrcompany')),
+                ('status', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='authentification.statusapply')),
+            ],
+            options={
+                'verbose_name': 'Application Daily Rollup',
+                'verbose_name_plural': 'Application Daily Rollup',
+                'db_table': 'table_application_daily_rollup',
+                'indexes': [models.Index(fields=['category', 'day'], name='rollup_category_day_idx'), models.Index(fields=['company', 'day'], name='rollup_company_day_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='applicationdailyrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'category', 'company', 'status'), name='unique_application_daily_rollup'),
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
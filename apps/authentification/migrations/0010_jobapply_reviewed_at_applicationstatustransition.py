@@ -0,0 +1,77 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:57
+
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max, Min
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def midnight(day):
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def fill_transitions(apps, schema_editor):
+    # Only dates are known for existing applications: the application day and
+    # the day of the first accept/reject notification.
+    JobApply = apps.get_model('authentification', 'JobApply')
+    NotificationJobs = apps.get_model('authentification', 'NotificationJobs')
+    ApplicationStatusTransition = apps.get_model('authentification', 'ApplicationStatusTransition')
+
+    decisions = {
+        row['job_apply']: row
+        for row in NotificationJobs.objects.filter(jobs_status__in=(2, 3), job_apply__isnull=False)
+        .values('job_apply')
+        .annotate(decided_on=Min('created_at'), to_status=Max('jobs_status'))
+        .order_by()
+    }
+
+    transitions = []
+    for job_apply in JobApply.objects.values('id', 'created_at', 'jobs_status').iterator():
+        transitions.append(ApplicationStatusTransition(
+            job_apply_id=job_apply['id'], to_status_id=1, created_at=midnight(job_apply['created_at'])
+        ))
+        decision = decisions.get(job_apply['id'])
+        if decision and decision['decided_on'] and job_apply['jobs_status'] in (2, 3):
+            transitions.append(ApplicationStatusTransition(
+                job_apply_id=job_apply['id'],
+                from_status_id=1,
+                to_status_id=job_apply['jobs_status'],
+                created_at=midnight(decision['decided_on']),
+            ))
+    ApplicationStatusTransition.objects.bulk_create(transitions, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0009_applicationdailyrollup_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapply',
+            name='reviewed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ApplicationStatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_transitions', to=settings.AUTH_USER_MODEL)),
+                ('from_status', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transitions_from', to='authentification.statusapply')),
+                ('job_apply', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='authentification.jobapply')),
+                ('to_status', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transitions_to', to='authentification.statusapply')),
+            ],
+            options={
+                'verbose_name': 'Application Status Transition',
+                'verbose_name_plural': 'Application Status Transition',
+                'db_table': 'table_application_status_transition',
+                'indexes': [models.Index(fields=['job_apply', 'created_at'], name='transition_apply_created_idx')],
+            },
+        ),
+        migrations.RunPython(fill_transitions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0010_jobapply_reviewed_at_applicationstatustransition'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobapply',
+            index=models.Index(fields=['resume', 'jobs_status', 'created_at'], name='job_apply_resume_status_idx'),
+        ),
+    ]
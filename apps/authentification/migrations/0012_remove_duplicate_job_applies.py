@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:10
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def remove_duplicate_applies(apps, schema_editor):
+    # Keep the first application of every (user, jobs, resume); the rollups
+    # counted the duplicates, so they are rebuilt when anything was removed.
+    JobApply = apps.get_model('authentification', 'JobApply')
+    ApplicationDailyRollup = apps.get_model('authentification', 'ApplicationDailyRollup')
+
+    duplicates = (
+        JobApply.objects.filter(user__isnull=False, jobs__isnull=False, resume__isnull=False)
+        .values('user', 'jobs', 'resume')
+        .annotate(first=Min('id'), number=Count('id'))
+        .filter(number__gt=1)
+        .order_by()
+    )
+    removed = 0
+    for row in duplicates.iterator():
+        removed += JobApply.objects.filter(
+            user=row['user'], jobs=row['jobs'], resume=row['resume']
+        ).exclude(id=row['first']).delete()[1].get('authentification.JobApply', 0)
+
+    if removed:
+        ApplicationDailyRollup.objects.all().delete()
+        ApplicationDailyRollup.objects.bulk_create(
+            [
+                ApplicationDailyRollup(
+                    day=row['created_at'],
+                    category_id=row['jobs__job_category'],
+                    company_id=row['jobs__company'],
+                    status_id=row['jobs_status'],
+                    count=row['number'],
+                )
+                for row in JobApply.objects.values(
+                    'created_at', 'jobs__job_category', 'jobs__company', 'jobs_status'
+                ).annotate(number=Count('id')).order_by()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0011_jobapply_job_apply_resume_status_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_applies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0012_remove_duplicate_job_applies'),
+    ]
+
+    operations = [
+        # Kept apart from the cleanup: Postgres refuses ALTER TABLE while the
+        # deletes above still have deferred FK checks pending.
+        migrations.AddConstraint(
+            model_name='jobapply',
+            constraint=models.UniqueConstraint(fields=('user', 'jobs', 'resume'), name='unique_job_apply'),
+        ),
+    ]
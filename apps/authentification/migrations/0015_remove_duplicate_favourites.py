@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:30
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def remove_duplicate_favourites(apps, schema_editor):
+    Favourites = apps.get_model('authentification', 'Favourites')
+    duplicates = (
+        Favourites.objects.filter(user__isnull=False, jobs__isnull=False)
+        .values('user', 'jobs')
+        .annotate(first=Min('id'), number=Count('id'))
+        .filter(number__gt=1)
+        .order_by()
+    )
+    for row in duplicates.iterator():
+        Favourites.objects.filter(user=row['user'], jobs=row['jobs']).exclude(id=row['first']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0014_idempotencykey_idempotencykey_unique_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_favourites, migrations.RunPython.noop),
+    ]
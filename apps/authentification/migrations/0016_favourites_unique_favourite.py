@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0015_remove_duplicate_favourites'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='favourites',
+            constraint=models.UniqueConstraint(fields=('user', 'jobs'), name='unique_favourite'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:06
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    HrCompany = apps.get_model('authentification', 'HrCompany')
+    parents = dict(HrCompany.objects.values_list('id', 'sub_company'))
+    paths = {}
+
+    def path_of(company_id):
+        chain = []
+        while company_id is not None and company_id not in paths and company_id not in chain:
+            chain.append(company_id)
+            company_id = parents.get(company_id)
+        # A loop in existing data is cut at the first repeated company
+        prefix = paths.get(company_id, "/")
+        for link in reversed(chain):
+            prefix = paths[link] = f"{prefix}{link}/"
+        return paths[chain[0]] if chain else paths[company_id]
+
+    companies = list(HrCompany.objects.only('id'))
+    for company in companies:
+        company.path = path_of(company.id)
+    HrCompany.objects.bulk_update(companies, ['path'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0016_favourites_unique_favourite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hrcompany',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='hrcompany',
+            index=models.Index(fields=['path'], name='company_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:12
+
+from django.db import migrations, models
+
+
+def variant_names(variants):
+    return [name for names in (variants or {}).values() for name in names.values()]
+
+
+def mark_attachments_private(apps, schema_editor):
+    # Blobs that so far only back chat attachments stay private; anything also
+    # used as an avatar or logo is public already
+    MediaBlob = apps.get_model('authentification', 'MediaBlob')
+    Message = apps.get_model('chat', 'Message')
+    CustomUser = apps.get_model('authentification', 'CustomUser')
+    HrCompany = apps.get_model('authentification', 'HrCompany')
+
+    private = set()
+    for name, variants in Message.objects.exclude(attachment='').exclude(attachment__isnull=True).values_list('attachment', 'attachment_variants'):
+        private.add(name)
+        private.update(variant_names(variants))
+
+    public = set()
+    for model, field_name in ((CustomUser, 'avatar'), (HrCompany, 'logo')):
+        for name, variants in model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True}).values_list(field_name, f'{field_name}_variants'):
+            public.add(name)
+            public.update(variant_names(variants))
+
+    names = list(private - public)
+    for start in range(0, len(names), 1000):
+        MediaBlob.objects.filter(name__in=names[start:start + 1000]).update(private=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0019_mediablob'),
+        ('chat', '0002_message_attachment_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediablob',
+            name='private',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_attachments_private, migrations.RunPython.noop),
+    ]
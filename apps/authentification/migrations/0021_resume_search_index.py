@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:14
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0020_mediablob_private'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeuser',
+            name='education_level',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumeuser',
+            name='experience_years',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumeuser',
+            name='latest_position',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumeuser',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='resumeuser',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='resume_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumeuser',
+            index=models.Index(fields=['job_tag', 'experience_years'], name='resume_tag_experience_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumeuser',
+            index=models.Index(fields=['experience_years'], name='resume_experience_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumeuser',
+            index=models.Index(fields=['education_level'], name='resume_education_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0021_resume_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, unique=True)),
+                ('resumes', models.IntegerField(default=0)),
+                ('vacancies', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Match Term',
+                'verbose_name_plural': 'Match Terms',
+                'db_table': 'table_match_term',
+            },
+        ),
+        migrations.AddField(
+            model_name='jobvacancies',
+            name='match_vector',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumeuser',
+            name='match_vector',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0022_match_vectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VacancyNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentification.jobvacancies')),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='authentification.jobvacancies')),
+            ],
+            options={
+                'verbose_name': 'Vacancy Neighbor',
+                'verbose_name_plural': 'Vacancy Neighbors',
+                'db_table': 'table_vacancy_neighbor',
+                'indexes': [models.Index(fields=['vacancy', '-score'], name='vacancy_neighbor_score_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='vacancyneighbor',
+            constraint=models.UniqueConstraint(fields=('vacancy', 'neighbor'), name='unique_vacancy_neighbor'),
+        ),
+    ]
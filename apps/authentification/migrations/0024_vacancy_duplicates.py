@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0023_vacancy_neighbors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobvacancies',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='authentification.jobvacancies'),
+        ),
+        migrations.AddField(
+            model_name='jobvacancies',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='VacancyBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.SmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='authentification.jobvacancies')),
+            ],
+            options={
+                'verbose_name': 'Vacancy Band',
+                'verbose_name_plural': 'Vacancy Bands',
+                'db_table': 'table_vacancy_band',
+                'indexes': [models.Index(fields=['band', 'bucket'], name='vacancy_band_bucket_idx')],
+            },
+        ),
+    ]
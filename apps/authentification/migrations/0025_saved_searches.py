@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0024_vacancy_duplicates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=255, null=True)),
+                ('salary_min', models.FloatField(blank=True, null=True)),
+                ('salary_max', models.FloatField(blank=True, null=True)),
+                ('keywords', models.CharField(blank=True, max_length=255, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('predicates', models.PositiveSmallIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('country', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='authentification.countries')),
+                ('job_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='authentification.jobcategories')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Saved Search',
+                'verbose_name_plural': 'Saved Searches',
+                'db_table': 'table_saved_search',
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_seen', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('saved_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='authentification.savedsearch')),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='authentification.jobvacancies')),
+            ],
+            options={
+                'verbose_name': 'Saved Search Match',
+                'verbose_name_plural': 'Saved Search Matches',
+                'db_table': 'table_saved_search_match',
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=16)),
+                ('value', models.CharField(max_length=64)),
+                ('saved_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='authentification.savedsearch')),
+            ],
+            options={
+                'verbose_name': 'Saved Search Term',
+                'verbose_name_plural': 'Saved Search Terms',
+                'db_table': 'table_saved_search_term',
+                'indexes': [models.Index(fields=['kind', 'value'], name='saved_search_term_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='savedsearchterm',
+            constraint=models.UniqueConstraint(fields=('saved_search', 'kind', 'value'), name='unique_saved_search_term'),
+        ),
+        migrations.AddConstraint(
+            model_name='savedsearchmatch',
+            constraint=models.UniqueConstraint(fields=('saved_search', 'vacancy'), name='unique_saved_search_match'),
+        ),
+    ]
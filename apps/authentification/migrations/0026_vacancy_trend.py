@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0025_saved_searches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VacancyTrend',
+            fields=[
+                ('vacancy', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trend', serialize=False, to='authentification.jobvacancies')),
+                ('score', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Vacancy Trend',
+                'verbose_name_plural': 'Vacancy Trends',
+                'db_table': 'table_vacancy_trend',
+                'indexes': [models.Index(fields=['-score'], name='vacancy_trend_score_idx')],
+            },
+        ),
+    ]
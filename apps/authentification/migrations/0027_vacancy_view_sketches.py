@@ -0,0 +1,116 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:43
+
+import hashlib
+import math
+
+from django.db import migrations, models
+import django.db.models.deletion
+import numpy as np
+
+# services.hyperloglog as of this migration, frozen so the stored sketches
+# keep the encoding they were written with whatever that module becomes
+PRECISION = 11
+REGISTERS = 1 << PRECISION
+HASH_BITS = 64
+SPARSE = 0
+DENSE = 1
+SPARSE_ENTRY = np.dtype([("register", "<u2"), ("rank", "u1")])
+
+
+def empty():
+    return np.zeros(REGISTERS, dtype=np.uint8)
+
+
+def add(registers, item):
+    value = int.from_bytes(hashlib.blake2b(str(item).encode(), digest_size=8).digest(), "big")
+    rest_bits = HASH_BITS - PRECISION
+    rest = value & ((1 << rest_bits) - 1)
+    register, rank = value >> rest_bits, rest_bits - rest.bit_length() + 1
+    registers[register] = max(registers[register], rank)
+
+
+def encode(registers):
+    nonzero = np.flatnonzero(registers)
+    if len(nonzero) * SPARSE_ENTRY.itemsize < REGISTERS:
+        entries = np.empty(len(nonzero), dtype=SPARSE_ENTRY)
+        entries["register"] = nonzero
+        entries["rank"] = registers[nonzero]
+        return bytes([SPARSE]) + entries.tobytes()
+    return bytes([DENSE]) + registers.astype(np.uint8).tobytes()
+
+
+def estimate(registers):
+    alpha = 0.7213 / (1 + 1.079 / REGISTERS)
+    raw = alpha * REGISTERS * REGISTERS / float(np.sum(np.power(2.0, -registers.astype(np.float64))))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * REGISTERS and zeros:
+        return round(REGISTERS * math.log(REGISTERS / zeros))
+    return round(raw)
+
+
+def fold_viewers(apps, schema_editor):
+    # The per-user rows carry no date, so they only make up the all-time sketches
+    JobVacancies = apps.get_model('authentification', 'JobVacancies')
+    VacancyViewSketch = apps.get_model('authentification', 'VacancyViewSketch')
+
+    def sketch(kind, vacancy_id, registers):
+        return VacancyViewSketch(
+            vacancy_id=vacancy_id,
+            kind=kind,
+            day=None,
+            sketch=encode(registers),
+            estimate=estimate(registers),
+        )
+
+    for kind, field in (('seen', 'is_seen'), ('looked', 'is_look_user')):
+        through = getattr(JobVacancies, field).through
+        # Ordered by vacancy, so only one sketch is open at a time
+        rows = through.objects.order_by('jobvacancies_id').values_list('jobvacancies_id', 'customuser_id')
+        batch, current, registers = [], None, None
+        for vacancy_id, user_id in rows.iterator(chunk_size=5000):
+            if vacancy_id != current:
+                if current is not None:
+                    batch.append(sketch(kind, current, registers))
+                current, registers = vacancy_id, empty()
+                if len(batch) >= 1000:
+                    VacancyViewSketch.objects.bulk_create(batch)
+                    batch = []
+            add(registers, user_id)
+        if current is not None:
+            batch.append(sketch(kind, current, registers))
+        VacancyViewSketch.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0026_vacancy_trend'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VacancyViewSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('seen', 'seen'), ('looked', 'looked')], max_length=8)),
+                ('day', models.DateField(blank=True, null=True)),
+                ('sketch', models.BinaryField(default=bytes)),
+                ('estimate', models.IntegerField(default=0)),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_sketches', to='authentification.jobvacancies')),
+            ],
+            options={
+                'verbose_name': 'Vacancy View Sketch',
+                'verbose_name_plural': 'Vacancy View Sketches',
+                'db_table': 'table_vacancy_view_sketch',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='vacancyviewsketch',
+            constraint=models.UniqueConstraint(fields=('vacancy', 'kind', 'day'), name='unique_vacancy_view_sketch'),
+        ),
+        migrations.AddConstraint(
+            model_name='vacancyviewsketch',
+            constraint=models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('vacancy', 'kind'), name='unique_vacancy_view_total'),
+        ),
+        migrations.RunPython(fold_viewers, migrations.RunPython.noop),
+    ]
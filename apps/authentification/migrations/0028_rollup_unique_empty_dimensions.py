@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:52
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+def merge_duplicates(apps, schema_editor):
+    # Rows with an empty dimension were never unique; fold them into the oldest
+    ApplicationDailyRollup = apps.get_model('authentification', 'ApplicationDailyRollup')
+    kept = {}
+    rows = ApplicationDailyRollup.objects.order_by('id').values_list(
+        'id', 'day', 'category_id', 'company_id', 'status_id', 'count'
+    )
+    for row_id, day, category_id, company_id, status_id, count in rows.iterator(chunk_size=5000):
+        key = (day, category_id, company_id, status_id)
+        if key not in kept:
+            kept[key] = [row_id, count, False]
+            continue
+        kept[key][1] += count
+        kept[key][2] = True
+        ApplicationDailyRollup.objects.filter(id=row_id).delete()
+    for row_id, count, merged in kept.values():
+        if merged:
+            ApplicationDailyRollup.objects.filter(id=row_id).update(count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0027_vacancy_view_sketches'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='applicationdailyrollup',
+            name='unique_application_daily_rollup',
+        ),
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='applicationdailyrollup',
+            constraint=models.UniqueConstraint(models.F('day'), django.db.models.functions.comparison.Coalesce('category', 0), django.db.models.functions.comparison.Coalesce('company', 0), django.db.models.functions.comparison.Coalesce('status', 0), name='unique_application_daily_rollup'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:54
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def drop_double_submits(apps, schema_editor):
+    # Repeated resume-less applications to one vacancy; the first one is kept
+    # and, as in 0012, the rollups that counted the others are rebuilt
+    JobApply = apps.get_model('authentification', 'JobApply')
+    ApplicationDailyRollup = apps.get_model('authentification', 'ApplicationDailyRollup')
+
+    doubles = (
+        JobApply.objects.filter(user__isnull=False, jobs__isnull=False, resume__isnull=True)
+        .values('user', 'jobs')
+        .annotate(first=Min('id'), number=Count('id'))
+        .filter(number__gt=1)
+        .order_by()
+    )
+    removed = 0
+    for double in doubles.iterator():
+        removed += JobApply.objects.filter(
+            user=double['user'], jobs=double['jobs'], resume__isnull=True
+        ).exclude(id=double['first']).delete()[1].get('authentification.JobApply', 0)
+
+    if removed:
+        ApplicationDailyRollup.objects.all().delete()
+        ApplicationDailyRollup.objects.bulk_create(
+            [
+                ApplicationDailyRollup(
+                    day=row['created_at'],
+                    category_id=row['jobs__job_category'],
+                    company_id=row['jobs__company'],
+                    status_id=row['jobs_status'],
+                    count=row['number'],
+                )
+                for row in JobApply.objects.values(
+                    'created_at', 'jobs__job_category', 'jobs__company', 'jobs_status'
+                ).annotate(number=Count('id')).order_by()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0028_rollup_unique_empty_dimensions'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_double_submits, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='jobapply',
+            constraint=models.UniqueConstraint(condition=models.Q(('resume__isnull', True)), fields=('user', 'jobs'), name='unique_job_apply_without_resume'),
+        ),
+    ]
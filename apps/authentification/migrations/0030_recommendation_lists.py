@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0029_job_apply_unique_without_resume'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationList',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommendations', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('matches', models.JSONField(default=list)),
+                ('built_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Recommendation List',
+                'verbose_name_plural': 'Recommendation Lists',
+                'db_table': 'table_recommendation_list',
+            },
+        ),
+    ]
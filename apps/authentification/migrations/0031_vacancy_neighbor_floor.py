@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:59
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+# SIMILAR_VACANCIES_SIZE when the lists were built
+LIST_SIZE = 10
+
+
+def fill_floors(apps, schema_editor):
+    JobVacancies = apps.get_model('authentification', 'JobVacancies')
+    VacancyNeighbor = apps.get_model('authentification', 'VacancyNeighbor')
+    lists = (
+        VacancyNeighbor.objects.values('vacancy')
+        .annotate(floor=Min('score'), size=Count('id'))
+        .filter(size__gte=LIST_SIZE)
+        .order_by()
+    )
+    JobVacancies.objects.bulk_update(
+        [JobVacancies(id=row['vacancy'], neighbor_floor=row['floor']) for row in lists.iterator()],
+        ['neighbor_floor'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0030_recommendation_lists'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobvacancies',
+            name='neighbor_floor',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_floors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='jobvacancies',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['match_vector'], name='vacancy_match_vector_idx'),
+        ),
+    ]
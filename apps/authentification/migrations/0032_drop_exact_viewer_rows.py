@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import migrations
+
+FIELDS = {'seen': 'is_seen', 'looked': 'is_look_user'}
+
+
+def drop_rows(apps, schema_editor):
+    # 0027 folded the per-user rows into the all-time sketches; only the kinds
+    # not kept exact by VACANCY_EXACT_VIEWERS lose them
+    kept = set(settings.VACANCY_EXACT_VIEWERS)
+    unknown = kept - FIELDS.keys()
+    if unknown:
+        raise ValueError(
+            f"VACANCY_EXACT_VIEWERS lists {sorted(unknown)}, expected only {sorted(FIELDS)}; "
+            "fix the setting before migrating, the viewer rows of other kinds are deleted"
+        )
+    JobVacancies = apps.get_model('authentification', 'JobVacancies')
+    for kind, field in FIELDS.items():
+        if kind not in kept:
+            getattr(JobVacancies, field).through.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0031_vacancy_neighbor_floor'),
+    ]
+
+    operations = [
+        # No reverse: the dropped rows can't be rebuilt from the sketches
+        migrations.RunPython(drop_rows),
+    ]
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import TextField, Value
+
+BATCH_SIZE = 500
+
+
+# apps.resume.services.search as of 0021, frozen so later changes there can't
+# break this migration. rebuild_resume_search_index recomputes everything with
+# the current code, including the experience and education columns.
+def texts(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from texts(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from texts(item)
+
+
+def document(resume):
+    return {
+        "A": " ".join(filter(None, [resume.position, resume.job_tag.tag if resume.job_tag_id else None])),
+        "B": " ".join(filter(None, [resume.about, resume.content])),
+        "C": " ".join(texts(resume.job_experiences)),
+        "D": " ".join(filter(None, [resume.location, *texts(resume.place_of_study)])),
+    }
+
+
+def vector(parts):
+    combined = None
+    for weight, text in parts.items():
+        part = SearchVector(Value(text, output_field=TextField()), weight=weight, config=settings.RESUME_SEARCH_CONFIG)
+        combined = part if combined is None else combined + part
+    return combined
+
+
+def backfill_search_vectors(apps, schema_editor):
+    ResumeUser = apps.get_model('authentification', 'ResumeUser')
+    last_id = 0
+    while True:
+        resumes = list(
+            ResumeUser.objects.select_related('job_tag')
+            .filter(id__gt=last_id, search_vector__isnull=True)
+            .order_by('id')[:BATCH_SIZE]
+        )
+        if not resumes:
+            return
+        for resume in resumes:
+            ResumeUser.objects.filter(id=resume.id).update(search_vector=vector(document(resume)))
+        last_id = resumes[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0032_drop_exact_viewer_rows'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
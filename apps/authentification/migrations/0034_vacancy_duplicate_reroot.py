@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:16
+
+import apps.authentification.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentification', '0033_backfill_resume_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobvacancies',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=apps.authentification.models.reroot_duplicates, related_name='duplicates', to='authentification.jobvacancies'),
+        ),
+    ]
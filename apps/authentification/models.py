@@ -4,7 +4,12 @@ from django.contrib.auth.models import (
     BaseUserManager,
     PermissionsMixin,
 )
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Concat, Substr
 from django.utils import timezone
 
 
@@ -34,6 +39,7 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     city = models.CharField(max_length=255, null=True, blank=True)
     bio = models.TextField(null=True, blank=True)
     avatar = models.ImageField(upload_to="avatar/", null=True, blank=True)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(default=timezone.now)
@@ -61,6 +67,7 @@ class SmsHistory(models.Model):
         blank=True,
         related_name="smscode",
     )
+    created_at = models.DateTimeField(default=timezone.now, null=True, blank=True)
 
     class Meta:
         db_table = "table_sms_history"
@@ -83,6 +90,7 @@ class Countries(models.Model):
 class HrCompany(models.Model):
     name = models.CharField(max_length=255, null=True, blank=True, unique=True)
     logo = models.ImageField(upload_to="logo/", null=True, blank=True)
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)
     content = models.TextField(null=True, blank=True)
     users = models.ManyToManyField(
         CustomUser, null=True, blank=True, related_name="companyuser"
@@ -108,11 +116,68 @@ class HrCompany(models.Model):
         blank=True,
         related_name="subcompany",
     )
+    # Materialized path of ids from the root company, e.g. "/1/4/9/"; a
+    # subtree is every row whose path starts with the company's own path
+    path = models.CharField(max_length=255, blank=True, default="", editable=False)
 
     class Meta:
         db_table = "table_companies"
         verbose_name = "Company"
         verbose_name_plural = "Companies"
+        indexes = [
+            models.Index(fields=["path"], name="company_path_idx", opclasses=["varchar_pattern_ops"]),
+        ]
+
+    def clean(self):
+        super().clean()
+        if self.id and self.sub_company_id:
+            old_path = HrCompany.objects.filter(id=self.id).values_list("path", flat=True).first()
+            parent_path = HrCompany.objects.filter(id=self.sub_company_id).values_list("path", flat=True).first()
+            if old_path and parent_path and parent_path.startswith(old_path):
+                raise ValidationError({"sub_company": "A company can't be moved under itself or its subsidiaries"})
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or "sub_company" in update_fields:
+                self.move_path()
+
+    def move_path(self):
+        # Paths are read back from the table so a stale parent instance can't
+        # leave the subtree pointing at an old location. The company and its new
+        # parent are locked first, in id order, so two crossing moves can't both
+        # pass the cycle check.
+        paths = dict(
+            HrCompany.objects.filter(id__in={self.id, self.sub_company_id} - {None})
+            .order_by("id")
+            .select_for_update()
+            .values_list("id", "path")
+        )
+        old_path = paths[self.id]
+        parent_path = "/"
+        if self.sub_company_id:
+            parent_path = paths[self.sub_company_id]
+            if old_path and parent_path.startswith(old_path):
+                raise ValidationError({"sub_company": "A company can't be moved under itself or its subsidiaries"})
+
+        new_path = f"{parent_path}{self.id}/"
+        if new_path != old_path:
+            if old_path:
+                # Subsidiaries being created or moved meanwhile wait for the rewrite
+                list(
+                    HrCompany.objects.filter(path__startswith=old_path)
+                    .order_by("id")
+                    .select_for_update()
+                    .values_list("id", flat=True)
+                )
+                # The company and all of its subsidiaries move in one statement
+                HrCompany.objects.filter(path__startswith=old_path).update(
+                    path=Concat(Value(new_path), Substr("path", len(old_path) + 1), output_field=models.CharField())
+                )
+            else:
+                HrCompany.objects.filter(id=self.id).update(path=new_path)
+        self.path = new_path
 
 
 class CompanyReview(models.Model):
@@ -168,11 +233,35 @@ class ResumeUser(models.Model):
     about = models.TextField(null=True, blank=True)
     job_experiences = models.JSONField(null=True, blank=True)
     created_at = models.DateField(auto_now_add=True, blank=True, null=True)
+    # Search index, rebuilt from the fields above by apps.resume.services.search
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+    experience_years = models.FloatField(null=True, blank=True, editable=False)
+    latest_position = models.CharField(max_length=255, null=True, blank=True, editable=False)
+    education_level = models.CharField(max_length=255, null=True, blank=True, editable=False)
+    # Term weights for candidate matching, see apps.enrolls.services.matching
+    match_vector = models.JSONField(null=True, blank=True, editable=False)
 
     class Meta:
         db_table = "table_resumes"
         verbose_name = "Resume"
         verbose_name_plural = "Resumes"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="resume_search_vector_idx"),
+            models.Index(fields=["job_tag", "experience_years"], name="resume_tag_experience_idx"),
+            models.Index(fields=["experience_years"], name="resume_experience_idx"),
+            models.Index(fields=["education_level"], name="resume_education_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Imported here, the search service imports this module. Every write path
+        # (API, admin, imports) goes through save(), so the index follows it.
+        from apps.resume.services.search import DOCUMENT_FIELDS, index_resumes
+
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or DOCUMENT_FIELDS.intersection(update_fields):
+                index_resumes([self.id])
 
 
 class JobType(models.Model):
@@ -184,6 +273,21 @@ class JobType(models.Model):
         verbose_name_plural = "Job Types"
 
 
+def reroot_duplicates(collector, field, sub_objs, using):
+    # on_delete of duplicate_of: a cluster whose root is deleted is taken over by
+    # its oldest remaining member, and the other members point at that one
+    deleted = collector.data.get(field.model, set())
+    clusters = {}
+    for vacancy in sub_objs:
+        if vacancy not in deleted:
+            clusters.setdefault(vacancy.duplicate_of_id, []).append(vacancy)
+    for members in clusters.values():
+        root, *rest = sorted(members, key=lambda vacancy: vacancy.pk)
+        collector.add_field_update(field, None, [root])
+        if rest:
+            collector.add_field_update(field, root.pk, rest)
+
+
 class JobVacancies(models.Model):
     job_category = models.ForeignKey(
         JobCategories,
@@ -217,11 +321,25 @@ class JobVacancies(models.Model):
         settings.AUTH_USER_MODEL, null=True, blank=True, related_name="isLookUser"
     )
     is_activate = models.BooleanField(default=False, null=True, blank=True)
+    # Term weights for candidate matching, see apps.enrolls.services.matching
+    match_vector = models.JSONField(null=True, blank=True, editable=False)
+    # MinHash of title, description and skills, and the oldest vacancy of the
+    # same company it nearly repeats, see apps.enrolls.services.duplicates
+    minhash = models.BinaryField(null=True, blank=True, editable=False)
+    duplicate_of = models.ForeignKey(
+        "self", on_delete=reroot_duplicates, null=True, blank=True, related_name="duplicates", editable=False
+    )
+    # Lowest score on the vacancy's similar list once it is full, 0 while it
+    # has room, see apps.enrolls.services.neighbors
+    neighbor_floor = models.FloatField(default=0, editable=False)
 
     class Meta:
         db_table = "table_vacancy"
         verbose_name = "Vacancy"
         verbose_name_plural = "Vacancies"
+        indexes = [
+            GinIndex(fields=["match_vector"], name="vacancy_match_vector_idx"),
+        ]
 
 
 class Favourites(models.Model):
@@ -246,6 +364,9 @@ class Favourites(models.Model):
         db_table = "table_favourites"
         verbose_name = "Favourites"
         verbose_name_plural = "Favourites"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "jobs"], name="unique_favourite"),
+        ]
 
 
 class StatusApply(models.Model):
@@ -257,6 +378,16 @@ class StatusApply(models.Model):
         verbose_name_plural = "Status Apply"
 
 
+# Ids of the seeded StatusApply rows
+STATUS_PENDING = 1
+STATUS_ACCEPTED = 2
+STATUS_REJECTED = 3
+DECISION_STATUSES = (STATUS_ACCEPTED, STATUS_REJECTED)
+# A new application notifies the company HRs, a decision notifies the applicant
+HR_STATUSES = (STATUS_PENDING,)
+USER_STATUSES = DECISION_STATUSES
+
+
 class JobApply(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -282,11 +413,24 @@ class JobApply(models.Model):
         auto_now_add=True,
         auto_now=False,
     )
+    reviewed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = "table_job_apply"
         verbose_name = "Job Apply"
         verbose_name_plural = "Job Apply"
+        indexes = [
+            models.Index(fields=["resume", "jobs_status", "created_at"], name="job_apply_resume_status_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "jobs", "resume"], name="unique_job_apply"),
+            # NULLs are distinct, so applications without a resume need their own
+            models.UniqueConstraint(
+                fields=["user", "jobs"],
+                condition=models.Q(resume__isnull=True),
+                name="unique_job_apply_without_resume",
+            ),
+        ]
 
 
 class NotificationJobs(models.Model):
@@ -311,11 +455,283 @@ class NotificationJobs(models.Model):
         related_name="notificationjob",
     )
     created_at = models.DateField(auto_now_add=True, null=True, blank=True)
-
+    count = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
     class Meta:
         db_table = "table_job_notification"
         verbose_name = "Job Notification"
         verbose_name_plural = "Job Notification"
+        indexes = [
+            models.Index(
+                fields=["user", "jobs_status"],
+                condition=models.Q(is_seen=False),
+                name="job_notification_unseen_idx",
+            ),
+        ]
+
+
+class ApplicationDailyRollup(models.Model):
+    day = models.DateField()
+    category = models.ForeignKey(
+        JobCategories, on_delete=models.CASCADE, null=True, blank=True
+    )
+    company = models.ForeignKey(
+        HrCompany, on_delete=models.CASCADE, null=True, blank=True
+    )
+    status = models.ForeignKey(
+        StatusApply, on_delete=models.CASCADE, null=True, blank=True
+    )
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "table_application_daily_rollup"
+        verbose_name = "Application Daily Rollup"
+        verbose_name_plural = "Application Daily Rollup"
+        constraints = [
+            # Missing dimensions count as 0: NULLs are distinct in a plain unique
+            # constraint, so concurrent inserts of a NULL dimension would not clash
+            models.UniqueConstraint(
+                "day",
+                Coalesce("category", 0),
+                Coalesce("company", 0),
+                Coalesce("status", 0),
+                name="unique_application_daily_rollup",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["category", "day"], name="rollup_category_day_idx"),
+            models.Index(fields=["company", "day"], name="rollup_company_day_idx"),
+        ]
+
+
+class ApplicationStatusTransition(models.Model):
+    job_apply = models.ForeignKey(
+        JobApply, on_delete=models.CASCADE, related_name="transitions"
+    )
+    from_status = models.ForeignKey(
+        StatusApply,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="transitions_from",
+    )
+    to_status = models.ForeignKey(
+        StatusApply,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="transitions_to",
+    )
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="status_transitions",
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "table_application_status_transition"
+        verbose_name = "Application Status Transition"
+        verbose_name_plural = "Application Status Transition"
+        indexes = [
+            models.Index(fields=["job_apply", "created_at"], name="transition_apply_created_idx"),
+        ]
 
 
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=255)
+    route = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "table_idempotency_key"
+        verbose_name = "Idempotency Key"
+        verbose_name_plural = "Idempotency Keys"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key", "route"], name="unique_idempotency_key"),
+        ]
+
+
+class MediaBlob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField(default=0)
+    # Uploads holding the blob; zero makes it eligible for garbage collection
+    refcount = models.IntegerField(default=0)
+    # Only ever uploaded under MEDIA_PRIVATE_PREFIXES, served to permitted users only
+    private = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "table_media_blob"
+        verbose_name = "Media Blob"
+        verbose_name_plural = "Media Blobs"
+        indexes = [
+            models.Index(
+                fields=["released_at"],
+                name="media_blob_unreferenced_idx",
+                condition=models.Q(refcount__lte=0),
+            ),
+        ]
+
+
+class MatchTerm(models.Model):
+    term = models.CharField(max_length=64, unique=True)
+    # Number of resumes and vacancies whose match vector holds the term
+    resumes = models.IntegerField(default=0)
+    vacancies = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "table_match_term"
+        verbose_name = "Match Term"
+        verbose_name_plural = "Match Terms"
+
+
+class VacancyNeighbor(models.Model):
+    vacancy = models.ForeignKey(JobVacancies, on_delete=models.CASCADE, related_name="neighbors")
+    neighbor = models.ForeignKey(JobVacancies, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+
+    class Meta:
+        db_table = "table_vacancy_neighbor"
+        verbose_name = "Vacancy Neighbor"
+        verbose_name_plural = "Vacancy Neighbors"
+        indexes = [
+            models.Index(fields=["vacancy", "-score"], name="vacancy_neighbor_score_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["vacancy", "neighbor"], name="unique_vacancy_neighbor"),
+        ]
+
+
+class RecommendationList(models.Model):
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True, related_name="recommendations")
+    # [[vacancy_id, score], ...] best first, see apps.enrolls.services.recommendations
+    matches = models.JSONField(default=list)
+    built_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "table_recommendation_list"
+        verbose_name = "Recommendation List"
+        verbose_name_plural = "Recommendation Lists"
+
+
+class VacancyBand(models.Model):
+    # LSH index over JobVacancies.minhash: one row per vacancy and band
+    vacancy = models.ForeignKey(JobVacancies, on_delete=models.CASCADE, related_name="bands")
+    band = models.SmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        db_table = "table_vacancy_band"
+        verbose_name = "Vacancy Band"
+        verbose_name_plural = "Vacancy Bands"
+        indexes = [
+            models.Index(fields=["band", "bucket"], name="vacancy_band_bucket_idx"),
+        ]
+
+
+class SavedSearch(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="saved_searches")
+    name = models.CharField(max_length=255, null=True, blank=True)
+    job_category = models.ForeignKey(JobCategories, on_delete=models.CASCADE, null=True, blank=True)
+    country = models.ForeignKey(Countries, on_delete=models.CASCADE, null=True, blank=True)
+    salary_min = models.FloatField(null=True, blank=True)
+    salary_max = models.FloatField(null=True, blank=True)
+    keywords = models.CharField(max_length=255, null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    # Number of predicates a vacancy has to meet, i.e. distinct kinds and
+    # keywords in the search's terms, see apps.enrolls.services.saved_searches
+    predicates = models.PositiveSmallIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "table_saved_search"
+        verbose_name = "Saved Search"
+        verbose_name_plural = "Saved Searches"
+
+
+class SavedSearchTerm(models.Model):
+    # Inverted index over the predicates of saved searches
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name="terms")
+    kind = models.CharField(max_length=16)
+    value = models.CharField(max_length=64)
+
+    class Meta:
+        db_table = "table_saved_search_term"
+        verbose_name = "Saved Search Term"
+        verbose_name_plural = "Saved Search Terms"
+        indexes = [
+            models.Index(fields=["kind", "value"], name="saved_search_term_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["saved_search", "kind", "value"], name="unique_saved_search_term"),
+        ]
+
+
+class SavedSearchMatch(models.Model):
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name="matches")
+    vacancy = models.ForeignKey(JobVacancies, on_delete=models.CASCADE, related_name="+")
+    is_seen = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "table_saved_search_match"
+        verbose_name = "Saved Search Match"
+        verbose_name_plural = "Saved Search Matches"
+        constraints = [
+            models.UniqueConstraint(fields=["saved_search", "vacancy"], name="unique_saved_search_match"),
+        ]
+
+
+class VacancyTrend(models.Model):
+    vacancy = models.OneToOneField(JobVacancies, on_delete=models.CASCADE, primary_key=True, related_name="trend")
+    # Natural log of the time-decayed event weights, see apps.enrolls.services.trending
+    score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "table_vacancy_trend"
+        verbose_name = "Vacancy Trend"
+        verbose_name_plural = "Vacancy Trends"
+        indexes = [
+            models.Index(fields=["-score"], name="vacancy_trend_score_idx"),
+        ]
+
+
+VIEW_SKETCH_KINDS = (
+    ("seen", "seen"),
+    ("looked", "looked"),
+)
+
+
+class VacancyViewSketch(models.Model):
+    # HyperLogLog of the users that viewed ("seen") or, as HR, opened ("looked")
+    # a vacancy on a day; the row without a day covers all time
+    vacancy = models.ForeignKey(JobVacancies, on_delete=models.CASCADE, related_name="view_sketches")
+    kind = models.CharField(max_length=8, choices=VIEW_SKETCH_KINDS)
+    day = models.DateField(null=True, blank=True)
+    sketch = models.BinaryField(default=bytes)
+    estimate = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "table_vacancy_view_sketch"
+        verbose_name = "Vacancy View Sketch"
+        verbose_name_plural = "Vacancy View Sketches"
+        constraints = [
+            models.UniqueConstraint(fields=["vacancy", "kind", "day"], name="unique_vacancy_view_sketch"),
+            models.UniqueConstraint(
+                fields=["vacancy", "kind"], condition=models.Q(day__isnull=True), name="unique_vacancy_view_total"
+            ),
+        ]
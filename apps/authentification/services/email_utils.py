@@ -6,6 +6,8 @@ from django.contrib.sites.shortcuts import get_current_site
 from django.conf import settings
 from django.urls import reverse
 
+from apps.notification.services.outbox import enqueue
+
 
 class Util:
 
@@ -17,6 +19,15 @@ class Util:
             to=[data['to_email']])
         email.send()
 
+    @staticmethod
+    def queue(data, dedup_key=None):
+        # Delivered by the outbox dispatcher once the caller's transaction commits
+        enqueue('email', data, dedup_key=dedup_key)
+
+
+def send_outbox_email(payload):
+    Util.send(payload)
+
 
 class PasswordReset:
     @staticmethod
@@ -5,7 +5,7 @@ from django.utils.http import urlsafe_base64_encode
 from apps.authentification.services.email_utils import Util
 
 
-def send_reset_password_email(self, user):
+def send_reset_password_email(user):
     uidb64 = urlsafe_base64_encode(smart_bytes(user.id))
     token = PasswordResetTokenGenerator().make_token(user)
     absurl = f"https://hrms.prounity.uz/reset-password/{uidb64}/{token}"
@@ -15,4 +15,4 @@ def send_reset_password_email(self, user):
         "to_email": user.email,
         "email_subject": "Reset your password",
     }
-    Util.send(email_data)
\ No newline at end of file
+    Util.queue(email_data, dedup_key=f"email:reset:{user.id}:{token}")
@@ -8,4 +8,4 @@ def send_verification_email(user_instance, sms_code):
         "to_email": user_instance.email,
         "email_subject": "Verify your email",
     }
-    Util.send(email_data)
\ No newline at end of file
+    Util.queue(email_data, dedup_key=f"email:verification:{user_instance.id}:{sms_code}")
@@ -17,6 +17,8 @@ from rest_framework.validators import UniqueValidator
 from django.core.exceptions import ObjectDoesNotExist
 
 from apps.authentification.models import CustomUser
+from services.images import schedule_variants, variant_urls
+from services.storage import release
 
 
 class IncorrectCredentialsError(serializers.ValidationError):
@@ -46,6 +48,7 @@ class RoleSerializer(serializers.ModelSerializer):
 class UserProfilesSerializer(serializers.ModelSerializer):
     role = serializers.SerializerMethodField()
     avatar = serializers.ImageField()
+    avatar_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = get_user_model()
@@ -61,6 +64,7 @@ class UserProfilesSerializer(serializers.ModelSerializer):
             "city",
             "bio",
             "avatar",
+            "avatar_variants",
         ]
 
     def get_role(self, obj):
@@ -71,6 +75,19 @@ class UserProfilesSerializer(serializers.ModelSerializer):
 
         return result_str
 
+    def get_avatar_variants(self, obj):
+        return variant_urls(obj.avatar_variants, self.context.get('request'))
+
+
+class MatchedCandidateSerializer(UserProfilesSerializer):
+    match_score = serializers.SerializerMethodField()
+
+    class Meta(UserProfilesSerializer.Meta):
+        fields = UserProfilesSerializer.Meta.fields + ["match_score"]
+
+    def get_match_score(self, obj):
+        return self.context.get('scores', {}).get(obj.id)
+
 
 class LoginSerializer(serializers.ModelSerializer):
     email = serializers.CharField(max_length=50, min_length=2)
@@ -204,7 +221,11 @@ class UserDetailSerializers(serializers.ModelSerializer):
         return result_str
 
     def update(self, instance, validated_data):
+        previous_avatar = instance.avatar.name
         update = super().update(instance, validated_data)
+        if 'avatar' in validated_data:
+            release(previous_avatar)
+            schedule_variants(update, 'avatar')
         return update
 
 
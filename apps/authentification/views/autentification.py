@@ -1,6 +1,7 @@
 import logging
 
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 from django.db.models import Q
 
 from rest_framework import status
@@ -40,10 +41,11 @@ class RegisterViews(APIView):
 
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid(raise_exception=True):
-            user_instance = self.create_user(serializer)
-            sms_code = generate_sms_code()
-            send_verification_email(user_instance, sms_code)
-            SmsHistory.objects.create(code=sms_code, user=user_instance)
+            with transaction.atomic():
+                user_instance = self.create_user(serializer)
+                sms_code = generate_sms_code()
+                SmsHistory.objects.create(code=sms_code, user=user_instance)
+                send_verification_email(user_instance, sms_code)
 
             response_data = {
                 "sms_code": sms_code,
@@ -1,4 +1,5 @@
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import transaction
 from django.utils.encoding import (
     smart_str,
     DjangoUnicodeDecodeError,
@@ -112,6 +113,7 @@ class ResendCodeByEmailView(APIView):
             return bad_request_response("You already verified...")
 
         sms_code = generate_sms_code()
-        send_verification_email(request.user, sms_code)
-        SmsHistory.objects.create(code=sms_code, user=request.user)
+        with transaction.atomic():
+            SmsHistory.objects.create(code=sms_code, user=request.user)
+            send_verification_email(request.user, sms_code)
         return success_response({"sms_code": sms_code, "token": get_token_for_user(request.user)})
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='attachment_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
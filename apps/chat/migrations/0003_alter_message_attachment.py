@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_message_attachment_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='message',
+            name='attachment',
+            field=models.FileField(blank=True, db_index=True, null=True, upload_to='chat/', verbose_name='File Uploaded'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:14
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_alter_message_attachment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['attachment_variants'], name='message_variants_idx', opclasses=['jsonb_path_ops']),
+        ),
+    ]
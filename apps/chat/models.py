@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from apps.authentification.models import JobVacancies
 
 
@@ -18,7 +19,8 @@ class Conversation(models.Model):
 class Message(models.Model):
       sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, related_name='message_sender')
       text = models.CharField(max_length=200, blank=True, verbose_name='Text')
-      attachment = models.FileField(blank=True, null=True, verbose_name='File Uploaded')
+      attachment = models.FileField(upload_to='chat/', blank=True, null=True, db_index=True, verbose_name='File Uploaded')
+      attachment_variants = models.JSONField(default=dict, blank=True, editable=False)
       conversation_id = models.ForeignKey(Conversation, on_delete=models.CASCADE, verbose_name='Conversation Identity')
       timestamp = models.DateTimeField(auto_now_add=True, verbose_name='Time stamp', null=True, blank=True)
 
@@ -27,6 +29,10 @@ class Message(models.Model):
             db_table = "table_Message"
             verbose_name = "Message"
             verbose_name_plural = "Message"
+            indexes = [
+                  # Media requests for a private variant find its message by containment
+                  GinIndex(fields=["attachment_variants"], opclasses=["jsonb_path_ops"], name="message_variants_idx"),
+            ]
 
 
 
@@ -1,15 +1,15 @@
 import base64
 import json
-import secrets
 
 from asgiref.sync import async_to_sync
 from channels.generic.websocket import WebsocketConsumer
 from django.core.files.base import ContentFile
+from django.db import transaction
 
 from apps.chat.models import Message, Conversation
-from apps.notification.models import (
-    Notification
-)
+from apps.notification.services.coalesce import notify_message
+from apps.notification.services.push import publish_to_users
+from services.images import schedule_variants, variant_urls
 from .serializers import MessageSerializer
 
 
@@ -47,34 +47,39 @@ class ChatConsumer(WebsocketConsumer):
         conversation = Conversation.objects.get(id=int(self.room_name))
         sender = self.scope["user"]
 
-        # Attachment
-        if attachment:
-            file_str, file_ext = attachment["data"], attachment["format"]
-
-            file_data = ContentFile(
-                base64.b64decode(file_str), name=f"{secrets.token_hex(8)}.{file_ext}"
-            )
-            push_notification = Notification.objects.create(
-                name='MESSAGE_SENT',
-                sender=sender,
-                message=message
-            )
-            _message = Message.objects.create(
-                sender=sender,
-                attachment=file_data,
-                text=message,
-                conversation_id=conversation,
-            )
-        else:
-            push_notification = Notification.objects.create(
-                name='MESSAGE_SENT',
-                sender=sender,
-                message=message
-            )
-            _message = Message.objects.create(
-                sender=sender,
-                text=message,
-                conversation_id=conversation,
+        with transaction.atomic():
+            # Attachment
+            if attachment:
+                file_str, file_ext = attachment["data"], attachment["format"]
+
+                file_data = ContentFile(
+                    base64.b64decode(file_str), name=f"attachment.{file_ext}"
+                )
+                _message = Message.objects.create(
+                    sender=sender,
+                    attachment=file_data,
+                    text=message,
+                    conversation_id=conversation,
+                )
+            else:
+                _message = Message.objects.create(
+                    sender=sender,
+                    text=message,
+                    conversation_id=conversation,
+                )
+            if _message.attachment:
+                schedule_variants(_message, "attachment")
+            push_notification, _ = notify_message(sender, conversation, message)
+            publish_to_users(
+                {conversation.initiator_id, conversation.receiver_id} - {sender.id},
+                "message.sent",
+                {
+                    "conversation": conversation.id,
+                    "message": _message.id,
+                    "sender": sender.id,
+                    "notification": push_notification.id,
+                },
+                dedup_key=f"message.sent:{_message.id}",
             )
         # Send message to room group
         chat_type = {"type": "chat_message"}
@@ -88,6 +93,7 @@ class ChatConsumer(WebsocketConsumer):
                     "message": message,
                     "sender": sender.email,
                     "attachment": _message.attachment.url,
+                    "attachment_variants": variant_urls(_message.attachment_variants),
                     "time": str(_message.timestamp),
                 },
             )
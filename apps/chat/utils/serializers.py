@@ -7,15 +7,20 @@ from apps.chat.models import Conversation, Message
 from apps.enrolls.utils.serializers import (
     JobVacanciesListSerializer,
 )
+from services.images import variant_urls
 
 
 class MessageSerializer(serializers.ModelSerializer):
     sender = UserProfilesSerializer(read_only=True)
+    attachment_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Message
         exclude = ('conversation_id',)
 
+    def get_attachment_variants(self, obj):
+        return variant_urls(obj.attachment_variants, self.context.get('request'))
+
 
 class ConversationListSerializer(serializers.ModelSerializer):
     initiator = UserProfilesSerializer(read_only=True)
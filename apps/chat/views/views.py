@@ -1,4 +1,4 @@
-from django.contrib.auth.models import User
+from django.contrib.auth import get_user_model
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect, reverse
@@ -8,7 +8,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from services.idempotency import idempotent
 from services.renderers import UserRenderers
+from services.storage import release, variant_names
 from apps.chat.models import (
     Conversation,
     Message
@@ -17,15 +19,16 @@ from apps.chat.utils.serializers import (
     ConversationListSerializer,
     ConversationSerializer
 )
-from apps.notification.models import (
-    Notification
-)
+from apps.notification.services.unread import mark_messages_seen
+
+User = get_user_model()
 
 
 class StartConversationView(APIView):
     render_classes = [UserRenderers]
     perrmisson_class = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         data = request.data
 
@@ -53,11 +56,8 @@ class StartConversationView(APIView):
 @api_view(['GET'])
 def get_conversation(request, convo_id):
     conversation = Conversation.objects.filter(id=convo_id)
-    queryset_update = Notification.objects.select_related('sender').filter(
-        sender=request.user
-    ).filter(
-        is_seen=False
-    ).update(is_seen=True)
+    if request.user.is_authenticated:
+        mark_messages_seen(request.user)
     if not conversation.exists():
         return Response({'message': 'Conversation does not exist'})
     else:
@@ -109,8 +109,11 @@ class DeleteChatSMSView(APIView):
     render_classes = [UserRenderers]
     permission = [IsAuthenticated]
 
+    @idempotent
     def delete(self, request, pk):
-        queryset = get_object_or_404(Message, id=pk).delete()
+        message = get_object_or_404(Message, id=pk)
+        message.delete()
+        release(message.attachment.name, *variant_names(message.attachment_variants))
         return Response({'msg': "Message Deleted successfully"}, status=status.HTTP_200_OK)
 
 
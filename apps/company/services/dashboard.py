@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils.timezone import now
+
+from apps.authentification.models import (
+    DECISION_STATUSES,
+    ApplicationDailyRollup,
+    CompanyReview,
+    HrCompany,
+    JobApply,
+    JobVacancies,
+)
+from apps.company.services.subsidiaries import ancestor_ids, company_scope
+
+TREND_DAYS = 30
+
+
+def dashboard_key(company_id, include_subsidiaries=False):
+    return f"company:dashboard:{'tree' if include_subsidiaries else 'own'}:{company_id}"
+
+
+def dashboard_keys(company_ids, tree_ids=()):
+    # Own dashboards of the companies themselves, subtree dashboards of them and their ancestors
+    keys = [dashboard_key(company_id) for company_id in company_ids if company_id]
+    keys += [dashboard_key(company_id, True) for company_id in tree_ids if company_id]
+    return keys
+
+
+def invalidate(company_ids):
+    company_ids = [company_id for company_id in company_ids if company_id]
+    if not company_ids:
+        return
+    tree_ids = {
+        ancestor_id
+        for path in HrCompany.objects.filter(id__in=company_ids).values_list('path', flat=True)
+        for ancestor_id in ancestor_ids(path)
+    }
+    keys = dashboard_keys(company_ids, tree_ids)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def vacancy_counts(company, include_subsidiaries):
+    counts = JobVacancies.objects.filter(company_scope(company, include_subsidiaries)).aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_activate=True)),
+        duplicates=Count('id', filter=Q(duplicate_of__isnull=False)),
+    )
+    counts['inactive'] = counts['total'] - counts['active']
+    return counts
+
+
+def application_counts(company, include_subsidiaries):
+    applies = JobApply.objects.filter(company_scope(company, include_subsidiaries, prefix="jobs__company"))
+    counts = applies.aggregate(
+        total=Count('id'),
+        applicants=Count('user', distinct=True),
+        reviewed=Count('id', filter=Q(reviewed_at__isnull=False) | Q(jobs_status__in=DECISION_STATUSES)),
+    )
+    counts['by_status'] = {
+        row['jobs_status__name'] or "unknown": row['number']
+        for row in applies.values('jobs_status__name').annotate(number=Count('id')).order_by()
+    }
+    return counts
+
+
+def hr_list(company, include_subsidiaries):
+    hrs = (
+        get_user_model().objects.filter(company_scope(company, include_subsidiaries, prefix="hrsusers"))
+        .values('id', 'username', 'first_name', 'last_name', 'email', 'avatar')
+        .distinct()
+        .order_by('id')
+    )
+    return [dict(hr, avatar=default_storage.url(hr['avatar']) if hr['avatar'] else None) for hr in hrs]
+
+
+def application_trend(company, include_subsidiaries, days=TREND_DAYS):
+    # Read from the daily rollups, zero-filled so every day of the window is present
+    end = now().date()
+    start = end - timedelta(days=days - 1)
+    numbers = dict(
+        ApplicationDailyRollup.objects.filter(
+            company_scope(company, include_subsidiaries), day__gte=start, day__lte=end
+        )
+        .values('day')
+        .annotate(number=Sum('count'))
+        .values_list('day', 'number')
+        .order_by()
+    )
+    return [
+        {"date": start + timedelta(days=offset), "number": numbers.get(start + timedelta(days=offset), 0)}
+        for offset in range(days)
+    ]
+
+
+def company_dashboard(company, include_subsidiaries=False):
+    key = dashboard_key(company.id, include_subsidiaries)
+    result = cache.get(key)
+    if result is None:
+        result = {
+            "company": company.id,
+            "name": company.name,
+            "include_subsidiaries": include_subsidiaries,
+            "vacancies": vacancy_counts(company, include_subsidiaries),
+            "applications": application_counts(company, include_subsidiaries),
+            "reviews": CompanyReview.objects.filter(company_scope(company, include_subsidiaries)).count(),
+            "hrs": hr_list(company, include_subsidiaries),
+            "trend": application_trend(company, include_subsidiaries),
+        }
+        cache.set(key, result, settings.COMPANY_DASHBOARD_CACHE_TTL)
+    return result
@@ -0,0 +1,36 @@
+from django.db.models import Q
+
+from apps.authentification.models import HrCompany
+
+TRUTHY = ("1", "true", "yes")
+
+
+def include_subsidiaries(request):
+    return str(request.query_params.get("include_subsidiaries", "")).lower() in TRUTHY
+
+
+def subtree(company):
+    # One range scan on company_path_idx, the company itself included
+    return HrCompany.objects.filter(path__startswith=company.path)
+
+
+def ancestor_ids(company_path):
+    return [int(company_id) for company_id in company_path.strip("/").split("/") if company_id]
+
+
+def company_scope(company, include_subsidiaries=False, prefix="company"):
+    # Filter for rows pointing at the company, or at any company of its subtree
+    if include_subsidiaries:
+        return Q(**{f"{prefix}__path__startswith": company.path})
+    return Q(**{prefix: company})
+
+
+def hr_companies(user, include_subsidiaries=False):
+    companies = HrCompany.objects.filter(hrs=user)
+    if not include_subsidiaries:
+        return companies
+
+    scope = Q()
+    for path in set(companies.values_list("path", flat=True)):
+        scope |= Q(path__startswith=path)
+    return HrCompany.objects.filter(scope) if scope else HrCompany.objects.none()
@@ -1,6 +1,7 @@
 from django.urls import path
 
 from apps.company.views.views import (
+    CompanyDashboardView,
     CompanyVacancies,
     GetCompaniesView,
     HrCompanyView,
@@ -11,6 +12,7 @@ from apps.company.views.views import (
 urlpatterns = [
     path("", HrCompanyView.as_view()),
     path("/<int:id>", GetCompaniesView.as_view()),
+    path("/<int:id>/dashboard", CompanyDashboardView.as_view()),
     path("/<int:id>/review", CompanyReviewCreateView.as_view()),
     path("/<int:id>/reviews", CompanyReviewListView.as_view()),
     path("/<int:id>/vacancies/", CompanyVacancies.as_view()),
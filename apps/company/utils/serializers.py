@@ -1,14 +1,19 @@
 """ Django Library """
 import json
 
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db.models import Q
 from rest_framework import serializers
 
 from apps.authentification.models import HrCompany, Countries, JobVacancies, CompanyReview
 from apps.authentification.utils.serializers import (
     UserProfilesSerializer
 )
+from apps.company.services import dashboard
+from apps.company.services.subsidiaries import ancestor_ids, company_scope
+from apps.enrolls.services import funnel
+from services.images import schedule_variants, variant_urls
+from services.storage import release
 
 def validate_file_size(value):
     max_size = 2 * 1024 * 1024
@@ -47,6 +52,7 @@ class HrCompanyListSerializer(serializers.ModelSerializer):
     user_count = serializers.SerializerMethodField()
     job_count = serializers.SerializerMethodField()
     hrs_count = serializers.SerializerMethodField()
+    logo_variants = serializers.SerializerMethodField()
 
 
     class Meta:
@@ -55,6 +61,7 @@ class HrCompanyListSerializer(serializers.ModelSerializer):
             "id",
             "name",
             "logo",
+            "logo_variants",
             "content",
             "countries",
             "hrs",
@@ -64,16 +71,23 @@ class HrCompanyListSerializer(serializers.ModelSerializer):
             "created_at",
         ]
 
+    def get_logo_variants(self, obj):
+        return variant_urls(obj.logo_variants, self.context.get("request"))
+
     def get_user_count(self, obj):
+        if self.context.get("include_subsidiaries"):
+            return get_user_model().objects.filter(companyuser__path__startswith=obj.path).distinct().count()
         return obj.users.count()
 
     def get_hrs_count(self, obj):
+        if self.context.get("include_subsidiaries"):
+            return get_user_model().objects.filter(hrsusers__path__startswith=obj.path).distinct().count()
         return obj.hrs.count()
 
     def get_job_count(self, obj):
         count_jobs = (
             JobVacancies.objects.select_related("company")
-            .filter(Q(company__id=obj.id))
+            .filter(company_scope(obj, self.context.get("include_subsidiaries")))
             .count()
         )
         return count_jobs
@@ -146,6 +160,8 @@ class HrCompanyCreateSerializer(serializers.ModelSerializer):
         hr_company.author = self.context.get("user")
         hr_company.hrs.add(self.context.get("user"))
         hr_company.save()
+        if hr_company.logo:
+            schedule_variants(hr_company, "logo")
 
         if company:
             if not isinstance(company, HrCompany):
@@ -179,11 +195,39 @@ class HrCompanyCreateSerializer(serializers.ModelSerializer):
                 )
             instance.name = validated_data['name']
 
+        previous_logo = instance.logo.name
         if logo:
             instance.logo = logo
 
+        company = self.context.get("company")
+        previous_tree = None
+        if company:
+            if not isinstance(company, HrCompany):
+                try:
+                    company = serializers.PrimaryKeyRelatedField(
+                        queryset=HrCompany.objects.all()
+                    ).to_internal_value(company)
+                except serializers.ValidationError as error:
+                    raise serializers.ValidationError({"sub_company": error.detail})
+            if company.id != instance.sub_company_id:
+                # The old ancestors' subtree numbers lose this company once it moves
+                previous_tree = ancestor_ids(
+                    HrCompany.objects.filter(id=instance.id).values_list("path", flat=True).get()
+                )
+            instance.sub_company = company
+
         instance.content = validated_data.get('content', instance.content)
-        instance.save()
+        try:
+            instance.save()
+        except ValidationError as error:
+            # A move under the company's own subtree is rolled back by save()
+            raise serializers.ValidationError(error.message_dict)
+        if logo:
+            release(previous_logo)
+            schedule_variants(instance, "logo")
+        dashboard.invalidate([instance.id])
+        if previous_tree is not None:
+            funnel.invalidate(company_ids=[instance.id], tree_ids=previous_tree)
         return instance
 
 
@@ -211,4 +255,5 @@ class CompanyReviewCreateSerializer(serializers.ModelSerializer):
         create.user = self.context.get('user')
         create.company = self.context.get('company')
         create.save()
+        dashboard.invalidate([create.company_id])
         return create
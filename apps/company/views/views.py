@@ -13,7 +13,11 @@ from apps.authentification.models import (
     HrCompany,
     JobVacancies, CompanyReview,
 )
+from apps.company.services.dashboard import company_dashboard
+from apps.company.services.subsidiaries import company_scope, include_subsidiaries
+from services.idempotency import idempotent
 from services.pagination_method import PaginationFunc
+from services.storage import release, variant_names
 from services.renderers import UserRenderers
 from apps.company.utils.serializers import (
     HrCompanyCreateSerializer,
@@ -44,6 +48,7 @@ class HrCompanyView(APIView):
         ],
         description="Create company",
     )
+    @idempotent
     def post(self, request):
         unexpected_fields = self.validate_fields(request.data)
         if unexpected_fields:
@@ -83,20 +88,28 @@ class GetCompaniesView(APIView):
         request=HrCompanyListSerializer,
         operation_description="Get company",
     )
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="include_subsidiaries", type=bool),
+        ],
+        description="Company with user, HR and vacancy counts, optionally across its subsidiaries",
+    )
     def get(self, request, id):
+        context = {"request": request, "include_subsidiaries": include_subsidiaries(request)}
         if request.user.is_authenticated:
             queryset = get_object_or_404(HrCompany, id=id)
-            serializers = HrCompanyListSerializer(queryset, context={"request": request})
+            serializers = HrCompanyListSerializer(queryset, context=context)
             return Response(serializers.data, status=status.HTTP_200_OK)
         else:
             queryset = get_object_or_404(HrCompany, id=id)
-            serializers = HrCompanyListSerializer(queryset, context={"request": request})
+            serializers = HrCompanyListSerializer(queryset, context=context)
             return Response(serializers.data, status=status.HTTP_200_OK)
 
     @swagger_auto_schema(
         request=HrCompanyCreateSerializer,
         operation_description="Update company",
     )
+    @idempotent
     def put(self, request, id):
         if not request.user.is_authenticated:
             return self.invalid_token_response()
@@ -108,7 +121,9 @@ class GetCompaniesView(APIView):
 
         logo_file, multiple_countries = self.extract_request_data(request)
 
-        updated_data = self.update_hr_company(queryset, request.data, logo_file, multiple_countries)
+        updated_data = self.update_hr_company(
+            queryset, request.data, logo_file, multiple_countries, request.data.get("sub_company")
+        )
 
         return Response(updated_data, status=status.HTTP_200_OK)
 
@@ -123,12 +138,12 @@ class GetCompaniesView(APIView):
         multiple_countries = request.data.get("countries", [])
         return logo_file, multiple_countries
 
-    def update_hr_company(self, instance, data, logo, countries):
+    def update_hr_company(self, instance, data, logo, countries, company=None):
         serializer = HrCompanyCreateSerializer(
             instance=instance,
             data=data,
             partial=True,
-            context={'request': self.request, 'logo': logo, 'multiple_countries': countries}
+            context={'request': self.request, 'logo': logo, 'multiple_countries': countries, 'company': company}
         )
 
         serializer.is_valid(raise_exception=True)
@@ -136,6 +151,7 @@ class GetCompaniesView(APIView):
 
         return serializer.data
 
+    @idempotent
     def delete(self, request, id):
         if not request.user.is_authenticated:
             return self.invalid_token_response()
@@ -157,6 +173,7 @@ class GetCompaniesView(APIView):
 
     def delete_hr_company(self, instance):
         instance.delete()
+        release(instance.logo.name, *variant_names(instance.logo_variants))
 
 
 class CompanyVacancies(APIView, PaginationFunc):
@@ -169,13 +186,20 @@ class CompanyVacancies(APIView, PaginationFunc):
         request=JobVacanciesListSerializer,
         operation_description="Get company vacancies",
     )
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="name", type=str),
+            OpenApiParameter(name="include_subsidiaries", type=bool),
+        ],
+        description="Active vacancies of the company, optionally with its subsidiaries",
+    )
     def get(self, request, id):
         queryset = get_object_or_404(HrCompany, id=id)
         name = request.query_params.get("name", None)
 
         instance = (
             JobVacancies.objects.select_related("company")
-            .filter(Q(company=queryset), Q(is_activate=True))
+            .filter(company_scope(queryset, include_subsidiaries(request)), Q(is_activate=True))
             .filter(Q(title__icontains=name) if bool(name) else Q())
         ).order_by("-id")
 
@@ -184,6 +208,24 @@ class CompanyVacancies(APIView, PaginationFunc):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class CompanyDashboardView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="include_subsidiaries", type=bool),
+        ],
+        description="Vacancy, application and review counts, HRs and a 30 day application trend",
+    )
+    def get(self, request, id):
+        company = get_object_or_404(HrCompany, id=id)
+        is_admin = request.user.groups.filter(name="admin").exists()
+        if not is_admin and not company.hrs.filter(id=request.user.id).exists():
+            return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+        return Response(company_dashboard(company, include_subsidiaries(request)), status=status.HTTP_200_OK)
+
+
 class CompanyReviewListView(APIView, PaginationFunc):
     pagination_class = StandardResultsSetPagination
 
@@ -201,6 +243,7 @@ class CompanyReviewCreateView(APIView):
     render_classes = [UserRenderers]
     perrmisson_class = [IsAuthenticated]
 
+    @idempotent
     def post(self, request, id):
         if not request.user.is_authenticated:
             return self.invalid_token_response()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.enrolls.services.rollups import backfill
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily application rollups from table_job_apply"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", help="First day to rebuild, YYYY-MM-DD")
+        parser.add_argument("--to", dest="end", help="Last day to rebuild, YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        created = backfill(options["start"], options["end"])
+        self.stdout.write(f"Wrote {created} rollup rows")
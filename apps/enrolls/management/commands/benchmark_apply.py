@@ -0,0 +1,69 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from apps.authentification.models import CustomUser, JobVacancies
+from apps.enrolls.services.applications import AlreadyApplied, submit_application
+from apps.enrolls.services.rollups import backfill
+
+
+class Command(BaseCommand):
+    help = (
+        "Time submit_application with every applicant submitting twice at once, on a "
+        "throwaway vacancy and users that are deleted afterwards. Writes to the database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--applicants", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=8)
+
+    def handle(self, *args, **options):
+        stamp = int(time.time())
+        vacancy = JobVacancies.objects.create(title=f"benchmark_apply {stamp}")
+        users = CustomUser.objects.bulk_create(
+            [
+                CustomUser(email=f"benchmark-apply-{stamp}-{index}@example.com", username=f"benchmark-apply-{stamp}-{index}")
+                for index in range(options["applicants"])
+            ]
+        )
+
+        def submit(user):
+            started = time.perf_counter()
+            try:
+                submit_application(user, vacancy, None)
+                outcome = "created"
+            except AlreadyApplied:
+                outcome = "duplicate"
+            finally:
+                connections.close_all()
+            return outcome, time.perf_counter() - started
+
+        # Every applicant twice in a row, so the pool races each pair
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["threads"]) as pool:
+            results = list(pool.map(submit, [user for user in users for _ in range(2)]))
+        elapsed = time.perf_counter() - started
+        close_old_connections()
+
+        try:
+            for outcome in ("created", "duplicate"):
+                timings = sorted(duration for name, duration in results if name == outcome)
+                if not timings:
+                    continue
+                self.stdout.write(
+                    f"{outcome}: {len(timings)} submits, p50 {timings[len(timings) // 2] * 1000:.1f} ms, "
+                    f"p95 {timings[int(len(timings) * 0.95)] * 1000:.1f} ms, max {timings[-1] * 1000:.1f} ms"
+                )
+            stored = vacancy.jobs.count()
+            self.stdout.write(
+                f"{len(results)} submits in {elapsed:.1f}s ({len(results) / elapsed:,.0f}/s), "
+                f"{stored} applications stored for {len(users)} applicants"
+            )
+        finally:
+            vacancy.delete()
+            CustomUser.objects.filter(id__in=[user.id for user in users]).delete()
+            today = timezone.localdate()
+            backfill(today, today)
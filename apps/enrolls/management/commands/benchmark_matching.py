@@ -0,0 +1,100 @@
+import time
+from collections import Counter
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from apps.authentification.models import CustomUser, JobVacancies, MatchTerm, ResumeUser
+from apps.enrolls.services.matching import CORPORA, cosine, inverse_frequency, query, resume_scores, weigh
+
+
+class Command(BaseCommand):
+    help = (
+        "Time candidate scoring against synthetic resume vectors. By default only the "
+        "in-memory scoring is timed: reading match vectors from the database, the idf "
+        "lookup in table_match_term and JSON decoding are not included. With --database "
+        "the resumes, their terms and the vacancies are written as throwaway rows and "
+        "resume_scores runs end to end; the rows are deleted afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--resumes", type=int, default=100_000)
+        parser.add_argument("--vocabulary", type=int, default=50_000)
+        parser.add_argument("--resume-terms", type=int, default=150)
+        parser.add_argument("--vacancy-terms", type=int, default=40)
+        parser.add_argument("--vacancies", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--database", action="store_true", help="Seed rows and time resume_scores on them")
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        # Prefixed, so seeded terms never collide with real ones
+        prefix = f"benchmark{int(time.time())}" if options["database"] else "term"
+        vocabulary = np.array([f"{prefix}{index}" for index in range(options["vocabulary"])], dtype=object)
+        # Zipf-like term popularity, as in real text
+        popularity = 1 / np.arange(1, len(vocabulary) + 1)
+        popularity /= popularity.sum()
+
+        def documents(count, size):
+            samples = rng.choice(len(vocabulary), size=(count, size), p=popularity)
+            return [weigh([(1, vocabulary[row])]) for row in samples]
+
+        started = time.perf_counter()
+        resumes = list(enumerate(documents(options["resumes"], options["resume_terms"])))
+        frequencies = Counter(term for _, vector in resumes for term in vector)
+        vacancies = documents(options["vacancies"], options["vacancy_terms"])
+        self.stdout.write(
+            f"Generated {len(resumes)} resumes, {len(frequencies)} distinct terms "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        if options["database"]:
+            timings, scores = self.score_rows(prefix, resumes, frequencies, vacancies, options["batch_size"])
+        else:
+            timings = []
+            for vacancy in vacancies:
+                weights = {term: inverse_frequency(len(resumes), frequencies.get(term, 0)) for term in vacancy}
+                started = time.perf_counter()
+                scores = cosine(*query(vacancy, weights), resumes, options["batch_size"])
+                timings.append(time.perf_counter() - started)
+
+        timings.sort()
+        median = timings[len(timings) // 2]
+        self.stdout.write(
+            f"Scored {len(scores)} resumes per vacancy: p50 {median * 1000:.0f} ms, "
+            f"max {timings[-1] * 1000:.0f} ms, {len(scores) / median:,.0f} resumes/s, "
+            f"best score {max(scores.values()):.3f}"
+        )
+
+    def score_rows(self, prefix, resumes, frequencies, vectors, batch_size):
+        started = time.perf_counter()
+        user = CustomUser.objects.create(email=f"{prefix}@example.com", username=prefix)
+        try:
+            ResumeUser.objects.bulk_create(
+                [ResumeUser(user=user, match_vector=vector) for _, vector in resumes], batch_size=batch_size
+            )
+            MatchTerm.objects.bulk_create(
+                [MatchTerm(term=term, resumes=count) for term, count in frequencies.items()], batch_size=batch_size
+            )
+            vacancies = JobVacancies.objects.bulk_create(
+                [JobVacancies(title=f"{prefix} {index}", match_vector=vector) for index, vector in enumerate(vectors)]
+            )
+            for field in CORPORA:
+                cache.delete(f"match-corpus:{field}")
+            self.stdout.write(f"Seeded the rows in {time.perf_counter() - started:.1f}s")
+
+            timings = []
+            for vacancy in vacancies:
+                started = time.perf_counter()
+                scores = resume_scores(vacancy, ResumeUser.objects.filter(user=user))
+                timings.append(time.perf_counter() - started)
+            return timings, scores
+        finally:
+            JobVacancies.objects.filter(title__startswith=f"{prefix} ").delete()
+            MatchTerm.objects.filter(term__startswith=prefix).delete()
+            ResumeUser.objects.filter(user=user).delete()
+            user.delete()
+            for field in CORPORA:
+                cache.delete(f"match-corpus:{field}")
@@ -0,0 +1,89 @@
+import time
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.authentification.models import JobVacancies, VacancyNeighbor
+from apps.enrolls.services.matching import inverse_frequency, weigh
+from apps.enrolls.services.neighbors import features, similar, similarity, top_neighbors
+
+
+class Command(BaseCommand):
+    help = (
+        "Time building the similar vacancies lists on synthetic vacancies, and the "
+        "lookup of stored lists in the database when there are any"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vacancies", type=int, default=20_000)
+        parser.add_argument("--vocabulary", type=int, default=20_000)
+        parser.add_argument("--terms", type=int, default=60)
+        parser.add_argument("--categories", type=int, default=40)
+        parser.add_argument("--block-size", type=int, default=settings.SIMILAR_VACANCIES_BLOCK_SIZE)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        count = options["vacancies"]
+        size = settings.SIMILAR_VACANCIES_SIZE
+        vocabulary = np.array([f"term{index}" for index in range(options["vocabulary"])], dtype=object)
+        # Zipf-like term popularity, as in real text
+        popularity = 1 / np.arange(1, len(vocabulary) + 1)
+        popularity /= popularity.sum()
+
+        samples = rng.choice(len(vocabulary), size=(count, options["terms"]), p=popularity)
+        rows = [
+            (
+                index,
+                int(rng.integers(1, options["categories"] + 1)),
+                int(rng.integers(1, 4)),
+                float(rng.lognormal(8, 0.6)),
+                weigh([(1, vocabulary[sample])]),
+            )
+            for index, sample in enumerate(samples)
+        ]
+        frequencies = Counter(term for *_, vector in rows for term in vector)
+        idf = {term: inverse_frequency(count, frequency) for term, frequency in frequencies.items()}
+
+        started = time.perf_counter()
+        target = features(rows, idf)
+        prepared = time.perf_counter() - started
+        started = time.perf_counter()
+        for offset in range(0, count, options["block_size"]):
+            source = features(rows[offset:offset + options["block_size"]], idf, target.vocabulary)
+            top_neighbors(similarity(source, target), source.ids, target.ids, size)
+        built = time.perf_counter() - started
+        self.stdout.write(
+            f"Full build of {count} vacancies, top {size}: features {prepared:.1f}s, "
+            f"scoring {built:.1f}s ({count / built:,.0f} vacancies/s)"
+        )
+
+        timings = []
+        for index in rng.choice(count, size=min(20, count), replace=False):
+            started = time.perf_counter()
+            source = features([rows[index]], idf, target.vocabulary)
+            top_neighbors(similarity(source, target), source.ids, target.ids, size)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        self.stdout.write(
+            f"Incremental scoring of one vacancy: p50 {timings[len(timings) // 2] * 1000:.1f} ms, "
+            f"max {timings[-1] * 1000:.1f} ms"
+        )
+
+        stored = list(VacancyNeighbor.objects.values_list("vacancy", flat=True).distinct()[:options["queries"]])
+        if not stored:
+            self.stdout.write("No stored lists to time lookups on, run rebuild_similar_vacancies first")
+            return
+        timings = []
+        for vacancy in JobVacancies.objects.filter(id__in=stored):
+            started = time.perf_counter()
+            similar(vacancy)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        self.stdout.write(
+            f"Lookup of {len(timings)} stored lists: p50 {timings[len(timings) // 2] * 1000:.2f} ms, "
+            f"p99 {timings[int(len(timings) * 0.99)] * 1000:.2f} ms"
+        )
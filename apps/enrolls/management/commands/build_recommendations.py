@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.enrolls.services.recommendations import build
+
+
+class Command(BaseCommand):
+    help = "Precompute the recommended vacancies of every user with a resume, application or favorite"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        built = build(batch_size=options["batch_size"])
+        self.stdout.write(f"Built recommendations for {built} users")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.enrolls.services.duplicates import cluster
+
+
+class Command(BaseCommand):
+    help = "Recompute vacancy signatures and group near-duplicate vacancies into clusters"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        marked = cluster(options["batch_size"])
+        self.stdout.write(f"Marked {marked} vacancies as duplicates")
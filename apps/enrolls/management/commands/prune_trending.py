@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.enrolls.services.trending import prune
+
+
+class Command(BaseCommand):
+    help = "Drop trending scores that decayed to nothing, meant to run daily"
+
+    def handle(self, *args, **options):
+        pruned = prune()
+        self.stdout.write(f"Pruned {pruned} trending scores")
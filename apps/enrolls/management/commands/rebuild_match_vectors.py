@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.enrolls.services.matching import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the match vectors of every resume and vacancy and recount their terms"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        indexed = rebuild(options["batch_size"])
+        self.stdout.write(f"Indexed {indexed['resumes']} resumes and {indexed['vacancies']} vacancies")
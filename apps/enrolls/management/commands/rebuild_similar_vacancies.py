@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.enrolls.services.neighbors import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the similar vacancies list of every vacancy"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--block-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        built = rebuild(options["block_size"])
+        self.stdout.write(f"Rebuilt similar vacancies for {built} vacancies")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.enrolls.services.trending import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute every trending score from the applications and favorites"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        built = rebuild(options["batch_size"])
+        self.stdout.write(f"Rebuilt trending scores for {built} vacancies")
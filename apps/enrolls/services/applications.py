@@ -0,0 +1,137 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.authentification.models import HrCompany, JobApply
+from apps.company.services import dashboard
+from apps.enrolls.services import trending
+from apps.enrolls.services.funnel import invalidate_applies, record_transition, record_transitions
+from apps.enrolls.services.rollups import (
+    application_created,
+    application_deleted,
+    application_status_changed,
+    applications_status_changed,
+)
+from apps.notification.services.coalesce import notify_application, notify_applications
+from apps.notification.services.push import publish_application_event, publish_application_events
+
+
+# Constraints that mean the same application was already submitted
+APPLY_CONSTRAINTS = {"unique_job_apply", "unique_job_apply_without_resume"}
+
+
+class AlreadyApplied(Exception):
+    pass
+
+
+def is_double_submit(error, fields):
+    # Postgres names the violated constraint; backends that don't are checked
+    # against the row the winning request committed
+    constraint = getattr(getattr(error.__cause__, "diag", None), "constraint_name", None)
+    if constraint is not None:
+        return constraint in APPLY_CONSTRAINTS
+    lookup = {"user": fields["user"], "jobs": fields["jobs"]}
+    if fields["resume"] is None:
+        lookup["resume__isnull"] = True
+    else:
+        lookup["resume"] = fields["resume"]
+    return JobApply.objects.filter(**lookup).exists()
+
+
+def submit_application(user, jobs, resume, jobs_status=None):
+    # The unique constraints on (user, jobs, resume) decide a double submit:
+    # the losing INSERT fails inside its savepoint instead of after a racy exists().
+    fields = {"user": user, "jobs": jobs, "resume": resume}
+    if jobs_status:
+        fields["jobs_status"] = jobs_status
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                job_apply = JobApply.objects.create(**fields)
+        except IntegrityError as error:
+            if is_double_submit(error, fields):
+                raise AlreadyApplied()
+            raise
+
+        if jobs.company_id:
+            HrCompany.users.through.objects.bulk_create(
+                [HrCompany.users.through(hrcompany_id=jobs.company_id, customuser_id=user.id)],
+                ignore_conflicts=True,
+            )
+        application_submitted(job_apply, user)
+    return job_apply
+
+
+def application_submitted(job_apply, user=None):
+    with transaction.atomic():
+        application_created(job_apply)
+        trending.record([job_apply.jobs_id], "application")
+        record_transition(job_apply, None, job_apply.jobs_status_id, user)
+        notification, _ = notify_application(job_apply)
+        publish_application_event(job_apply, "application.created", notification)
+    return notification
+
+
+def withdraw_application(job_apply):
+    # The rollup row and the cached funnels and dashboards still count the
+    # application, so they are taken down together with it
+    with transaction.atomic():
+        job_apply = (
+            JobApply.objects.select_related('jobs').select_for_update(of=('self',)).get(id=job_apply.id)
+        )
+        application_deleted(job_apply)
+        invalidate_applies([job_apply])
+        dashboard.invalidate([job_apply.jobs.company_id] if job_apply.jobs_id else [])
+        job_apply.delete()
+
+
+def change_status(job_apply, jobs_status, user=None):
+    with transaction.atomic():
+        previous_status_id = job_apply.jobs_status_id
+        job_apply.jobs_status = jobs_status
+        job_apply.reviewed_at = job_apply.reviewed_at or timezone.now()
+        job_apply.save()
+
+        if previous_status_id != job_apply.jobs_status_id:
+            application_status_changed(job_apply, previous_status_id)
+            record_transition(job_apply, previous_status_id, job_apply.jobs_status_id, user)
+        notification, _ = notify_application(job_apply, jobs_status)
+        publish_application_event(job_apply, "application.status_changed", notification)
+    return notification
+
+
+def change_status_bulk(user, ids, jobs_status):
+    # Ownership is one join against the HR's companies; ids the HR can't see are
+    # reported back as skipped rather than failing the whole batch.
+    with transaction.atomic():
+        job_applies = list(
+            JobApply.objects.filter(id__in=ids, jobs__company__hrs=user)
+            .select_related('jobs')
+            .select_for_update(of=('self',))
+        )
+        changed = [job_apply for job_apply in job_applies if job_apply.jobs_status_id != jobs_status.id]
+        previous_status_ids = {job_apply.id: job_apply.jobs_status_id for job_apply in changed}
+
+        if changed:
+            now = timezone.now()
+            JobApply.objects.filter(id__in=previous_status_ids).update(
+                jobs_status=jobs_status, reviewed_at=Coalesce('reviewed_at', Value(now))
+            )
+            for job_apply in changed:
+                job_apply.jobs_status = jobs_status
+                job_apply.reviewed_at = job_apply.reviewed_at or now
+
+            applications_status_changed(changed, previous_status_ids)
+            record_transitions(changed, previous_status_ids, jobs_status.id, user)
+            notifications = notify_applications(changed, jobs_status)
+            publish_application_events(changed, "application.status_changed", notifications)
+
+    found = {job_apply.id for job_apply in job_applies}
+    return {
+        "status": jobs_status.id,
+        "updated": sorted(previous_status_ids),
+        "unchanged": sorted(found - set(previous_status_ids)),
+        "skipped": sorted(set(ids) - found),
+    }
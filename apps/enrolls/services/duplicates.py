@@ -0,0 +1,178 @@
+import hashlib
+import zlib
+from functools import reduce
+from operator import or_
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from apps.authentification.models import JobVacancies, VacancyBand
+from apps.company.services.subsidiaries import TRUTHY
+from apps.enrolls.services import funnel, matching
+from apps.resume.services.search import texts
+
+# 20 bands of 6 rows: a pair at 0.8 similarity shares a band with ~99.8%
+# probability, a pair at 0.5 with ~27%, so few candidates need a check
+BANDS = 20
+ROWS = 6
+PERMUTATIONS = BANDS * ROWS
+SHINGLE = 3
+PRIME = (1 << 31) - 1
+# Fixed seed: stored signatures must stay comparable across processes
+_random = np.random.default_rng(20240601)
+MULTIPLIERS = _random.integers(1, PRIME, PERMUTATIONS, dtype=np.uint64)
+OFFSETS = _random.integers(0, PRIME, PERMUTATIONS, dtype=np.uint64)
+# Buckets shared by more vacancies than this are boilerplate, not duplicates
+MAX_BUCKET = 200
+
+
+def collapse_duplicates(request):
+    return str(request.query_params.get("collapse_duplicates", "")).lower() in TRUTHY
+
+
+def shingles(vacancy):
+    tokens = matching.terms(
+        " ".join([vacancy.title or "", vacancy.description or "", *texts(vacancy.skills)])
+    )
+    if len(tokens) < SHINGLE:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[index:index + SHINGLE]) for index in range(len(tokens) - SHINGLE + 1)}
+
+
+def signature(vacancy):
+    # Minimum of every permutation (a * x + b) mod p over the shingle hashes
+    hashes = np.array([zlib.crc32(shingle.encode()) for shingle in shingles(vacancy)], dtype=np.uint64)
+    if not len(hashes):
+        return None
+    values = (hashes[:, None] * MULTIPLIERS + OFFSETS) % PRIME
+    return values.min(axis=0).astype(np.uint32)
+
+
+def decode(minhash):
+    return np.frombuffer(bytes(minhash), dtype=np.uint32) if minhash else None
+
+
+def buckets(minhash):
+    # One 64-bit bucket per band, from the band's rows of the signature
+    return [
+        (band, int.from_bytes(
+            hashlib.blake2b(minhash[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest(),
+            "big", signed=True,
+        ))
+        for band in range(BANDS)
+    ]
+
+
+def similarity(first, second):
+    # Share of equal rows estimates the Jaccard similarity of the shingle sets
+    return float(np.mean(first == second))
+
+
+def candidates(vacancy, minhash):
+    # Vacancies of the same company sharing at least one bucket, read through
+    # the (band, bucket) index instead of scanning the company's vacancies
+    match = reduce(or_, [Q(band=band, bucket=bucket) for band, bucket in buckets(minhash)])
+    ids = (
+        VacancyBand.objects.filter(match, vacancy__company_id=vacancy.company_id)
+        .exclude(vacancy=vacancy.id)
+        .values_list("vacancy", flat=True)
+        .distinct()
+    )
+    return JobVacancies.objects.filter(id__in=ids).values_list("id", "duplicate_of", "minhash")
+
+
+def store(vacancies):
+    # Signatures and band rows of a batch of vacancies, replacing the old rows
+    minhashes = {}
+    with transaction.atomic():
+        VacancyBand.objects.filter(vacancy__in=[vacancy.id for vacancy in vacancies]).delete()
+        rows = []
+        for vacancy in vacancies:
+            minhash = signature(vacancy)
+            minhashes[vacancy.id] = minhash
+            vacancy.minhash = minhash.tobytes() if minhash is not None else None
+            if minhash is not None:
+                rows.extend(
+                    VacancyBand(vacancy_id=vacancy.id, band=band, bucket=bucket)
+                    for band, bucket in buckets(minhash)
+                )
+        JobVacancies.objects.bulk_update(vacancies, ["minhash"])
+        VacancyBand.objects.bulk_create(rows, batch_size=2000)
+    return minhashes
+
+
+def index(vacancy):
+    """
+    Stores the signature of a new or edited vacancy and links it to the
+    cluster of its closest near-duplicate, if any. A vacancy others already
+    point to stays the root of its cluster.
+    """
+    minhash = store([vacancy])[vacancy.id]
+    if vacancy.duplicates.exists():
+        return
+    root = None
+    if minhash is not None:
+        best = settings.VACANCY_DUPLICATE_THRESHOLD
+        for candidate_id, duplicate_of, other in candidates(vacancy, minhash):
+            value = similarity(minhash, decode(other))
+            if value >= best:
+                best, root = value, duplicate_of or candidate_id
+    if root != vacancy.duplicate_of_id:
+        vacancy.duplicate_of_id = root
+        JobVacancies.objects.filter(id=vacancy.id).update(duplicate_of=root)
+        funnel.invalidate(company_ids=[vacancy.company_id])
+
+
+def find(parents, item):
+    while parents[item] != item:
+        parents[item] = parents[parents[item]]
+        item = parents[item]
+    return item
+
+
+def cluster(batch_size=1000):
+    """
+    Recomputes every signature, then groups vacancies sharing a bucket into
+    clusters with a union-find. The oldest vacancy of a cluster is its root.
+    Returns the number of vacancies marked as duplicates.
+    """
+    threshold = settings.VACANCY_DUPLICATE_THRESHOLD
+    minhashes = {}
+    last_id = 0
+    while True:
+        batch = list(JobVacancies.objects.filter(id__gt=last_id).order_by("id")[:batch_size])
+        if not batch:
+            break
+        minhashes.update(
+            (vacancy_id, minhash) for vacancy_id, minhash in store(batch).items() if minhash is not None
+        )
+        last_id = batch[-1].id
+
+    parents = {vacancy_id: vacancy_id for vacancy_id in minhashes}
+    rows = VacancyBand.objects.order_by("band", "bucket", "vacancy__company", "vacancy").values_list(
+        "band", "bucket", "vacancy__company", "vacancy"
+    )
+    group, key = [], None
+    for band, bucket, company_id, vacancy_id in rows.iterator(chunk_size=5000):
+        if (band, bucket, company_id) != key:
+            group, key = [], (band, bucket, company_id)
+        for other in group:
+            first, second = find(parents, other), find(parents, vacancy_id)
+            if first != second and similarity(minhashes[other], minhashes[vacancy_id]) >= threshold:
+                parents[max(first, second)] = min(first, second)
+        if len(group) < MAX_BUCKET:
+            group.append(vacancy_id)
+
+    roots = {vacancy_id: find(parents, vacancy_id) for vacancy_id in parents}
+    changed = []
+    for vacancy in JobVacancies.objects.only("id", "company", "duplicate_of").iterator(chunk_size=5000):
+        root = roots.get(vacancy.id, vacancy.id)
+        root = root if root != vacancy.id else None
+        if vacancy.duplicate_of_id != root:
+            vacancy.duplicate_of_id = root
+            changed.append(vacancy)
+    JobVacancies.objects.bulk_update(changed, ["duplicate_of"], batch_size=batch_size)
+    funnel.invalidate(company_ids={vacancy.company_id for vacancy in changed})
+    return sum(1 for vacancy_id, root in roots.items() if vacancy_id != root)
@@ -0,0 +1,89 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.authentification.models import Favourites, JobApply, JobVacancies
+from apps.enrolls.services import trending, viewers
+
+
+def count_of(queryset, field):
+    counted = queryset.values(field).annotate(number=Count('*')).values('number')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def annotate_vacancies(queryset, user=None):
+    # Everything JobVacanciesListSerializer counts per row, as correlated
+    # subqueries so the list is one query instead of seven per vacancy.
+    queryset = queryset.annotate(
+        applied_count=count_of(JobApply.objects.filter(jobs=OuterRef('pk')), 'jobs'),
+        favorite_count=count_of(Favourites.objects.filter(jobs=OuterRef('pk')), 'jobs'),
+        viewer_count=viewers.total_count('seen'),
+        looked_count=viewers.total_count('looked'),
+    )
+
+    if user is not None and user.is_authenticated:
+        user_applies = JobApply.objects.filter(jobs=OuterRef('pk'), user=user)
+        return queryset.annotate(
+            is_favorite=Exists(Favourites.objects.filter(jobs=OuterRef('pk'), user=user)),
+            is_applied=Exists(user_applies),
+            is_status=Subquery(user_applies.order_by('-id').values('jobs_status__name')[:1]),
+        )
+    return queryset.annotate(is_favorite=Value(False), is_applied=Value(False), is_status=Value(None))
+
+
+def favorite_vacancies(user):
+    return annotate_vacancies(
+        JobVacancies.objects.filter(vacancies__user=user)
+        .select_related('job_category', 'job_type', 'company')
+        .prefetch_related('company__hrs', 'company__countries')
+        .annotate(favorite_id=F('vacancies__id')),
+        user,
+    )
+
+
+# A favorite counts towards trending from noon of the day it was added, the
+# date the row keeps, so removing it takes back exactly what adding it gave
+# and toggling back and forth leaves the score where it was
+def add_favorites(user, vacancy_ids):
+    vacancy_ids = set(JobVacancies.objects.filter(id__in=vacancy_ids).values_list('id', flat=True))
+    existing = set(Favourites.objects.filter(user=user, jobs__in=vacancy_ids).values_list('jobs', flat=True))
+    # get_or_create reports which rows this call inserted; a row a concurrent
+    # request added in between is found, not created, and isn't scored twice
+    with transaction.atomic():
+        created = []
+        for vacancy_id in sorted(vacancy_ids - existing):
+            favourite, inserted = Favourites.objects.get_or_create(user=user, jobs_id=vacancy_id)
+            if inserted:
+                created.append(favourite)
+        if created:
+            trending.record(
+                [favourite.jobs_id for favourite in created], "favorite", trending.day_start(created[0].created_at)
+            )
+    return sorted(vacancy_ids)
+
+
+def remove_favorites(user, vacancy_ids):
+    # Nothing references table_favourites, so this is a single DELETE; the
+    # rows are locked first so a concurrent removal can't withdraw them twice
+    with transaction.atomic():
+        rows = list(
+            Favourites.objects.select_for_update()
+            .filter(user=user, jobs__in=vacancy_ids)
+            .values_list('id', 'jobs', 'created_at')
+        )
+        Favourites.objects.filter(id__in=[row_id for row_id, _, _ in rows]).delete()
+        by_day = defaultdict(list)
+        for _, vacancy_id, day in rows:
+            by_day[day].append(vacancy_id)
+        for day, ids in by_day.items():
+            trending.withdraw(ids, "favorite", trending.day_start(day))
+    return len(rows)
+
+
+def toggle_favorite(user, vacancy):
+    if remove_favorites(user, [vacancy.id]):
+        return False
+    add_favorites(user, [vacancy.id])
+    return True
@@ -0,0 +1,170 @@
+from statistics import median
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.authentification.models import (
+    DECISION_STATUSES,
+    STATUS_ACCEPTED,
+    STATUS_REJECTED,
+    ApplicationStatusTransition,
+    HrCompany,
+    JobApply,
+)
+from apps.company.services.dashboard import dashboard_keys
+from apps.company.services.subsidiaries import ancestor_ids, company_scope
+
+
+def funnel_key(kind, object_id):
+    return f"funnel:{kind}:{object_id}"
+
+
+def invalidate(vacancy_ids=(), company_ids=(), tree_ids=()):
+    # tree_ids are extra subtree roots, e.g. the ancestors a company was just moved away from
+    keys = [funnel_key("vacancy", vacancy_id) for vacancy_id in vacancy_ids if vacancy_id]
+    company_ids = [company_id for company_id in company_ids if company_id]
+    keys += [funnel_key(kind, company_id) for kind in ("company", "company-collapsed") for company_id in company_ids]
+    if company_ids:
+        # Subtree funnels and dashboards of every ancestor include this company's numbers too
+        tree_ids = set(tree_ids) | {
+            ancestor_id
+            for path in HrCompany.objects.filter(id__in=company_ids).values_list('path', flat=True)
+            for ancestor_id in ancestor_ids(path)
+        }
+        keys += [
+            funnel_key(kind, ancestor_id)
+            for kind in ("company-tree", "company-tree-collapsed")
+            for ancestor_id in tree_ids
+        ]
+        keys += dashboard_keys(company_ids, tree_ids)
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_applies(job_applies):
+    invalidate(
+        {job_apply.jobs_id for job_apply in job_applies},
+        {job_apply.jobs.company_id for job_apply in job_applies if job_apply.jobs_id},
+    )
+
+
+def record_transitions(job_applies, from_status_ids, to_status_id, user=None):
+    # Append-only: one row per application and change, written with the change itself
+    now = timezone.now()
+    ApplicationStatusTransition.objects.bulk_create(
+        [
+            ApplicationStatusTransition(
+                job_apply=job_apply,
+                from_status_id=from_status_ids.get(job_apply.id),
+                to_status_id=to_status_id,
+                changed_by=user if user and user.is_authenticated else None,
+                created_at=now,
+            )
+            for job_apply in job_applies
+        ]
+    )
+    invalidate_applies(job_applies)
+
+
+def record_transition(job_apply, from_status_id, to_status_id, user=None):
+    record_transitions([job_apply], {job_apply.id: from_status_id}, to_status_id, user)
+
+
+def mark_reviewed(job_apply):
+    if job_apply.reviewed_at:
+        return False
+    updated = JobApply.objects.filter(id=job_apply.id, reviewed_at__isnull=True).update(
+        reviewed_at=timezone.now()
+    )
+    if updated:
+        invalidate_applies([job_apply])
+    return bool(updated)
+
+
+def seconds_median(values):
+    values = [value.total_seconds() for value in values if value is not None]
+    return round(median(values)) if values else None
+
+
+EMPTY = {"applied": 0, "reviewed": 0, "accepted": 0, "rejected": 0}
+
+
+def vacancy_group(field, collapse_duplicates):
+    # Collapsed, applications to a duplicate count towards its cluster root
+    return Coalesce(f'{field}__duplicate_of', field) if collapse_duplicates else F(field)
+
+
+def collect(applies, collapse_duplicates=False):
+    # One grouped count and one grouped transition scan, keyed by vacancy id
+    result = {}
+    for row in applies.annotate(vacancy=vacancy_group('jobs', collapse_duplicates)).values('vacancy').annotate(
+        applied=Count('id'),
+        reviewed=Count('id', filter=Q(reviewed_at__isnull=False) | Q(jobs_status__in=DECISION_STATUSES)),
+        accepted=Count('id', filter=Q(jobs_status=STATUS_ACCEPTED)),
+        rejected=Count('id', filter=Q(jobs_status=STATUS_REJECTED)),
+    ).order_by():
+        vacancy_id = row.pop('vacancy')
+        result[vacancy_id] = dict(row, decision_times=[], review_times=[])
+
+    for row in (
+        ApplicationStatusTransition.objects.filter(job_apply__in=applies)
+        .annotate(vacancy=vacancy_group('job_apply__jobs', collapse_duplicates))
+        .values('job_apply', 'vacancy', 'job_apply__reviewed_at')
+        .annotate(
+            applied_at=Min('created_at', filter=Q(from_status__isnull=True)),
+            decided_at=Min('created_at', filter=Q(to_status__in=DECISION_STATUSES)),
+        )
+        .order_by()
+    ):
+        funnel = result.get(row['vacancy'])
+        if funnel is None or row['applied_at'] is None:
+            continue
+        if row['decided_at']:
+            funnel['decision_times'].append(row['decided_at'] - row['applied_at'])
+        if row['job_apply__reviewed_at']:
+            funnel['review_times'].append(row['job_apply__reviewed_at'] - row['applied_at'])
+    return result
+
+
+def finish(funnel):
+    result = {name: funnel.get(name, 0) for name in EMPTY}
+    result['median_time_to_review'] = seconds_median(funnel.get('review_times', []))
+    result['median_time_to_decision'] = seconds_median(funnel.get('decision_times', []))
+    return result
+
+
+def vacancy_funnel(vacancy):
+    key = funnel_key("vacancy", vacancy.id)
+    result = cache.get(key)
+    if result is None:
+        funnel = collect(JobApply.objects.filter(jobs=vacancy)).get(vacancy.id, {})
+        result = dict(finish(funnel), vacancy=vacancy.id)
+        cache.set(key, result, settings.FUNNEL_CACHE_TTL)
+    return result
+
+
+def company_funnel(company, include_subsidiaries=False, collapse_duplicates=False):
+    kind = "company-tree" if include_subsidiaries else "company"
+    key = funnel_key(f"{kind}-collapsed" if collapse_duplicates else kind, company.id)
+    result = cache.get(key)
+    if result is None:
+        funnels = collect(
+            JobApply.objects.filter(company_scope(company, include_subsidiaries, prefix="jobs__company")),
+            collapse_duplicates,
+        )
+        total = dict(EMPTY, decision_times=[], review_times=[])
+        for funnel in funnels.values():
+            for name, value in funnel.items():
+                total[name] += value
+
+        result = dict(
+            finish(total),
+            company=company.id,
+            vacancies=[dict(finish(funnel), vacancy=vacancy_id) for vacancy_id, funnel in sorted(funnels.items())],
+        )
+        cache.set(key, result, settings.FUNNEL_CACHE_TTL)
+    return result
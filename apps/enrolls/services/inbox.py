@@ -0,0 +1,48 @@
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.authentification.models import JobApply, ResumeUser
+from apps.company.services.subsidiaries import hr_companies
+
+
+def hr_applications(user, status=None, date_from=None, date_to=None, vacancy=None, include_subsidiaries=False):
+    if include_subsidiaries:
+        applies = JobApply.objects.filter(jobs__company__in=hr_companies(user, include_subsidiaries=True))
+    else:
+        applies = JobApply.objects.filter(jobs__company__hrs=user)
+    if status:
+        applies = applies.filter(jobs_status=status)
+    if date_from:
+        applies = applies.filter(created_at__gte=date_from)
+    if date_to:
+        applies = applies.filter(created_at__lte=date_to)
+    if vacancy:
+        applies = applies.filter(jobs=vacancy)
+    return applies
+
+
+def hr_inbox(user, category=None, level=None, **filters):
+    # Resumes sent to any of the HR's companies. Everything stays in SQL as
+    # correlated subqueries on table_job_apply, so the cost follows the HR's
+    # own applications rather than the size of the platform.
+    applies = hr_applications(user, **filters).filter(resume=OuterRef('pk'))
+    job_count = (
+        JobApply.objects.filter(resume=OuterRef('pk'))
+        .values('resume')
+        .annotate(number=Count('id'))
+        .values('number')
+    )
+
+    queryset = (
+        ResumeUser.objects.select_related('user', 'job_tag', 'level_of_education')
+        .filter(Exists(applies))
+        .annotate(
+            last_applied=Subquery(applies.order_by('-id').values('id')[:1]),
+            apply_count=Coalesce(Subquery(job_count, output_field=IntegerField()), Value(0)),
+        )
+    )
+    if category:
+        queryset = queryset.filter(job_tag=category)
+    if level:
+        queryset = queryset.filter(level_of_education=level)
+    return queryset
@@ -0,0 +1,231 @@
+import math
+import re
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from scipy import sparse
+
+from apps.authentification.models import JobVacancies, MatchTerm, ResumeUser
+from apps.resume.services.search import texts
+
+TOKEN = re.compile(r"\w+")
+MAX_TERM_LENGTH = 64
+# Counter columns of MatchTerm, one per side of a match
+CORPORA = {"resumes": ResumeUser, "vacancies": JobVacancies}
+
+
+def terms(text):
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN.findall((text or "").lower())
+        if len(token) > 1 and not token.isdigit()
+    ]
+
+
+def weigh(parts):
+    # Stored vectors are lnc: log term frequency, no idf, cosine normalised.
+    # Without idf a vector depends on its own row only, so a write never has to
+    # touch any other vector; idf is applied to the query side when scoring
+    counts = Counter()
+    for weight, tokens in parts:
+        for token in tokens:
+            counts[token] += weight
+    weights = {token: 1 + math.log(count) for token, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    return {token: round(weight / norm, 6) for token, weight in weights.items()} if norm else {}
+
+
+def category_terms(category_id):
+    return [f"category:{category_id}"] if category_id else []
+
+
+def resume_vector(resume):
+    experienced = resume.experience_years is not None and resume.experience_years >= 1
+    return weigh([
+        (3, terms(resume.position) + terms(resume.latest_position)),
+        (2, category_terms(resume.job_tag_id) + (["experience:yes"] if experienced else [])),
+        (1, terms(resume.about) + terms(resume.content)),
+        (1, terms(" ".join(texts(resume.job_experiences)))),
+    ])
+
+
+def vacancy_vector(vacancy):
+    return weigh([
+        (3, terms(vacancy.title) + terms(" ".join(texts(vacancy.skills)))),
+        (2, category_terms(vacancy.job_category_id) + (["experience:yes"] if vacancy.experience else [])),
+        (2, terms(vacancy.qualifications)),
+        (1, terms(vacancy.description)),
+    ])
+
+
+def adjust(field, added, removed):
+    if added:
+        MatchTerm.objects.bulk_create([MatchTerm(term=term) for term in added], ignore_conflicts=True)
+        MatchTerm.objects.filter(term__in=added).update(**{field: F(field) + 1})
+    if removed:
+        MatchTerm.objects.filter(term__in=removed).update(**{field: F(field) - 1})
+
+
+def update_vectors(field, queryset, build):
+    # The row lock keeps two writers from diffing against the same old vector,
+    # which would count its terms twice
+    with transaction.atomic():
+        for instance in queryset.select_for_update():
+            vector = build(instance)
+            previous = instance.match_vector or {}
+            adjust(field, vector.keys() - previous.keys(), previous.keys() - vector.keys())
+            type(instance).objects.filter(id=instance.id).update(match_vector=vector)
+
+
+def update_resumes(resume_ids):
+    update_vectors("resumes", ResumeUser.objects.filter(id__in=resume_ids), resume_vector)
+
+
+def update_vacancies(vacancy_ids):
+    update_vectors("vacancies", JobVacancies.objects.filter(id__in=vacancy_ids), vacancy_vector)
+
+
+def release(field, ids):
+    # Call before deleting rows, so their terms stop counting towards the idf
+    model = CORPORA[field]
+    with transaction.atomic():
+        removed = Counter()
+        vectors = model.objects.select_for_update().filter(id__in=ids, match_vector__isnull=False)
+        for vector in vectors.values_list("match_vector", flat=True):
+            removed.update(vector.keys())
+        by_count = {}
+        for term, count in removed.items():
+            by_count.setdefault(count, []).append(term)
+        for count, grouped in by_count.items():
+            MatchTerm.objects.filter(term__in=grouped).update(**{field: F(field) - count})
+        model.objects.filter(id__in=ids).update(match_vector=None)
+
+
+def rebuild(batch_size=1000):
+    # Recomputes every vector, then recounts the terms from scratch; counts can
+    # drift when rows go away without release(), e.g. with a deleted company
+    counts = {field: Counter() for field in CORPORA}
+    indexed = dict.fromkeys(CORPORA, 0)
+    builders = {"resumes": resume_vector, "vacancies": vacancy_vector}
+    for field, model in CORPORA.items():
+        last_id = 0
+        while True:
+            batch = list(model.objects.filter(id__gt=last_id).order_by("id")[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                for instance in batch:
+                    vector = builders[field](instance)
+                    counts[field].update(vector.keys())
+                    model.objects.filter(id=instance.id).update(match_vector=vector)
+            indexed[field] += len(batch)
+            last_id = batch[-1].id
+
+    with transaction.atomic():
+        MatchTerm.objects.all().delete()
+        MatchTerm.objects.bulk_create(
+            [
+                MatchTerm(term=term, resumes=counts["resumes"][term], vacancies=counts["vacancies"][term])
+                for term in counts["resumes"].keys() | counts["vacancies"].keys()
+            ],
+            batch_size=batch_size,
+        )
+    for field in CORPORA:
+        cache.delete(f"match-corpus:{field}")
+    return indexed
+
+
+def corpus_size(field):
+    return cache.get_or_set(
+        f"match-corpus:{field}",
+        lambda: CORPORA[field].objects.filter(match_vector__isnull=False).count(),
+        settings.MATCH_CORPUS_CACHE_TTL,
+    )
+
+
+def inverse_frequency(total, frequency):
+    # Smoothed, so a term missing from the corpus still gets a finite weight
+    return math.log((1 + total) / (1 + max(frequency, 0))) + 1
+
+
+def idf(field, query_terms):
+    total = corpus_size(field)
+    frequencies = dict(MatchTerm.objects.filter(term__in=query_terms).values_list("term", field))
+    return {term: inverse_frequency(total, frequencies.get(term, 0)) for term in query_terms}
+
+
+def query(vector, weights):
+    # ltc side of the lnc.ltc scheme: the stored log tf times idf, renormalised
+    columns = list(vector)
+    values = np.array([vector[term] * weights[term] for term in columns], dtype=np.float32)
+    norm = np.linalg.norm(values)
+    return columns, (values / norm if norm else values)
+
+
+def cosine(columns, values, documents, batch_size=None):
+    # documents are (id, vector) pairs; each batch becomes one sparse matrix
+    # restricted to the query's terms, scored with a single product
+    batch_size = batch_size or settings.MATCH_BATCH_SIZE
+    positions = {term: index for index, term in enumerate(columns)}
+    documents = iter(documents)
+    scores = {}
+    while True:
+        batch = list(islice(documents, batch_size))
+        if not batch:
+            return scores
+        rows, cols, data = [], [], []
+        for row, (_, vector) in enumerate(batch):
+            vector = vector or {}
+            for term in vector.keys() & positions.keys():
+                rows.append(row)
+                cols.append(positions[term])
+                data.append(vector[term])
+        matrix = sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), (rows, cols)), shape=(len(batch), len(columns))
+        )
+        for (document_id, _), value in zip(batch, matrix @ values):
+            scores[document_id] = round(float(value), 4)
+
+
+def score(vector, documents, field):
+    """
+    Cosine similarity of vector, weighted by the idf of the field corpus, with
+    each (id, vector) in documents, as {id: score between 0 and 1}.
+    """
+    if not vector:
+        return {document_id: 0.0 for document_id, _ in documents}
+    return cosine(*query(vector, idf(field, list(vector))), documents)
+
+
+def vacancy_query(vacancy):
+    # Vacancies written before the matching engine have no stored vector yet
+    return vacancy.match_vector or vacancy_vector(vacancy)
+
+
+def resume_scores(vacancy, resumes):
+    documents = resumes.values_list("id", "match_vector").iterator(chunk_size=settings.MATCH_BATCH_SIZE)
+    return score(vacancy_query(vacancy), documents, "resumes")
+
+
+def applicant_scores(vacancy, applications):
+    # A user may apply with more than one resume, the best match counts
+    owners = {}
+    documents = []
+    rows = applications.filter(resume__isnull=False).values_list("resume", "resume__user", "resume__match_vector")
+    for resume_id, user_id, vector in rows:
+        owners[resume_id] = user_id
+        documents.append((resume_id, vector))
+    scores = {}
+    for resume_id, value in score(vacancy_query(vacancy), documents, "resumes").items():
+        user_id = owners[resume_id]
+        scores[user_id] = max(scores.get(user_id, 0.0), value)
+    return scores
+
+
+def ranked(ids, scores):
+    return sorted(ids, key=lambda item: (-scores.get(item, 0.0), -item))
@@ -0,0 +1,288 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from scipy import sparse
+
+from apps.authentification.models import JobVacancies, MatchTerm, VacancyNeighbor
+from apps.enrolls.services import matching
+from apps.notification.services.outbox import enqueue
+
+# Share of each feature in the similarity score; text is the tf-idf cosine of
+# the match vectors, which already carry title, skills and category
+FEATURE_WEIGHTS = {"text": 0.6, "category": 0.15, "job_type": 0.1, "salary": 0.15}
+# Salaries within the same factor of 1.5 share a band; neighbouring bands count half
+SALARY_BAND_RATIO = 1.5
+BANDS = 64
+COLUMNS = ("id", "job_category", "job_type", "salary", "match_vector")
+
+
+@dataclass
+class Features:
+    ids: list
+    text: sparse.csr_matrix
+    category: np.ndarray
+    job_type: np.ndarray
+    band: np.ndarray
+    vocabulary: dict
+
+    @cached_property
+    def columns(self):
+        # Target side, transposed once: text, then one-hot category and job
+        # type, then the salary band spread half a point onto its neighbours
+        band = onehot(self.band, BANDS)
+        spread = band + 0.5 * onehot(self.band - 1, BANDS) + 0.5 * onehot(self.band + 1, BANDS)
+        return sparse.hstack([
+            self.text,
+            onehot(self.category, self.width("category")),
+            onehot(self.job_type, self.width("job_type")),
+            spread,
+        ]).T.tocsr()
+
+    def width(self, feature):
+        values = getattr(self, feature)
+        return int(values.max()) + 1 if len(values) else 1
+
+
+def salary_band(salary):
+    if not salary or salary <= 0:
+        return -1
+    return min(max(math.floor(math.log(salary, SALARY_BAND_RATIO)), 0), BANDS - 1)
+
+
+def onehot(values, width):
+    rows = np.nonzero((values >= 0) & (values < width))[0]
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, values[rows])), shape=(len(values), width)
+    )
+
+
+def idf_table():
+    total = matching.corpus_size("vacancies")
+    return {
+        term: matching.inverse_frequency(total, frequency)
+        for term, frequency in MatchTerm.objects.filter(vacancies__gt=0).values_list("term", "vacancies")
+    }
+
+
+def features(rows, idf, vocabulary=None):
+    """
+    Feature arrays for rows of COLUMNS. Text rows are tf-idf, normalised over
+    all their terms; with a vocabulary, terms outside it are then dropped,
+    otherwise the vocabulary is grown from the rows.
+    """
+    grow = vocabulary is None
+    vocabulary = {} if grow else vocabulary
+    ids, category, job_type, band = [], [], [], []
+    indices, cols, data = [], [], []
+    for row, (vacancy_id, category_id, job_type_id, salary, vector) in enumerate(rows):
+        ids.append(vacancy_id)
+        category.append(category_id or -1)
+        job_type.append(job_type_id or -1)
+        band.append(salary_band(salary))
+        weights = {term: value * idf.get(term, 1.0) for term, value in (vector or {}).items()}
+        norm = math.sqrt(sum(value * value for value in weights.values()))
+        for term, value in weights.items():
+            if grow:
+                vocabulary.setdefault(term, len(vocabulary))
+            if norm and term in vocabulary:
+                indices.append(row)
+                cols.append(vocabulary[term])
+                data.append(value / norm)
+    text = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), (indices, cols)), shape=(len(ids), len(vocabulary))
+    )
+    return Features(ids, text, np.array(category), np.array(job_type), np.array(band), vocabulary)
+
+
+def similarity(source, target):
+    """
+    Scores of every source against every target as a dense float32 block.
+    Matching category, job type and salary band are one-hot columns next to
+    the text, so the weighted sum is a single sparse product.
+    """
+    rows = sparse.hstack([
+        FEATURE_WEIGHTS["text"] * source.text,
+        FEATURE_WEIGHTS["category"] * onehot(source.category, target.width("category")),
+        FEATURE_WEIGHTS["job_type"] * onehot(source.job_type, target.width("job_type")),
+        FEATURE_WEIGHTS["salary"] * onehot(source.band, BANDS),
+    ]).tocsr()
+    return (rows @ target.columns).toarray()
+
+
+def top_neighbors(scores, source_ids, target_ids, size):
+    """
+    Best targets of every source as {source_id: [(target_id, score), ...]},
+    never the vacancy itself.
+    """
+    columns = {target_id: column for column, target_id in enumerate(target_ids)}
+    for row, source_id in enumerate(source_ids):
+        if source_id in columns:
+            scores[row, columns[source_id]] = -1
+    count = min(size, len(target_ids))
+    if not count:
+        return {source_id: [] for source_id in source_ids}
+    best = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+    ranked = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-ranked, axis=1, kind="stable")
+    best = np.take_along_axis(best, order, axis=1)
+    return {
+        source_id: [
+            (target_ids[column], round(float(scores[row, column]), 4))
+            for column in best[row] if scores[row, column] > 0
+        ]
+        for row, source_id in enumerate(source_ids)
+    }
+
+
+def candidates(idf):
+    # Only active vacancies are worth suggesting
+    rows = JobVacancies.objects.filter(is_activate=True).values_list(*COLUMNS)
+    return features(rows.iterator(chunk_size=2000), idf)
+
+
+def related(rows, idf, listed=()):
+    """
+    Active vacancies worth rescoring the rows against: those of the same
+    categories, those holding one of the rows' strongest terms and those
+    whose lists already hold a row. The rest share neither category nor text
+    and score at most the job type and salary weights.
+    """
+    categories, terms = set(), set()
+    for _, category_id, _, _, vector in rows:
+        if category_id:
+            categories.add(category_id)
+        strongest = sorted((vector or {}).items(), key=lambda item: -item[1] * idf[item[0]])
+        terms.update(term for term, _ in strongest[:settings.SIMILAR_VACANCIES_CANDIDATE_TERMS])
+    match = Q(job_category__in=categories) | Q(id__in=listed)
+    if terms:
+        match |= Q(match_vector__has_any_keys=sorted(terms))
+    return JobVacancies.objects.filter(match, is_activate=True).values_list(*COLUMNS)
+
+
+def replace_lists(lists):
+    size = settings.SIMILAR_VACANCIES_SIZE
+    with transaction.atomic():
+        VacancyNeighbor.objects.filter(vacancy__in=list(lists)).delete()
+        VacancyNeighbor.objects.bulk_create(
+            [
+                VacancyNeighbor(vacancy_id=vacancy_id, neighbor_id=neighbor_id, score=score)
+                for vacancy_id, neighbors in lists.items()
+                for neighbor_id, score in neighbors
+            ]
+        )
+        # Each list's floor is kept on its vacancy, so refresh() reads it with
+        # the candidates instead of aggregating the whole table
+        JobVacancies.objects.bulk_update(
+            [
+                JobVacancies(
+                    id=vacancy_id,
+                    neighbor_floor=min(score for _, score in neighbors) if len(neighbors) >= size else 0,
+                )
+                for vacancy_id, neighbors in lists.items()
+            ],
+            ["neighbor_floor"],
+            batch_size=1000,
+        )
+
+
+def rebuild(block_size=None):
+    # Full rebuild, block by block so a block of scores stays a few MB
+    block_size = block_size or settings.SIMILAR_VACANCIES_BLOCK_SIZE
+    size = settings.SIMILAR_VACANCIES_SIZE
+    idf = idf_table()
+    target = candidates(idf)
+    built = 0
+    last_id = 0
+    while True:
+        rows = list(JobVacancies.objects.filter(id__gt=last_id).order_by("id").values_list(*COLUMNS)[:block_size])
+        if not rows:
+            return built
+        source = features(rows, idf, target.vocabulary)
+        replace_lists(top_neighbors(similarity(source, target), source.ids, target.ids, size))
+        built += len(rows)
+        last_id = rows[-1][0]
+
+
+def refresh(payload):
+    """
+    Outbox handler for new and edited vacancies. Their own lists are rebuilt
+    from the related vacancies, and since similarity is symmetric the same
+    scores tell which of those lists they now belong to. Only the rows, terms
+    and lists around the changed vacancies are read; the nightly rebuild
+    catches what lies outside them.
+    """
+    size = settings.SIMILAR_VACANCIES_SIZE
+    rows = list(JobVacancies.objects.filter(id__in=payload["vacancies"]).values_list(*COLUMNS))
+    if not rows:
+        return
+    ids = [row[0] for row in rows]
+    active = set(JobVacancies.objects.filter(id__in=ids, is_activate=True).values_list("id", flat=True))
+    # Deactivated vacancies leave every list, which then has room again; the
+    # nightly rebuild refills the gap
+    gone = VacancyNeighbor.objects.filter(neighbor__in=set(ids) - active)
+    JobVacancies.objects.filter(id__in=gone.values("vacancy")).update(neighbor_floor=0)
+    gone.delete()
+    listing = defaultdict(list)
+    for vacancy_id, neighbor_id in VacancyNeighbor.objects.filter(neighbor__in=active).values_list("vacancy", "neighbor"):
+        listing[neighbor_id].append(vacancy_id)
+
+    terms = list({term for *_, vector in rows for term in vector or {}})
+    listed = {vacancy_id for vacancy_ids in listing.values() for vacancy_id in vacancy_ids}
+    found = list(related(rows, matching.idf("vacancies", terms), listed))
+    idf = matching.idf("vacancies", list({term for row in rows + found for term in row[4] or {}}))
+    target = features(found, idf)
+    source = features(rows, idf, target.vocabulary)
+    scores = similarity(source, target)
+    replace_lists(top_neighbors(scores.copy(), source.ids, target.ids, size))
+
+    # Lowest score on every full list, read after the writes above; anything
+    # above it gets in
+    columns = {vacancy_id: column for column, vacancy_id in enumerate(target.ids)}
+    floors = np.zeros(len(target.ids))
+    for vacancy_id, floor in JobVacancies.objects.filter(id__in=target.ids).values_list("id", "neighbor_floor"):
+        floors[columns[vacancy_id]] = floor
+
+    changes = defaultdict(dict)
+    for row, vacancy_id in enumerate(source.ids):
+        if vacancy_id not in active:
+            continue
+        # Lists already holding the vacancy take its new score even if it dropped
+        entering = [target.ids[column] for column in np.nonzero(scores[row] > floors)[0]]
+        for target_id in entering + listing[vacancy_id]:
+            if target_id != vacancy_id and target_id in columns:
+                changes[target_id][vacancy_id] = round(float(scores[row, columns[target_id]]), 4)
+    if not changes:
+        return
+
+    current = defaultdict(dict)
+    for vacancy_id, neighbor_id, score in VacancyNeighbor.objects.filter(
+        vacancy__in=list(changes)
+    ).values_list("vacancy", "neighbor", "score"):
+        current[vacancy_id][neighbor_id] = score
+    updated = {}
+    for vacancy_id, change in changes.items():
+        merged = {**current[vacancy_id], **change}
+        ranked = sorted(
+            ((neighbor_id, score) for neighbor_id, score in merged.items() if score > 0),
+            key=lambda item: (-item[1], -item[0]),
+        )
+        updated[vacancy_id] = ranked[:size]
+    replace_lists(updated)
+
+
+def schedule(vacancy_ids):
+    # Rebuilt by the outbox dispatcher once the write commits
+    enqueue("similar_vacancies", {"vacancies": sorted(vacancy_ids)})
+
+
+def similar(vacancy, limit=None):
+    # Lists hold SIMILAR_VACANCIES_SIZE entries, asking for more gets no more
+    limit = min(limit or settings.SIMILAR_VACANCIES_SIZE, settings.SIMILAR_VACANCIES_SIZE)
+    queryset = VacancyNeighbor.objects.filter(vacancy=vacancy, neighbor__is_activate=True).order_by("-score")
+    return list(queryset.values_list("neighbor", "score")[:limit])
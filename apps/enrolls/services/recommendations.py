@@ -0,0 +1,227 @@
+from collections import defaultdict
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from scipy import sparse
+
+from apps.authentification.models import (
+    Favourites,
+    JobApply,
+    JobVacancies,
+    RecommendationList,
+    ResumeUser,
+)
+from apps.enrolls.services import matching
+from apps.notification.services.outbox import enqueue
+
+# How much each part of a user's history counts towards their profile; every
+# part is averaged first, so fifty applications do not drown out the resume
+SOURCES = {"resumes": 1.0, "applications": 0.6, "favorites": 0.4}
+
+
+def chunks(items, size):
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def profile_users():
+    # Everyone with something to build a profile from
+    return sorted(
+        set(ResumeUser.objects.filter(user__isnull=False).values_list("user", flat=True))
+        | set(Favourites.objects.filter(user__isnull=False).values_list("user", flat=True))
+        | set(JobApply.objects.filter(user__isnull=False).values_list("user", flat=True))
+    )
+
+
+def profiles(user_ids):
+    """
+    Profile vectors of the users as {user_id: {term: weight}}, and the
+    vacancies each of them already applied to.
+    """
+    rows = {
+        "resumes": ResumeUser.objects.filter(user__in=user_ids, match_vector__isnull=False)
+        .values_list("user", "match_vector"),
+        "applications": JobApply.objects.filter(user__in=user_ids, jobs__match_vector__isnull=False)
+        .values_list("user", "jobs__match_vector"),
+        "favorites": Favourites.objects.filter(user__in=user_ids, jobs__match_vector__isnull=False)
+        .values_list("user", "jobs__match_vector"),
+    }
+    vectors = defaultdict(lambda: defaultdict(float))
+    for source, weight in SOURCES.items():
+        sums = defaultdict(lambda: defaultdict(float))
+        counts = defaultdict(int)
+        for user_id, vector in rows[source]:
+            counts[user_id] += 1
+            for term, value in vector.items():
+                sums[user_id][term] += value
+        for user_id, terms in sums.items():
+            for term, value in terms.items():
+                vectors[user_id][term] += weight * value / counts[user_id]
+
+    applied = defaultdict(set)
+    for user_id, vacancy_id in JobApply.objects.filter(user__in=user_ids).values_list("user", "jobs"):
+        applied[user_id].add(vacancy_id)
+    return vectors, applied
+
+
+def vacancy_matrix(vacancies):
+    # vacancies are (id, vector) pairs; one row per vacancy, one column per term
+    ids = []
+    vocabulary = {}
+    rows, cols, data = [], [], []
+    for row, (vacancy_id, vector) in enumerate(vacancies):
+        ids.append(vacancy_id)
+        for term, value in vector.items():
+            rows.append(row)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+            data.append(value)
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), (rows, cols)), shape=(len(ids), len(vocabulary))
+    )
+    return ids, vocabulary, matrix
+
+
+def profile_matrix(user_ids, vectors, vocabulary):
+    # Query side of the match: profile weight times idf, normalised over the
+    # whole profile, then cut down to the terms some vacancy actually has
+    weights = matching.idf("vacancies", list({term for user_id in user_ids for term in vectors[user_id]}))
+    rows, cols, data = [], [], []
+    for row, user_id in enumerate(user_ids):
+        query = {term: value * weights[term] for term, value in vectors[user_id].items()}
+        norm = np.sqrt(sum(value * value for value in query.values()))
+        for term, value in query.items():
+            if norm and term in vocabulary:
+                rows.append(row)
+                cols.append(vocabulary[term])
+                data.append(value / norm)
+    return sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), (rows, cols)), shape=(len(user_ids), len(vocabulary))
+    )
+
+
+def top_matches(user_ids, vectors, applied, ids, vocabulary, matrix, size):
+    """
+    Best vacancies of every user as {user_id: [[vacancy_id, score], ...]},
+    scored with one sparse product for the whole batch of users.
+    """
+    if not ids:
+        return {user_id: [] for user_id in user_ids}
+    # The product stays sparse: a row only holds the vacancies sharing a term
+    # with the profile, and the top of each row is taken from those entries
+    scores = (profile_matrix(user_ids, vectors, vocabulary) @ matrix.T).tocsr()
+    columns = {vacancy_id: column for column, vacancy_id in enumerate(ids)}
+    result = {}
+    for row, user_id in enumerate(user_ids):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        row_columns, row_scores = scores.indices[start:end], scores.data[start:end]
+        skipped = [columns[vacancy_id] for vacancy_id in applied.get(user_id, ()) if vacancy_id in columns]
+        keep = (row_scores > 0) & ~np.isin(row_columns, skipped)
+        row_columns, row_scores = row_columns[keep], row_scores[keep]
+        count = min(size, len(row_scores))
+        if count:
+            best = np.argpartition(-row_scores, count - 1)[:count]
+            best = best[np.lexsort((row_columns[best], -row_scores[best]))]
+        else:
+            best = []
+        result[user_id] = [[ids[row_columns[index]], round(float(row_scores[index]), 4)] for index in best]
+    return result
+
+
+def active_vacancies(queryset=None):
+    queryset = JobVacancies.objects.all() if queryset is None else queryset
+    return queryset.filter(is_activate=True, match_vector__isnull=False).values_list("id", "match_vector")
+
+
+def store(top):
+    now = timezone.now()
+    RecommendationList.objects.bulk_create(
+        [RecommendationList(user_id=user_id, matches=matches, built_at=now) for user_id, matches in top.items()],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["matches", "built_at"],
+    )
+
+
+def build(user_ids=None, batch_size=500):
+    # Batch refresh of every stored list, meant to run nightly
+    size = settings.RECOMMENDATIONS_SIZE
+    ids, vocabulary, matrix = vacancy_matrix(active_vacancies().iterator(chunk_size=2000))
+    built = 0
+    for batch in chunks(profile_users() if user_ids is None else user_ids, batch_size):
+        vectors, applied = profiles(batch)
+        store(top_matches(batch, vectors, applied, ids, vocabulary, matrix, size))
+        built += len(batch)
+    return built
+
+
+def build_users(payload):
+    # Outbox handler for users asking before the nightly build reached them
+    build(payload["users"])
+
+
+def recommended(user):
+    # Lists are only ever built off the request; a user without one gets an
+    # empty list now and theirs once the dispatcher has run
+    matches = RecommendationList.objects.filter(user=user).values_list("matches", flat=True).first()
+    if matches is None:
+        enqueue(
+            "recommendations_build",
+            {"users": [user.id]},
+            dedup_key=f"recommendations_build:{user.id}:{timezone.localdate()}",
+        )
+        return []
+    return matches
+
+
+def schedule(vacancy_ids):
+    # Merged into the stored lists by the outbox dispatcher once the write commits
+    enqueue("recommendations", {"vacancies": sorted(vacancy_ids)})
+
+
+def sharing_users(user_ids, terms):
+    # Users with a resume, application or favorite holding one of the terms; a
+    # profile without any of them scores 0 against the vacancies
+    if not terms:
+        return set()
+    return (
+        set(ResumeUser.objects.filter(user__in=user_ids, match_vector__has_any_keys=terms).values_list("user", flat=True))
+        | set(JobApply.objects.filter(user__in=user_ids, jobs__match_vector__has_any_keys=terms).values_list("user", flat=True))
+        | set(Favourites.objects.filter(user__in=user_ids, jobs__match_vector__has_any_keys=terms).values_list("user", flat=True))
+    )
+
+
+def add_vacancies(payload, batch_size=500):
+    """
+    Outbox handler for new and edited vacancies: scores only those vacancies
+    and merges them into the stored lists. Profiles are only built for users
+    sharing a term with them; every other list just drops the old scores of
+    the vacancies. Users without a list get a complete one when they first
+    ask for it.
+    """
+    size = settings.RECOMMENDATIONS_SIZE
+    vacancy_ids = set(payload["vacancies"])
+    ids, vocabulary, matrix = vacancy_matrix(
+        active_vacancies(JobVacancies.objects.filter(id__in=vacancy_ids))
+    )
+    terms = list(vocabulary)
+    last_id = 0
+    while True:
+        stored = list(RecommendationList.objects.filter(user__gt=last_id).order_by("user")[:batch_size])
+        if not stored:
+            break
+        last_id = stored[-1].user_id
+        users = sorted(sharing_users([row.user_id for row in stored], terms))
+        vectors, applied = profiles(users)
+        top = top_matches(users, vectors, applied, ids, vocabulary, matrix, size)
+        changed = []
+        for row in stored:
+            # Edited or deactivated vacancies drop their old score first
+            matches = [match for match in row.matches if match[0] not in vacancy_ids]
+            if len(matches) == len(row.matches) and not top.get(row.user_id):
+                continue
+            row.matches = sorted(matches + top.get(row.user_id, []), key=lambda match: (-match[1], -match[0]))[:size]
+            changed.append(row)
+        RecommendationList.objects.bulk_update(changed, ["matches"])
@@ -0,0 +1,145 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import Trunc
+from django.utils.timezone import now
+
+from apps.authentification.models import ApplicationDailyRollup, JobApply
+
+GRANULARITIES = ("day", "week", "month")
+DIMENSIONS = ("category", "company", "status")
+
+
+def rollup_key(job_apply, status_id=None):
+    jobs = job_apply.jobs if job_apply.jobs_id else None
+    return (
+        job_apply.created_at,
+        jobs.job_category_id if jobs else None,
+        jobs.company_id if jobs else None,
+        status_id,
+    )
+
+
+def bump(deltas):
+    # One row per day × category × company × status; keys are applied in a fixed
+    # order so concurrent requests lock rows in the same order.
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    with transaction.atomic():
+        for key in sorted(deltas, key=lambda key: tuple(str(part) for part in key)):
+            day, category_id, company_id, status_id = key
+            rows = ApplicationDailyRollup.objects.filter(
+                day=day, category_id=category_id, company_id=company_id, status_id=status_id
+            )
+            row_id = rows.order_by('id').values_list('id', flat=True).first()
+            if row_id is None:
+                try:
+                    with transaction.atomic():
+                        ApplicationDailyRollup.objects.create(
+                            day=day,
+                            category_id=category_id,
+                            company_id=company_id,
+                            status_id=status_id,
+                            count=deltas[key],
+                        )
+                    continue
+                except IntegrityError:
+                    row_id = rows.order_by('id').values_list('id', flat=True).first()
+
+            ApplicationDailyRollup.objects.filter(id=row_id).update(count=F('count') + deltas[key])
+
+
+def application_created(job_apply):
+    bump({rollup_key(job_apply, job_apply.jobs_status_id): 1})
+
+
+def application_deleted(job_apply):
+    bump({rollup_key(job_apply, job_apply.jobs_status_id): -1})
+
+
+def application_status_changed(job_apply, previous_status_id):
+    applications_status_changed([job_apply], {job_apply.id: previous_status_id})
+
+
+def applications_status_changed(job_applies, previous_status_ids):
+    deltas = Counter()
+    for job_apply in job_applies:
+        previous_status_id = previous_status_ids.get(job_apply.id)
+        if previous_status_id == job_apply.jobs_status_id:
+            continue
+        deltas[rollup_key(job_apply, previous_status_id)] -= 1
+        deltas[rollup_key(job_apply, job_apply.jobs_status_id)] += 1
+    bump(deltas)
+
+
+def backfill(start=None, end=None, batch_size=1000):
+    applies = JobApply.objects.all()
+    rollups = ApplicationDailyRollup.objects.all()
+    if start:
+        applies = applies.filter(created_at__gte=start)
+        rollups = rollups.filter(day__gte=start)
+    if end:
+        applies = applies.filter(created_at__lte=end)
+        rollups = rollups.filter(day__lte=end)
+
+    with transaction.atomic():
+        rollups.delete()
+        created = ApplicationDailyRollup.objects.bulk_create(
+            [
+                ApplicationDailyRollup(
+                    day=row['created_at'],
+                    category_id=row['jobs__job_category'],
+                    company_id=row['jobs__company'],
+                    status_id=row['jobs_status'],
+                    count=row['number'],
+                )
+                for row in applies.values(
+                    'created_at', 'jobs__job_category', 'jobs__company', 'jobs_status'
+                ).annotate(number=Count('id')).order_by()
+            ],
+            batch_size=batch_size,
+        )
+    return len(created)
+
+
+def rollups_between(start=None, end=None, category=None, company=None, status=None, companies=None):
+    queryset = ApplicationDailyRollup.objects.filter(count__gt=0)
+    if companies is not None:
+        queryset = queryset.filter(company__in=companies)
+    if start:
+        queryset = queryset.filter(day__gte=start)
+    if end:
+        queryset = queryset.filter(day__lte=end)
+    if category:
+        queryset = queryset.filter(category=category)
+    if company:
+        queryset = queryset.filter(company=company)
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+def series(start, end, granularity="day", group_by=None, **filters):
+    fields = ['period'] + ([group_by] if group_by else [])
+    return list(
+        rollups_between(start, end, **filters)
+        .annotate(period=Trunc('day', granularity, output_field=DateField()))
+        .values(*fields)
+        .annotate(number=Sum('count'))
+        .order_by(*fields)
+    )
+
+
+def daily_counts(since, **filters):
+    return (
+        rollups_between(since, **filters)
+        .values(datedate=F('day'))
+        .annotate(number=Sum('count'))
+        .order_by('day')
+    )
+
+
+def default_range(days=30):
+    end = now().date()
+    return end - timedelta(days=days), end
@@ -0,0 +1,144 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from apps.authentification.models import (
+    JobVacancies,
+    SavedSearch,
+    SavedSearchMatch,
+    SavedSearchTerm,
+)
+from apps.enrolls.services import matching
+from apps.enrolls.services.favorites import annotate_vacancies
+from apps.enrolls.services.neighbors import BANDS, salary_band
+from apps.notification.services.outbox import enqueue
+from apps.notification.services.push import publish_to_users
+from apps.resume.services.search import texts
+
+
+def search_terms(saved_search):
+    """
+    Index rows of a saved search as (kind, value) pairs. A salary range is
+    posted under every band it overlaps; each keyword is a predicate of its
+    own, so all of them have to appear in the vacancy.
+    """
+    pairs = set()
+    if saved_search.job_category_id:
+        pairs.add(("category", str(saved_search.job_category_id)))
+    if saved_search.country_id:
+        pairs.add(("country", str(saved_search.country_id)))
+    if saved_search.salary_min is not None or saved_search.salary_max is not None:
+        low = max(salary_band(saved_search.salary_min), 0)
+        high = BANDS - 1 if saved_search.salary_max is None else salary_band(saved_search.salary_max)
+        pairs.update(("salary", str(band)) for band in range(low, high + 1))
+    pairs.update(("keyword", term) for term in matching.terms(saved_search.keywords))
+    return pairs
+
+
+def predicate_count(pairs):
+    return len({kind for kind, _ in pairs if kind != "keyword"}) + sum(1 for kind, _ in pairs if kind == "keyword")
+
+
+def index(saved_search):
+    pairs = search_terms(saved_search)
+    with transaction.atomic():
+        SavedSearchTerm.objects.filter(saved_search=saved_search).delete()
+        SavedSearchTerm.objects.bulk_create(
+            [SavedSearchTerm(saved_search=saved_search, kind=kind, value=value) for kind, value in pairs]
+        )
+        saved_search.predicates = predicate_count(pairs)
+        SavedSearch.objects.filter(id=saved_search.id).update(predicates=saved_search.predicates)
+
+
+def vacancy_terms(vacancy):
+    # The keys a vacancy is looked up under: one per kind, every distinct term
+    terms = matching.terms(
+        " ".join([vacancy.title or "", vacancy.description or "", vacancy.qualifications or "", *texts(vacancy.skills)])
+    )
+    keys = defaultdict(set, keyword=set(terms))
+    if vacancy.job_category_id:
+        keys["category"].add(str(vacancy.job_category_id))
+    if vacancy.company_id:
+        keys["country"].update(str(country_id) for country_id in vacancy.company.countries.values_list("id", flat=True))
+    if salary_band(vacancy.salary) >= 0:
+        keys["salary"].add(str(salary_band(vacancy.salary)))
+    return keys
+
+
+def in_range(saved_search, salary):
+    if saved_search.salary_min is not None and (salary or 0) < saved_search.salary_min:
+        return False
+    return saved_search.salary_max is None or (salary or 0) <= saved_search.salary_max
+
+
+def matching_searches(vacancy):
+    """
+    Active saved searches every predicate of which the vacancy meets. Only
+    index rows under the vacancy's own keys are read and counted per search,
+    so the work follows the number of candidate searches, not of all searches.
+    """
+    lookups = [Q(kind=kind, value__in=values) for kind, values in vacancy_terms(vacancy).items() if values]
+    if not lookups:
+        return []
+    hits = (
+        SavedSearchTerm.objects.filter(reduce(or_, lookups), saved_search__is_active=True)
+        .values_list("saved_search", "saved_search__predicates")
+        .annotate(hits=Count("id"))
+        .order_by()
+    )
+    ids = [saved_search_id for saved_search_id, predicates, count in hits if count == predicates]
+    # Salary bands at both ends of a range are only partly inside it
+    return [
+        saved_search
+        for saved_search in SavedSearch.objects.filter(id__in=ids).order_by("id")
+        if in_range(saved_search, vacancy.salary)
+    ]
+
+
+def schedule(vacancy_id):
+    # Matched by the outbox dispatcher once the vacancy commits
+    enqueue("saved_search", {"vacancy": vacancy_id}, dedup_key=f"saved_search:{vacancy_id}")
+
+
+def match_vacancy(payload):
+    """
+    Outbox handler for new vacancies: records a match per saved search and
+    tells the owners. Reposts of a vacancy already alerted on are skipped.
+    """
+    vacancy = JobVacancies.objects.select_related("company").filter(id=payload["vacancy"]).first()
+    if vacancy is None or vacancy.duplicate_of_id:
+        return
+    searches = matching_searches(vacancy)
+    SavedSearchMatch.objects.bulk_create(
+        [SavedSearchMatch(saved_search=saved_search, vacancy=vacancy) for saved_search in searches],
+        ignore_conflicts=True,
+    )
+    publish_to_users(
+        [saved_search.user_id for saved_search in searches],
+        "saved_search.match",
+        {"vacancy": vacancy.id, "title": vacancy.title},
+        dedup_key=f"saved_search.match:{vacancy.id}",
+    )
+
+
+def matched_vacancies(user, saved_search=None):
+    matches = SavedSearchMatch.objects.filter(saved_search__user=user)
+    if saved_search is not None:
+        matches = matches.filter(saved_search=saved_search)
+    return annotate_vacancies(
+        JobVacancies.objects.filter(id__in=matches.values("vacancy"))
+        .select_related("job_category", "job_type", "company")
+        .prefetch_related("company__hrs", "company__countries")
+        .order_by("-id"),
+        user,
+    )
+
+
+def mark_matches_seen(user, vacancy_ids=None):
+    matches = SavedSearchMatch.objects.filter(saved_search__user=user, is_seen=False)
+    if vacancy_ids is not None:
+        matches = matches.filter(vacancy__in=vacancy_ids)
+    return matches.update(is_seen=True)
@@ -0,0 +1,117 @@
+import math
+from collections import defaultdict
+from datetime import datetime, time, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Abs, Exp, Greatest, Least, Ln
+from django.utils import timezone
+
+from apps.authentification.models import Favourites, JobApply, JobVacancies, VacancyTrend
+
+# Scores are ln(sum of weight * e^(rate * (t - EPOCH))). Every score decays by
+# the same factor, so instead of touching all rows as time passes the newest
+# events weigh more; in log space that grows by rate per second and never
+# overflows. Changing EPOCH invalidates every stored score.
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+# Below this current (decayed) value a row is dropped, about one view two weeks old
+PRUNE_BELOW = math.log(0.04)
+# Keeps Exp() of a far lower score from underflowing, e^-50 adds nothing anyway
+SMALLEST_EXPONENT = -50.0
+
+
+def rate():
+    return math.log(2) / settings.TRENDING_HALF_LIFE
+
+
+def log_weight(event, at=None):
+    at = at or timezone.now()
+    return math.log(settings.TRENDING_WEIGHTS[event]) + rate() * (at - EPOCH).total_seconds()
+
+
+def current(score, at=None):
+    # A stored score in today's units: the decayed sum of event weights
+    at = at or timezone.now()
+    return math.exp(score - rate() * (at - EPOCH).total_seconds())
+
+
+def log_add(value):
+    # ln(e^score + e^value) evaluated in the UPDATE, so concurrent events
+    # never read and write back a stale score
+    exponent = Greatest(-Abs(F("score") - value), Value(SMALLEST_EXPONENT))
+    return Greatest(F("score"), Value(value)) + Ln(Value(1.0) + Exp(exponent))
+
+
+def log_subtract(value):
+    # ln(e^score - e^value); a score taken down to nothing ends far below what
+    # prune() keeps instead of failing on the log of zero
+    exponent = Least(Value(value) - F("score"), Value(0.0))
+    return F("score") + Ln(Greatest(Value(1.0) - Exp(exponent), Value(math.exp(SMALLEST_EXPONENT))))
+
+
+def record(vacancy_ids, event, at=None, count=1):
+    # count events of the kind at once, e.g. the new viewers behind a sketch change
+    value = log_weight(event, at) + math.log(count)
+    # Fixed order, so concurrent events lock rows in the same order
+    for vacancy_id in sorted({vacancy_id for vacancy_id in vacancy_ids if vacancy_id}):
+        with transaction.atomic():
+            if VacancyTrend.objects.filter(vacancy_id=vacancy_id).update(score=log_add(value)):
+                continue
+            try:
+                with transaction.atomic():
+                    VacancyTrend.objects.create(vacancy_id=vacancy_id, score=value)
+            except IntegrityError:
+                VacancyTrend.objects.filter(vacancy_id=vacancy_id).update(score=log_add(value))
+
+
+def withdraw(vacancy_ids, event, at):
+    # Takes back an event recorded at the same time, e.g. a removed favorite
+    value = log_weight(event, at)
+    for vacancy_id in sorted({vacancy_id for vacancy_id in vacancy_ids if vacancy_id}):
+        VacancyTrend.objects.filter(vacancy_id=vacancy_id).update(score=log_subtract(value))
+
+
+def prune(at=None):
+    # Rows that decayed to nothing only bloat the index; the next event recreates them
+    at = at or timezone.now()
+    threshold = PRUNE_BELOW + rate() * (at - EPOCH).total_seconds()
+    return VacancyTrend.objects.filter(score__lt=threshold).delete()[0]
+
+
+def day_start(day):
+    return datetime.combine(day, time(12), tzinfo=dt_timezone.utc)
+
+
+def rebuild(batch_size=1000):
+    """
+    Recomputes every score from the applications and favorites. Both are
+    dated by day only, so each counts from noon of its day; views carry no
+    date and only enter through live events.
+    """
+    totals = defaultdict(list)
+    streams = {
+        "application": JobApply.objects.filter(jobs__isnull=False).values_list("jobs", "created_at"),
+        "favorite": Favourites.objects.filter(jobs__isnull=False).values_list("jobs", "created_at"),
+    }
+    for event, rows in streams.items():
+        for vacancy_id, day in rows.iterator(chunk_size=5000):
+            totals[vacancy_id].append(log_weight(event, day_start(day)))
+
+    existing = set(JobVacancies.objects.filter(id__in=list(totals)).values_list("id", flat=True))
+    with transaction.atomic():
+        VacancyTrend.objects.all().delete()
+        VacancyTrend.objects.bulk_create(
+            [
+                VacancyTrend(vacancy_id=vacancy_id, score=float(np.logaddexp.reduce(values)))
+                for vacancy_id, values in totals.items()
+                if vacancy_id in existing
+            ],
+            batch_size=batch_size,
+        )
+    return len(existing)
+
+
+def order_by_trending(queryset):
+    return queryset.order_by(F("trend__score").desc(nulls_last=True), "-id")
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.authentification.models import VacancyViewSketch
+from services import hyperloglog
+
+# Exact per-user rows behind each kind, kept only for VACANCY_EXACT_VIEWERS
+EXACT = {"seen": "is_seen", "looked": "is_look_user"}
+
+
+def sketch_rows(vacancy_id, kind, day):
+    return VacancyViewSketch.objects.filter(vacancy_id=vacancy_id, kind=kind, day=day)
+
+
+def locked_row(vacancy_id, kind, day):
+    row = sketch_rows(vacancy_id, kind, day).select_for_update().first()
+    if row is not None:
+        return row
+    try:
+        with transaction.atomic():
+            return VacancyViewSketch.objects.create(vacancy_id=vacancy_id, kind=kind, day=day)
+    except IntegrityError:
+        return sketch_rows(vacancy_id, kind, day).select_for_update().get()
+
+
+def record_view(vacancy, user, kind):
+    """
+    Adds the user to the vacancy's sketches of today and of all time.
+    Returns how much today's estimate grew: about one for a first view of
+    the day, nothing for a repeat. A busy day's sketch changes on fewer
+    views, but each change then covers as many viewers as it adds.
+    """
+    if kind in settings.VACANCY_EXACT_VIEWERS:
+        getattr(vacancy, EXACT[kind]).add(user)
+
+    days = (timezone.localdate(), None)
+    register, rank = hyperloglog.position(user.id)
+    current = dict(
+        VacancyViewSketch.objects.filter(Q(day=days[0]) | Q(day__isnull=True), vacancy=vacancy, kind=kind)
+        .values_list("day", "sketch")
+    )
+    # Repeat viewers leave every register as it is; no lock and no write then
+    if all(day in current and hyperloglog.decode(current[day])[register] >= rank for day in days):
+        return 0
+
+    added = 0
+    with transaction.atomic():
+        # Today before all time, the same order in every request
+        for day in days:
+            row = locked_row(vacancy.id, kind, day)
+            registers = hyperloglog.decode(row.sketch)
+            if registers[register] >= rank:
+                continue
+            registers[register] = rank
+            estimate = hyperloglog.estimate(registers)
+            VacancyViewSketch.objects.filter(id=row.id).update(sketch=hyperloglog.encode(registers), estimate=estimate)
+            if day is not None:
+                added = max(estimate - row.estimate, 0)
+    return added
+
+
+def total_count(kind):
+    # Subquery for annotate(): the stored estimate of the all-time sketch
+    totals = VacancyViewSketch.objects.filter(vacancy=OuterRef('pk'), kind=kind, day__isnull=True)
+    return Coalesce(Subquery(totals.values('estimate')[:1], output_field=IntegerField()), Value(0))
+
+
+def total(vacancy, kind):
+    return sketch_rows(vacancy.id, kind, None).values_list("estimate", flat=True).first() or 0
+
+
+def unique_viewers(vacancy, kind, date_from, date_to):
+    # Users counted once however many days of the range they came back on
+    rows = VacancyViewSketch.objects.filter(vacancy=vacancy, kind=kind, day__gte=date_from, day__lte=date_to)
+    return hyperloglog.estimate(hyperloglog.merge(rows.values_list("sketch", flat=True)))
+
+
+def daily_viewers(vacancy, date_from, date_to):
+    # One point per day of the range, days without views included
+    days = [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+    points = {day: {"day": day, "seen": 0, "looked": 0} for day in days}
+    rows = VacancyViewSketch.objects.filter(vacancy=vacancy, day__gte=date_from, day__lte=date_to)
+    for day, kind, estimate in rows.values_list("day", "kind", "estimate"):
+        points[day][kind] = estimate
+    return [points[day] for day in days]
+
+
+def viewer_report(vacancy, date_from, date_to):
+    return {
+        "vacancy": vacancy.id,
+        "from": date_from,
+        "to": date_to,
+        "seen": unique_viewers(vacancy, "seen", date_from, date_to),
+        "looked": unique_viewers(vacancy, "looked", date_from, date_to),
+        "total_seen": total(vacancy, "seen"),
+        "total_looked": total(vacancy, "looked"),
+        "days": daily_viewers(vacancy, date_from, date_to),
+    }
+
@@ -0,0 +1,46 @@
+import threading
+import unittest
+
+from django.db import connection, connections
+from django.test import TransactionTestCase
+
+from apps.authentification.models import CustomUser, JobApply, JobVacancies, ResumeUser, StatusApply
+from apps.enrolls.services.applications import AlreadyApplied, submit_application
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "needs concurrent writers")
+class SubmitApplicationConcurrencyTest(TransactionTestCase):
+    def setUp(self):
+        StatusApply.objects.create(id=1, name="pending")
+        self.user = CustomUser.objects.create_user("applicant@example.com", "applicant")
+        self.vacancy = JobVacancies.objects.create(title="Backend developer")
+
+    def double_submit(self, resume):
+        barrier = threading.Barrier(2)
+        outcomes = []
+
+        def submit():
+            try:
+                barrier.wait()
+                submit_application(self.user, self.vacancy, resume)
+                outcomes.append("created")
+            except AlreadyApplied:
+                outcomes.append("duplicate")
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=submit) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sorted(outcomes)
+
+    def test_double_submit_with_resume(self):
+        resume = ResumeUser.objects.create(user=self.user)
+        self.assertEqual(self.double_submit(resume), ["created", "duplicate"])
+        self.assertEqual(JobApply.objects.filter(user=self.user, jobs=self.vacancy).count(), 1)
+
+    def test_double_submit_without_resume(self):
+        self.assertEqual(self.double_submit(None), ["created", "duplicate"])
+        self.assertEqual(JobApply.objects.filter(user=self.user, jobs=self.vacancy).count(), 1)
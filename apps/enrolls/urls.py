@@ -2,11 +2,16 @@ from django.urls import path
 
 from apps.enrolls.views.analytics import (
     AnaliticsApplyJobView,
+    AnalyticsSeriesView,
     ApllyJobsAnalyticsView,
+    CompanyFunnelView,
+    VacancyFunnelView,
+    VacancyViewersView,
 )
 from apps.enrolls.views.applied import (
     AppllyJobView,
     ApplyJobAcceptOrRejectedView,
+    ApplyJobBulkStatusView,
     ApplyJobDetailsView,
     JobVacaniesFilterCategories,
 )
@@ -17,10 +22,20 @@ from apps.enrolls.views.category import (
 from apps.enrolls.views.job_type import (
     JobTypeView
 )
+from apps.enrolls.views.saved_searches import (
+    SavedSearchDetailView,
+    SavedSearchMatchesView,
+    SavedSearchView,
+)
 from apps.enrolls.views.views import (
     FavouriesListView,
+    FavouritesBulkView,
     FavouritesCreateView,
+    FavouritesToggleView,
+    FilterResumesView,
     GetViewerView,
+    HrResumeUserListSerializer,
+    NotificationSeenBulkJobsView,
     NotificationSeenJobsView,
 )
 
@@ -35,15 +50,30 @@ urlpatterns = [
     # job apply
     path("/applied-create", AppllyJobView.as_view()),
     path("/<int:id>/<int:status_id>", ApplyJobAcceptOrRejectedView.as_view()),
+    path("/applied/bulk-status", ApplyJobBulkStatusView.as_view()),
     path("/applied-job/<int:id>", ApplyJobDetailsView.as_view()),
     # filter by status (accepted / rejected)
     path("/applied/filter/", JobVacaniesFilterCategories.as_view()),
+    # hr resume inbox
+    path("/resumes/inbox", HrResumeUserListSerializer.as_view()),
+    path("/resumes/category/<int:id>", FilterResumesView.as_view()),
     # notification
     path("/notification-seen/<int:id>", NotificationSeenJobsView.as_view()),
+    path("/notification-seen", NotificationSeenBulkJobsView.as_view()),
     # analytics
     path("/analytics", AnaliticsApplyJobView.as_view()),
     path("/analytics/<int:id>", ApllyJobsAnalyticsView.as_view()),
+    path("/analytics/series", AnalyticsSeriesView.as_view()),
+    path("/analytics/funnel/<int:id>", VacancyFunnelView.as_view()),
+    path("/analytics/company-funnel/<int:id>", CompanyFunnelView.as_view()),
+    path("/analytics/viewers/<int:id>", VacancyViewersView.as_view()),
     # favorites
     path("/favorites", FavouriesListView.as_view()),
+    path("/favorites/bulk", FavouritesBulkView.as_view()),
     path("/<int:id>/favorite", FavouritesCreateView.as_view()),
+    path("/<int:id>/favorite/toggle", FavouritesToggleView.as_view()),
+    # saved searches
+    path("/saved-searches", SavedSearchView.as_view()),
+    path("/saved-searches/<int:id>", SavedSearchDetailView.as_view()),
+    path("/saved-searches/matches", SavedSearchMatchesView.as_view()),
 ]
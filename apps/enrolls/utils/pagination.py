@@ -3,4 +3,29 @@ from rest_framework import pagination
 class StandardResultsSetPagination(pagination.PageNumberPagination):
     page_size = 10
     page_size_query_param = 'limit'
-    max_page_size = 1000
\ No newline at end of file
+    max_page_size = 1000
+
+
+class CursorResultsSetPagination(pagination.CursorPagination):
+    page_size = 10
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+    ordering = '-id'
+
+
+class HrInboxPagination(CursorResultsSetPagination):
+    # The cursor position is last_applied, the id of the resume's latest
+    # application, which no two resumes share; -id makes the order total anyway
+    ordering = ('-last_applied', '-id')
+
+
+class FavouritesPagination(CursorResultsSetPagination):
+    ordering = '-favorite_id'
+
+
+class ResumeSearchPagination(CursorResultsSetPagination):
+    def get_ordering(self, request, queryset, view):
+        # Ranked by relevance when there is a text query, newest first otherwise
+        if "search_position" in queryset.query.annotations:
+            return ('-search_position',)
+        return ('-id',)
@@ -10,9 +10,9 @@ from apps.authentification.models import (
     StatusApply,
     NotificationJobs,
     JobType,
-    HrCompany,
     Favourites,
-    Countries
+    Countries,
+    SavedSearch,
 )
 from apps.authentification.utils.serializers import (
     UserProfilesSerializer
@@ -20,6 +20,15 @@ from apps.authentification.utils.serializers import (
 from apps.company.utils.serializers import (
     HrCompanyListSerializer
 )
+from apps.company.services import dashboard
+from apps.enrolls.services.applications import AlreadyApplied, submit_application
+from apps.enrolls.services import duplicates, matching, neighbors, recommendations, saved_searches, viewers
+from apps.enrolls.services.favorites import add_favorites
+from apps.enrolls.services.rollups import (
+    DIMENSIONS,
+    GRANULARITIES,
+    default_range,
+)
 from apps.resume.utils.serializers import (
     ResumesUserListSerializer
 )
@@ -134,6 +143,7 @@ class JobVacanciesListSerializer(serializers.ModelSerializer):
             'company',
             'experience',
             'work_hours',
+            "duplicate_of",
             "created_at",
             "updated_at",
         ]
@@ -153,15 +163,21 @@ class JobVacanciesListSerializer(serializers.ModelSerializer):
         return representation
 
     def get_applied_count(self, obj):
+        if hasattr(obj, 'applied_count'):
+            return obj.applied_count
         return obj.jobs.count()
 
     def get_favorite_count(self, obj):
+        if hasattr(obj, 'favorite_count'):
+            return obj.favorite_count
         filtering_data = Favourites.objects.select_related('jobs').filter(
             jobs=obj.id
         ).count()
         return filtering_data
 
     def get_is_status(self, obj):
+        if hasattr(obj, 'is_status'):
+            return obj.is_status or False
         user = self.context.get('user')
         user_applied = JobApply.objects.filter(
             user=user
@@ -172,12 +188,18 @@ class JobVacanciesListSerializer(serializers.ModelSerializer):
         return False
 
     def get_viewer_count(self, obj):
-        return obj.is_seen.count()
+        if hasattr(obj, 'viewer_count'):
+            return obj.viewer_count
+        return viewers.total(obj, "seen")
 
     def get_looked_count(self, obj):
-        return obj.is_look_user.count()
+        if hasattr(obj, 'looked_count'):
+            return obj.looked_count
+        return viewers.total(obj, "looked")
 
     def get_is_favorite(self, obj):
+        if hasattr(obj, 'is_favorite'):
+            return obj.is_favorite
         user = self.context.get('user')
         user_favorities = Favourites.objects.filter(
             user=user
@@ -187,6 +209,8 @@ class JobVacanciesListSerializer(serializers.ModelSerializer):
         return False
     
     def get_is_applied(self, obj):
+        if hasattr(obj, 'is_applied'):
+            return obj.is_applied
         user = self.context.get('user')
         user_applied = JobApply.objects.select_related('user').filter(
             user=user
@@ -196,6 +220,16 @@ class JobVacanciesListSerializer(serializers.ModelSerializer):
         return False
 
 
+class MatchedVacancySerializer(JobVacanciesListSerializer):
+    match_score = serializers.SerializerMethodField()
+
+    class Meta(JobVacanciesListSerializer.Meta):
+        fields = JobVacanciesListSerializer.Meta.fields + ["match_score"]
+
+    def get_match_score(self, obj):
+        return self.context.get('scores', {}).get(obj.id)
+
+
 class JobVacanciesSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobVacancies
@@ -235,10 +269,23 @@ class JobVacanciesSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {'error': f"We can't to create job using {str(user.groups.all()[0])} role, try again hr role "})
         create = JobVacancies.objects.create(**validated_data)
+        dashboard.invalidate([create.company_id])
+        duplicates.index(create)
+        matching.update_vacancies([create.id])
+        recommendations.schedule([create.id])
+        neighbors.schedule([create.id])
+        saved_searches.schedule(create.id)
         return create
 
     def update(self, instance, validated_data):
-        return super().update(instance, validated_data)
+        previous_company_id = instance.company_id
+        instance = super().update(instance, validated_data)
+        dashboard.invalidate({previous_company_id, instance.company_id})
+        duplicates.index(instance)
+        matching.update_vacancies([instance.id])
+        recommendations.schedule([instance.id])
+        neighbors.schedule([instance.id])
+        return instance
 
 
 class StatusJobSerialzier(serializers.ModelSerializer):
@@ -307,7 +354,9 @@ class NotificationJobsSerialzier(serializers.ModelSerializer):
             'jobs_status',
             'is_seen',
             'user',
-            "created_at"
+            'count',
+            "created_at",
+            "updated_at",
         ]
 
     def to_representation(self, instance):
@@ -349,27 +398,16 @@ class JobApplySerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        user = self.context.get('user')
-        if JobApply.objects.filter(resume=validated_data['resume'], user=user, jobs=validated_data['jobs']).exists():
+        try:
+            return submit_application(
+                self.context.get('user'),
+                validated_data['jobs'],
+                validated_data['resume'],
+                validated_data.get('jobs_status'),
+            )
+        except AlreadyApplied:
             raise serializers.ValidationError({'error': "You have already applied for this job."})
 
-        create = JobApply.objects.create(**validated_data)
-        create.user = self.context.get('user')
-        create.save()
-        add_user_company = HrCompany.objects.filter(
-            id=create.jobs.company.id
-        ).first()
-
-        add_user_company.users.add(self.context.get('user').id)
-        add_user_company.save()
-        create_notification = NotificationJobs.objects.create()
-        create_notification.job_apply = create
-        create_notification.jobs_status = create.jobs_status
-        create_notification.user = create.user
-        create_notification.save()
-
-        return create
-
 
 class NotificationJobsSerializer(serializers.ModelSerializer):
     jobs_status = StatusJobSerialzier(read_only=True)
@@ -383,7 +421,9 @@ class NotificationJobsSerializer(serializers.ModelSerializer):
             'jobs_status',
             'is_seen',
             'user',
-            "created_at"
+            'count',
+            "created_at",
+            "updated_at",
         ]
 
 
@@ -426,8 +466,120 @@ class FavouritesCreateSerializer(serializers.ModelSerializer):
         ]
 
     def create(self, validated_data):
-        create = Favourites.objects.create(**validated_data)
-        create.user = self.context.get('user')
-        create.jobs = self.context.get('job')
-        create.save()
-        return create
\ No newline at end of file
+        add_favorites(self.context.get('user'), [self.context.get('job').id])
+        return Favourites.objects.get(user=self.context.get('user'), jobs=self.context.get('job'))
+
+
+class AnalyticsSeriesSerializer(serializers.Serializer):
+    to = serializers.DateField(required=False)
+    granularity = serializers.ChoiceField(choices=GRANULARITIES, default="day")
+    group_by = serializers.ChoiceField(choices=DIMENSIONS, required=False)
+    category = serializers.IntegerField(required=False)
+    company = serializers.IntegerField(required=False)
+    status = serializers.IntegerField(required=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # "from" is a keyword, so it can't be declared on the class
+        fields["from"] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, data):
+        start, end = default_range()
+        data.setdefault("from", start)
+        data.setdefault("to", end)
+        if data["from"] > data["to"]:
+            raise serializers.ValidationError({"error": "from must not be after to"})
+        return data
+
+
+class ViewerRangeSerializer(serializers.Serializer):
+    to = serializers.DateField(required=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, data):
+        start, end = default_range()
+        data.setdefault("from", start)
+        data.setdefault("to", end)
+        if data["from"] > data["to"]:
+            raise serializers.ValidationError({"error": "from must not be after to"})
+        if (data["to"] - data["from"]).days > 366:
+            raise serializers.ValidationError({"error": "range must not exceed a year"})
+        return data
+
+
+class ApplyJobBulkStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=1000)
+    status = serializers.PrimaryKeyRelatedField(queryset=StatusApply.objects.all())
+
+
+class HrInboxSerializer(serializers.Serializer):
+    category = serializers.IntegerField(required=False)
+    status = serializers.IntegerField(required=False)
+    level = serializers.IntegerField(required=False)
+    vacancy = serializers.IntegerField(required=False)
+    to = serializers.DateField(required=False)
+    include_subsidiaries = serializers.BooleanField(required=False, default=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField(required=False)
+        return fields
+
+
+class FavouritesBulkSerializer(serializers.Serializer):
+    add = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    remove = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+
+    def validate(self, data):
+        if not data.get('add') and not data.get('remove'):
+            raise serializers.ValidationError("one of add or remove required")
+        return data
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedSearch
+        fields = [
+            "id",
+            "name",
+            "job_category",
+            "country",
+            "salary_min",
+            "salary_max",
+            "keywords",
+            "is_active",
+            "created_at",
+        ]
+
+    def validate(self, data):
+        merged = {field: getattr(self.instance, field, None) for field in self.Meta.fields}
+        merged.update(data)
+        if merged["salary_min"] is not None and merged["salary_max"] is not None and merged["salary_min"] > merged["salary_max"]:
+            raise serializers.ValidationError({"salary_max": "must not be below salary_min"})
+        # A search is matched through its index rows; one without any would never match
+        if merged["keywords"] and not matching.terms(merged["keywords"]):
+            raise serializers.ValidationError({"keywords": "must contain at least one searchable word"})
+        criteria = ("job_category", "country", "salary_min", "salary_max", "keywords")
+        if not saved_searches.search_terms(SavedSearch(**{field: merged[field] for field in criteria})):
+            raise serializers.ValidationError("one of job_category, country, salary_min, salary_max or keywords required")
+        return data
+
+    def create(self, validated_data):
+        instance = SavedSearch.objects.create(user=self.context['user'], **validated_data)
+        saved_searches.index(instance)
+        return instance
+
+    def update(self, instance, validated_data):
+        instance = super().update(instance, validated_data)
+        saved_searches.index(instance)
+        return instance
+
+
+class SavedSearchSeenSerializer(serializers.Serializer):
+    # Vacancy ids; without them every match of the user is marked seen
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
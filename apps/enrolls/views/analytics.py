@@ -1,40 +1,44 @@
 import calendar
 from datetime import date, timedelta
 
-from django.db.models import Count, F
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import now
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.authentification.models import (
-    JobApply,
+    HrCompany,
     JobCategories,
+    JobVacancies,
 )
+from apps.company.services.subsidiaries import hr_companies, include_subsidiaries
+from apps.enrolls.services.duplicates import collapse_duplicates
+from apps.enrolls.services.funnel import company_funnel, vacancy_funnel
+from apps.enrolls.services.rollups import daily_counts, series
+from apps.enrolls.services.viewers import viewer_report
+from apps.enrolls.utils.serializers import AnalyticsSeriesSerializer, ViewerRangeSerializer
+from services.renderers import UserRenderers
+
+
+def period_filters():
+    last_date = calendar.monthrange(date.today().year, date.today().month)[1]
+    return {
+        "day": now().date(),
+        "week": now().date() - timedelta(days=7),
+        "month": now().date() - timedelta(days=last_date),
+    }
 
 
 class AnaliticsApplyJobView(APIView):
     @swagger_auto_schema(operation_description="Analytics")
     def get(self, request):
-        last_date = calendar.monthrange(date.today().year, date.today().month)[1]
-
-        date_filters = {
-            "day": now().date(),
-            "week": now().date() - timedelta(days=7),
-            "month": now().date() - timedelta(days=last_date),
-        }
-
         result = {}
-        for period, date_filter in date_filters.items():
-            queryset = (
-                JobApply.objects.filter(created_at__gte=date_filter)
-                .values(datedate=F("created_at"))
-                .annotate(number=Count("id"))
-                .order_by("created_at")
-            )
-            result[period] = queryset
+        for period, date_filter in period_filters().items():
+            result[period] = daily_counts(date_filter)
 
         return Response(result)
 
@@ -43,23 +47,122 @@ class ApllyJobsAnalyticsView(APIView):
     @swagger_auto_schema(operation_description="Analytics filter by id")
     def get(self, request, id):
         filter_categories = get_object_or_404(JobCategories, id=id)
-        last_date = calendar.monthrange(date.today().year, date.today().month)[1]
-
-        date_filters = {
-            "day": now().date(),
-            "week": now().date() - timedelta(days=7),
-            "month": now().date() - timedelta(days=last_date),
-        }
 
         result = {}
-        for period, date_filter in date_filters.items():
-            queryset = (
-                JobApply.objects.filter(jobs__job_category=filter_categories)
-                .filter(created_at__gte=date_filter)
-                .values(datedate=F("created_at"))
-                .annotate(number=Count("id"))
-                .order_by("created_at")
-            )
-            result[period] = queryset
+        for period, date_filter in period_filters().items():
+            result[period] = daily_counts(date_filter, category=filter_categories)
 
         return Response(result, status=status.HTTP_200_OK)
+
+
+class AnalyticsSeriesView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        description="Applications per day, week or month from the daily rollups",
+        parameters=[
+            OpenApiParameter(name="from", type=str),
+            OpenApiParameter(name="to", type=str),
+            OpenApiParameter(name="granularity", type=str, enum=["day", "week", "month"]),
+            OpenApiParameter(name="group_by", type=str, enum=["category", "company", "status"]),
+            OpenApiParameter(name="category", type=int),
+            OpenApiParameter(name="company", type=int),
+            OpenApiParameter(name="status", type=int),
+        ],
+    )
+    def get(self, request):
+        serializer = AnalyticsSeriesSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        # HRs only see the rollups of their own companies; admins see every company
+        companies = None
+        if not request.user.groups.filter(name="admin").exists():
+            if not request.user.groups.filter(name="hr").exists():
+                return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+            if params.get("company"):
+                company = HrCompany.objects.filter(id=params["company"]).first()
+                if not can_see_company(request.user, company):
+                    return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+            else:
+                companies = hr_companies(request.user).values('id')
+
+        results = series(
+            params["from"],
+            params["to"],
+            granularity=params["granularity"],
+            group_by=params.get("group_by"),
+            category=params.get("category"),
+            company=params.get("company"),
+            status=params.get("status"),
+            companies=companies,
+        )
+        return Response(
+            {
+                "from": params["from"],
+                "to": params["to"],
+                "granularity": params["granularity"],
+                "results": results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+def can_see_company(user, company):
+    if user.groups.filter(name="admin").exists():
+        return True
+    return company is not None and company.hrs.filter(id=user.id).exists()
+
+
+class VacancyFunnelView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(description="Applied, reviewed, accepted and rejected counts with median time to decision")
+    def get(self, request, id):
+        vacancy = get_object_or_404(JobVacancies, id=id)
+        if not can_see_company(request.user, vacancy.company):
+            return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+        return Response(vacancy_funnel(vacancy), status=status.HTTP_200_OK)
+
+
+class CompanyFunnelView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="include_subsidiaries", type=bool),
+            OpenApiParameter(name="collapse_duplicates", type=bool),
+        ],
+        description="Company funnel with a breakdown per vacancy",
+    )
+    def get(self, request, id):
+        company = get_object_or_404(HrCompany, id=id)
+        if not can_see_company(request.user, company):
+            return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+        funnel = company_funnel(company, include_subsidiaries(request), collapse_duplicates(request))
+        return Response(funnel, status=status.HTTP_200_OK)
+
+
+class VacancyViewersView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="from", type=str),
+            OpenApiParameter(name="to", type=str),
+        ],
+        description="Approximate unique viewers of a vacancy over a range, with a point per day",
+    )
+    def get(self, request, id):
+        vacancy = get_object_or_404(JobVacancies, id=id)
+        if not can_see_company(request.user, vacancy.company):
+            return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = ViewerRangeSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        return Response(viewer_report(vacancy, params["from"], params["to"]), status=status.HTTP_200_OK)
@@ -9,13 +9,16 @@ from rest_framework.views import APIView
 
 from apps.authentification.models import (
     JobApply,
-    NotificationJobs,
     StatusApply, JobCategories,
 )
+from services.idempotency import idempotent
 from services.pagination_method import PaginationFunc
 from services.renderers import UserRenderers
+from apps.enrolls.services.applications import change_status, change_status_bulk, withdraw_application
+from apps.enrolls.services.funnel import mark_reviewed
 from apps.enrolls.utils.pagination import StandardResultsSetPagination
 from apps.enrolls.utils.serializers import (
+    ApplyJobBulkStatusSerializer,
     JobApplyListSerilaizer,
     JobApplySerializer,
 )
@@ -36,6 +39,7 @@ class AppllyJobView(APIView):
             OpenApiParameter(name="resume", type=str),
         ],
     )
+    @idempotent
     def post(self, request):
         expected_fields = {"jobs", "resume"}
         received_fields = set(request.data.keys())
@@ -70,6 +74,7 @@ class ApplyJobAcceptOrRejectedView(APIView):
     render_classes = [UserRenderers]
     perrmisson_class = [IsAuthenticated]
 
+    @idempotent
     def patch(self, request, id, status_id):
         if not request.user.is_authenticated:
             return Response({"error": "Token Invalid"}, status=status.HTTP_404_NOT_FOUND)
@@ -80,12 +85,7 @@ class ApplyJobAcceptOrRejectedView(APIView):
 
         queryset = get_object_or_404(JobApply, id=id)
         get_status_id = StatusApply.objects.filter(Q(id=status_id)).first()
-        queryset.jobs_status = get_status_id
-        queryset.save()
-
-        create = NotificationJobs.objects.create(
-            job_apply=queryset, jobs_status=get_status_id, user=queryset.user
-        )
+        change_status(queryset, get_status_id, request.user)
 
         serializer = JobApplyListSerilaizer(queryset, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -95,24 +95,53 @@ class ApplyJobAcceptOrRejectedView(APIView):
         return "user" in user_groups or "admin" in user_groups
 
 
+class ApplyJobBulkStatusView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        request=ApplyJobBulkStatusSerializer,
+        description="Accept or reject many applications at once",
+    )
+    @idempotent
+    def post(self, request):
+        user_groups = request.user.groups.values_list('name', flat=True)
+        if "user" in user_groups or "admin" in user_groups:
+            return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = ApplyJobBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = change_status_bulk(
+            request.user,
+            serializer.validated_data['ids'],
+            serializer.validated_data['status'],
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+
 class ApplyJobDetailsView(APIView):
     @extend_schema(
         request=None, responses=JobApplyListSerilaizer, description="Apply job details"
     )
     def get(self, request, id):
         queryset = get_object_or_404(JobApply, id=id)
+        company = queryset.jobs.company if queryset.jobs_id else None
+        if company and request.user.is_authenticated and company.hrs.filter(id=request.user.id).exists():
+            mark_reviewed(queryset)
         serializer = JobApplyListSerilaizer(queryset)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @idempotent
     def delete(self, request, id):
         if not request.user.is_authenticated:
             return Response({"error": "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        user_group = str(request.user.group.values_list('name', flat=True).first())
+        user_group = str(request.user.groups.values_list('name', flat=True).first())
 
         if user_group == "user":
-            queryset = get_object_or_404(JobApply, id=id)
-            queryset.delete()
+            queryset = get_object_or_404(JobApply, id=id, user=request.user)
+            withdraw_application(queryset)
             return Response({"message": "deleted successfully"}, status=status.HTTP_200_OK)
         else:
             return Response({'error': "You can't delete with this role"})
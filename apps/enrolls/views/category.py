@@ -13,6 +13,7 @@ from apps.enrolls.utils.serializers import (
     JobCategoriesListSerializer,
     JobCategoriesListsSerializer,
 )
+from services.idempotency import idempotent
 
 
 class JobCategoriesView(APIView):
@@ -37,6 +38,7 @@ class JobCategoriesView(APIView):
         ],
         description="Create Tag",
     )
+    @idempotent
     def post(self, request):
         expected_fields = {"tag"}
         received_fields = set(request.data.keys())
@@ -78,6 +80,7 @@ class JobCategoriesDetailsView(APIView):
         ],
         description="Create Tag",
     )
+    @idempotent
     def put(self, request, id):
         expected_fields = {"tag"}
         received_fields = set(request.data.keys())
@@ -102,6 +105,7 @@ class JobCategoriesDetailsView(APIView):
             return Response(serializers.data, status=status.HTTP_200_OK)
         return Response(serializers.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @idempotent
     def delete(self, request, id):
         queryset = get_object_or_404(JobCategories, id=id)
         queryset.delete()
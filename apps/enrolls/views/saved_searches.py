@@ -0,0 +1,85 @@
+from django.shortcuts import get_object_or_404
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.authentification.models import SavedSearch
+from apps.enrolls.services.saved_searches import mark_matches_seen, matched_vacancies
+from apps.enrolls.utils.pagination import StandardResultsSetPagination
+from apps.enrolls.utils.serializers import (
+    JobVacanciesListSerializer,
+    SavedSearchSeenSerializer,
+    SavedSearchSerializer,
+)
+from services.pagination_method import Pagination
+from services.renderers import UserRenderers
+
+
+class SavedSearchView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(responses={200: SavedSearchSerializer(many=True)}, description="The user's saved searches")
+    def get(self, request):
+        queryset = SavedSearch.objects.filter(user=request.user).order_by('-id')
+        return Response(SavedSearchSerializer(queryset, many=True).data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        request=SavedSearchSerializer,
+        description="Save a search; new vacancies meeting all of its filters are notified",
+    )
+    def post(self, request):
+        serializer = SavedSearchSerializer(data=request.data, context={'user': request.user})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class SavedSearchDetailView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(request=SavedSearchSerializer)
+    def put(self, request, id):
+        instance = get_object_or_404(SavedSearch, id=id, user=request.user)
+        serializer = SavedSearchSerializer(instance, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def delete(self, request, id):
+        instance = get_object_or_404(SavedSearch, id=id, user=request.user)
+        instance.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SavedSearchMatchesView(APIView, Pagination):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="saved_search", type=int),
+        ],
+        description="Vacancies matched by the user's saved searches, newest first",
+    )
+    def get(self, request):
+        saved_search = request.query_params.get("saved_search")
+        if saved_search is not None and not saved_search.isdigit():
+            return Response({"error": "saved_search must be an id"}, status=status.HTTP_400_BAD_REQUEST)
+
+        page = super().paginate_queryset(matched_vacancies(request.user, saved_search and int(saved_search)))
+        serializer = super().get_paginated_response(
+            JobVacanciesListSerializer(page, many=True, context={'user': request.user, 'request': request}).data
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(request=SavedSearchSeenSerializer, description="Mark matches seen, all of them without ids")
+    def post(self, request):
+        serializer = SavedSearchSeenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = mark_matches_seen(request.user, serializer.validated_data.get('ids'))
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
@@ -1,8 +1,7 @@
 import random
 import string
 
-from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_yasg.utils import swagger_auto_schema
@@ -13,24 +12,44 @@ from rest_framework.views import APIView
 
 from apps.authentification.models import (
     Countries,
-    Favourites,
     JobApply,
     JobCategories,
     JobVacancies,
     NotificationJobs,
 )
 from apps.authentification.models import ResumeUser
+from services.idempotency import idempotent
 from services.pagination_method import Pagination
 from services.renderers import UserRenderers
-from apps.enrolls.utils.pagination import StandardResultsSetPagination
+from apps.enrolls.services.favorites import (
+    add_favorites,
+    favorite_vacancies,
+    remove_favorites,
+    toggle_favorite,
+)
+from apps.enrolls.services import trending, viewers
+from apps.enrolls.services.inbox import hr_inbox
+from apps.enrolls.utils.pagination import (
+    FavouritesPagination,
+    HrInboxPagination,
+    StandardResultsSetPagination,
+)
 from apps.enrolls.utils.serializers import (
     CountriesSerializer,
+    FavouritesBulkSerializer,
     FavouritesCreateSerializer,
     FavouritesListSerializer,
+    HrInboxSerializer,
     JobApplyListSerilaizer,
     JobVacanciesListSerializer,
     NotificationJobsSerialzier,
 )
+from apps.notification.serializers.notification_serializers import NotificationSeenBulkSerializer
+from apps.notification.services.unread import (
+    mark_job_notifications,
+    mark_job_notifications_seen,
+    unread_counts,
+)
 from apps.resume.utils.serializers import ResumesUserListSerializer
 
 
@@ -59,11 +78,15 @@ class GetViewerView(APIView):
         responses={201: JobVacanciesListSerializer(many=True)},
         operation_description="Viewers enjoyed in jobs",
     )
+    @idempotent
     def put(self, request, id):
         if request.user.is_authenticated:
             queryset = get_object_or_404(JobVacancies, id=id)
-            queryset.is_seen.add(request.user)
-            queryset.save()
+            # Follows today's sketch: the all-time one hardly changes once a
+            # vacancy has had thousands of viewers
+            added = viewers.record_view(queryset, request.user, "seen")
+            if added:
+                trending.record([queryset.id], "view", count=added)
             serializer = JobVacanciesListSerializer(queryset)
             return Response(serializer.data, status=status.HTTP_200_OK)
         else:
@@ -75,12 +98,30 @@ class GetViewerView(APIView):
 class NotificationSeenJobsView(APIView):
     def get(self, request, id):
         queryset = get_object_or_404(NotificationJobs, id=id)
+        mark_job_notifications(NotificationJobs.objects.filter(id=queryset.id))
         queryset.is_seen = True
-        queryset.save()
         serialziers = NotificationJobsSerialzier(queryset)
         return Response(serialziers.data, status=status.HTTP_200_OK)
 
 
+class NotificationSeenBulkJobsView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @idempotent
+    def post(self, request):
+        serializer = NotificationSeenBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        updated = mark_job_notifications_seen(
+            request.user,
+            ids=serializer.validated_data.get('ids'),
+            vacancy=serializer.validated_data.get('vacancy'),
+            before=serializer.validated_data.get('before'),
+        )
+        return Response({"updated": updated, "unread": unread_counts(request.user)}, status=status.HTTP_200_OK)
+
+
 class UserJobView(APIView, Pagination):
     render_classes = [UserRenderers]
     perrmisson_class = [IsAuthenticated]
@@ -116,52 +157,73 @@ class UserJobView(APIView, Pagination):
 
 
 class HrResumeUserListSerializer(APIView, Pagination):
-    pagination_class = StandardResultsSetPagination
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+    pagination_class = HrInboxPagination
     serializer_class = ResumesUserListSerializer
 
-    @swagger_auto_schema(
-        request=ResumesUserListSerializer,
-        responses={201: ResumesUserListSerializer(many=True)},
-        operation_description="Get hr's resumes",
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="category", type=int),
+            OpenApiParameter(name="status", type=int),
+            OpenApiParameter(name="level", type=int),
+            OpenApiParameter(name="vacancy", type=int),
+            OpenApiParameter(name="from", type=str),
+            OpenApiParameter(name="to", type=str),
+            OpenApiParameter(name="include_subsidiaries", type=bool),
+            OpenApiParameter(name="cursor", type=str),
+        ],
+        description="Resumes sent to the HR's companies, newest application first",
     )
     def get(self, request, format=None, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return Response(
-                {"error": "Token Invalid"}, status=status.HTTP_401_UNAUTHORIZED
-            )
-
-        vacancies = JobApply.objects.all()
-        instance = ResumeUser.objects.select_related("user").filter(
-            Q(user__in=[i.user for i in vacancies])
+        if not request.user.groups.filter(name="hr").exists():
+            return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+
+        params = HrInboxSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        instance = hr_inbox(
+            request.user,
+            category=filters.get("category"),
+            level=filters.get("level"),
+            status=filters.get("status"),
+            vacancy=filters.get("vacancy"),
+            date_from=filters.get("from"),
+            date_to=filters.get("to"),
+            include_subsidiaries=filters["include_subsidiaries"],
         )
 
         page = super().paginate_queryset(instance)
-
-        if page is not None:
-            serializer = super().get_paginated_response(
-                self.serializer_class(page, many=True).data
-            )
-        else:
-            serializer = self.serializer_class(instance, many=True)
-
+        serializer = super().get_paginated_response(
+            self.serializer_class(page, many=True, context={"request": request}).data
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class FilterResumesView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
     @swagger_auto_schema(
         request=ResumesUserListSerializer,
         responses={201: ResumesUserListSerializer(many=True)},
         operation_description="Resume filter by job categories",
     )
     def get(self, request, id):
+        if not request.user.groups.filter(name__in=["hr", "admin"]).exists():
+            return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+
         queryset = get_object_or_404(JobCategories, id=id)
-        vacancies = JobApply.objects.all()
 
-        filter_resume = [
-            resume for vacancy in vacancies
-            for resume in ResumeUser.objects.select_related("job_tag", "user")
-            .filter(job_tag=queryset, user=vacancy.user)
-        ]
+        # HRs only see resumes sent to their own companies; admins see every applicant
+        if request.user.groups.filter(name="admin").exists():
+            filter_resume = ResumeUser.objects.select_related("job_tag", "user").filter(
+                Exists(JobApply.objects.filter(resume=OuterRef("pk"))),
+                job_tag=queryset,
+            )
+        else:
+            filter_resume = hr_inbox(request.user, category=queryset)
 
         serializers = ResumesUserListSerializer(filter_resume, many=True)
         return Response(serializers.data, status=status.HTTP_200_OK)
@@ -170,7 +232,7 @@ class FilterResumesView(APIView):
 class FavouriesListView(APIView, Pagination):
     render_classes = [UserRenderers]
     perrmisson_class = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = FavouritesPagination
 
     @swagger_auto_schema(
         request=FavouritesListSerializer,
@@ -179,15 +241,11 @@ class FavouriesListView(APIView, Pagination):
     )
     def get(self, request):
         if request.user.is_authenticated:
-            queryset = Favourites.objects.filter(user=request.user).values_list("jobs", flat=True)
-            filter_data = JobVacancies.objects.filter(id__in=queryset) if queryset else []
+            filter_data = favorite_vacancies(request.user)
 
             page = super().paginate_queryset(filter_data)
-            serializer = (
-                super().get_paginated_response(
-                    JobVacanciesListSerializer(page, many=True, context={'user': request.user}).data)
-                if page is not None
-                else JobVacanciesListSerializer(filter_data, many=True)
+            serializer = super().get_paginated_response(
+                JobVacanciesListSerializer(page, many=True, context={'user': request.user, 'request': request}).data
             )
 
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -195,6 +253,33 @@ class FavouriesListView(APIView, Pagination):
             return Response({"error": "Token Invalid"}, status=status.HTTP_404_NOT_FOUND)
 
 
+class FavouritesToggleView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(request=None, description="Add the vacancy to favorites, or remove it if it is already there")
+    @idempotent
+    def post(self, request, id):
+        queryset = get_object_or_404(JobVacancies, id=id)
+        is_favorite = toggle_favorite(request.user, queryset)
+        return Response({"jobs": queryset.id, "is_favorite": is_favorite}, status=status.HTTP_200_OK)
+
+
+class FavouritesBulkView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(request=FavouritesBulkSerializer, description="Add and remove many favorites at once")
+    @idempotent
+    def post(self, request):
+        serializer = FavouritesBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        removed = remove_favorites(request.user, serializer.validated_data.get('remove', []))
+        added = add_favorites(request.user, serializer.validated_data.get('add', []))
+        return Response({"added": added, "removed": removed}, status=status.HTTP_200_OK)
+
+
 class FavouritesCreateView(APIView):
     render_classes = [UserRenderers]
     perrmisson_class = [IsAuthenticated]
@@ -209,6 +294,7 @@ class FavouritesCreateView(APIView):
         responses={201: FavouritesCreateSerializer(many=True)},
         operation_description="Favorites create",
     )
+    @idempotent
     def post(self, request, id):
         expected_fields = {"jobs"}
         received_fields = set(request.data.keys())
@@ -239,16 +325,14 @@ class FavouritesCreateView(APIView):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @idempotent
     def delete(self, request, id):
         if request.user.is_authenticated:
             queryset = get_object_or_404(JobVacancies, id=id)
-            try:
-                filtering_data = Favourites.objects.get(jobs=queryset, user=request.user)
-                filtering_data.delete()
+            if remove_favorites(request.user, [queryset.id]):
                 return Response({"message": "deleted successfully"}, status=status.HTTP_200_OK)
-            except ObjectDoesNotExist:
-                filtering_data = "No Vacancies for this ids"
-                return Response({'error': filtering_data}, status=status.HTTP_404_NOT_FOUND)
+            filtering_data = "No Vacancies for this ids"
+            return Response({'error': filtering_data}, status=status.HTTP_404_NOT_FOUND)
         else:
             return Response(
                 {"error": "Token Invalid"}, status=status.HTTP_404_NOT_FOUND
@@ -1,7 +1,27 @@
 from django.contrib import admin
 from apps.notification.models import (
-    Notification
+    ArchivedRow,
+    Notification,
+    NotificationDigest,
+    OutboxEvent
 )
 
 
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'channel', 'dedup_key', 'status', 'attempts', 'created_at', 'dispatched_at']
+    list_filter = ['channel', 'status']
+
+
+class NotificationDigestAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'period_start', 'period_end', 'messages', 'applications', 'decisions']
+
+
+class ArchivedRowAdmin(admin.ModelAdmin):
+    list_display = ['id', 'source', 'source_id', 'archived_at']
+    list_filter = ['source']
+
+
+admin.site.register(ArchivedRow, ArchivedRowAdmin)
 admin.site.register(Notification)
+admin.site.register(NotificationDigest, NotificationDigestAdmin)
+admin.site.register(OutboxEvent, OutboxEventAdmin)
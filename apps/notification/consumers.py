@@ -2,60 +2,51 @@ import json
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from apps.notification.services.push import user_group_name
+
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        self.room_name = self.scope["url_route"]["kwargs"]["room_name"]
-        self.room_group_name = f"chat_{self.room_name}"
-        # Join room group
-        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+        user = self.scope["user"]
+        if not user.is_authenticated:
+            await self.close()
+            return
+
+        # Personal group: application status events for this user
+        self.user_group_name = user_group_name(user.id)
+        await self.channel_layer.group_add(self.user_group_name, self.channel_name)
+
+        # Legacy room group, kept for clients connecting to ws/notification/<id>/
+        self.room_name = self.scope["url_route"]["kwargs"].get("room_name")
+        self.room_group_name = f"chat_{self.room_name}" if self.room_name else None
+        if self.room_group_name:
+            await self.channel_layer.group_add(self.room_group_name, self.channel_name)
 
         await self.accept()
 
     async def disconnect(self, close_code):
-        # Leave room group
-        await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
-
-    # Receive message from WebSocket
-    # async def receive(self, text_data=None):
-    #     # text_data_json = json.loads(text_data)
-    #     sender = self.scope["user"]
-    #     print(sender.id)
-    #     queryset = Notification.objects.filter(
-    #         sender=sender.id
-    #     ).filter(
-    #         is_seen=False
-    #     )
-    #     print(queryset)
-    #     chat_type = {"type": "notification_message"}
-    #     message_serializer = {}
-    #     # message_serializer = (dict(NotificationSerializer(instance=_queryset).data))
-    #     # print(message_serializer)
-    #     return_dict = {**chat_type, **message_serializer}
-    #     print(return_dict)
-    #     # Send message to room group
-    #     await self.channel_layer.group_send(
-    #         self.room_group_name, return_dict
-    #     )
+        # Leave groups
+        if getattr(self, "user_group_name", None):
+            await self.channel_layer.group_discard(self.user_group_name, self.channel_name)
+        if getattr(self, "room_group_name", None):
+            await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
     async def receive(self, text_data):
-        text_data_json = json.loads(text_data)
-        message = text_data_json["message"]
+        if not self.room_group_name:
+            return
 
         # Send message to room group
         await self.channel_layer.group_send(
             self.room_group_name, {"type": "chat_message", }
         )
 
-    # Receive message from room group
-    # async def notification_message(self, event):
-    #     dict_NOTIFICATION = event.copy()
-    #     dict_NOTIFICATION.pop("type")
-    #     print(dict_NOTIFICATION)
-    #     # Send message to WebSocket
-    #     self.send(text_data=json.dumps(dict_NOTIFICATION))
-
     async def chat_message(self, event):
         message = event
         # Send message to WebSocket
-        await self.send(text_data=json.dumps({"message": message}))
\ No newline at end of file
+        await self.send(text_data=json.dumps({"message": message}))
+
+    # Receive event published through apps.notification.services.push
+    async def notification_event(self, event):
+        await self.send(
+            text_data=json.dumps({"event": event["event"], "data": event["data"]})
+        )
@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.notification.services.retention import SOURCES, archive
+
+
+class Command(BaseCommand):
+    help = "Move old seen notifications, sms codes and dispatched outbox rows to the archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", choices=sorted(SOURCES), action="append", help="Defaults to every source")
+        parser.add_argument("--days", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches per source")
+        parser.add_argument("--target", choices=["file", "table"], default="file")
+
+    def handle(self, *args, **options):
+        for source in options["source"] or SOURCES:
+            result = archive(
+                source,
+                days=options["days"],
+                batch_size=options["batch_size"],
+                target=options["target"],
+                max_batches=options["max_batches"],
+            )
+            self.stdout.write(json.dumps(result))
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.notification.services.digest import build_digests
+
+
+class Command(BaseCommand):
+    help = "Summarise unseen notifications of the last period into one digest row per user"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=settings.NOTIFICATION_DIGEST_PERIOD_HOURS)
+
+    def handle(self, *args, **options):
+        created = build_digests(hours=options["hours"])
+        self.stdout.write(f"Built {created} digests")
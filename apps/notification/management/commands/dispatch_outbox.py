@@ -0,0 +1,36 @@
+import json
+import time
+
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notification.services.outbox import dispatch_batch, lag_metrics
+
+
+class Command(BaseCommand):
+    help = "Drain the outbox to the channel layer and the email backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when the outbox is empty")
+        parser.add_argument("--once", action="store_true", help="Drain what is pending and exit")
+        parser.add_argument("--stats", action="store_true", help="Print lag metrics and exit")
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            self.stdout.write(json.dumps(lag_metrics()))
+            return
+
+        # Pushes sent through a layer in this process's memory reach no consumer
+        if isinstance(get_channel_layer(), InMemoryChannelLayer):
+            raise CommandError("CHANNEL_LAYERS must be shared with the ASGI process, not InMemoryChannelLayer")
+
+        while True:
+            processed = dispatch_batch(options["batch_size"])
+            if processed:
+                continue
+
+            lag_metrics()
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
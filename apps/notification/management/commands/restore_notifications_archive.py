@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notification.services.retention import SOURCES, restore_file, restore_table
+
+
+class Command(BaseCommand):
+    help = "Load archived rows back into their source table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", choices=sorted(SOURCES))
+        parser.add_argument("--file", help="A .jsonl.gz file written by archive_notifications")
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            if options["file"]:
+                restored = restore_file(options["source"], options["file"], options["batch_size"])
+            else:
+                restored = restore_table(options["source"], options["batch_size"])
+        except OSError as error:
+            raise CommandError(error)
+        self.stdout.write(f"Restored {restored} rows")
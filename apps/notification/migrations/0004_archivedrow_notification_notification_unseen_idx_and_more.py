@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0003_notification_conversation_notification_count_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=64)),
+                ('source_id', models.BigIntegerField()),
+                ('payload', models.JSONField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Row',
+                'verbose_name_plural': 'Archived Rows',
+                'db_table': 'table_archive',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_seen', False)), fields=['sender'], name='notification_unseen_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivedrow',
+            constraint=models.UniqueConstraint(fields=('source', 'source_id'), name='unique_archived_row'),
+        ),
+    ]
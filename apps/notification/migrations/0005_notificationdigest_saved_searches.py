@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0004_archivedrow_notification_notification_unseen_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationdigest',
+            name='saved_searches',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
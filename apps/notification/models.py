@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 NOTIFICATION_TYPES = (
     ('MESSAGE_SENT', 'MESSAGE_SENT'),
@@ -13,6 +14,9 @@ class Notification(models.Model):
     message = models.CharField(max_length=255, null=True, blank=True)
     sent_at = models.DateTimeField(auto_now_add=True)
     is_seen = models.BooleanField(default=False)
+    conversation = models.ForeignKey('chat.Conversation', on_delete=models.CASCADE, null=True, blank=True)
+    count = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
     def __str__(self):
         return self.name
@@ -20,4 +24,74 @@ class Notification(models.Model):
     class Meta:
         db_table = "table_notification"
         verbose_name = "Notification"
-        verbose_name_plural = "Notification"
\ No newline at end of file
+        verbose_name_plural = "Notification"
+        indexes = [
+            models.Index(fields=['sender'], condition=models.Q(is_seen=False), name='notification_unseen_idx'),
+        ]
+
+class NotificationDigest(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notification_digests')
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    messages = models.PositiveIntegerField(default=0)
+    applications = models.PositiveIntegerField(default=0)
+    decisions = models.PositiveIntegerField(default=0)
+    saved_searches = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "table_notification_digest"
+        verbose_name = "Notification Digest"
+        verbose_name_plural = "Notification Digests"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'period_start', 'period_end'], name='unique_notification_digest'),
+        ]
+
+
+OUTBOX_STATUSES = (
+    ('PENDING', 'PENDING'),
+    ('DISPATCHED', 'DISPATCHED'),
+    ('FAILED', 'FAILED'),
+)
+
+
+class OutboxEvent(models.Model):
+    channel = models.CharField(max_length=32)
+    dedup_key = models.CharField(max_length=255, unique=True)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=16, choices=OUTBOX_STATUSES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.dedup_key
+
+    class Meta:
+        db_table = "table_outbox"
+        verbose_name = "Outbox Event"
+        verbose_name_plural = "Outbox Events"
+        indexes = [
+            models.Index(
+                fields=['available_at', 'id'],
+                condition=models.Q(status='PENDING'),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+
+class ArchivedRow(models.Model):
+    source = models.CharField(max_length=64)
+    source_id = models.BigIntegerField()
+    payload = models.JSONField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "table_archive"
+        verbose_name = "Archived Row"
+        verbose_name_plural = "Archived Rows"
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'source_id'], name='unique_archived_row'),
+        ]
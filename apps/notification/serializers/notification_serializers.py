@@ -3,7 +3,7 @@ from rest_framework import serializers
 from apps.authentification.utils.serializers import (
     UserProfilesSerializer
 )
-from apps.notification.models import Notification
+from apps.notification.models import Notification, NotificationDigest
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -15,5 +15,34 @@ class NotificationSerializer(serializers.ModelSerializer):
             'id',
             'sender',
             'message',
-            'sent_at'
+            'conversation',
+            'count',
+            'sent_at',
+            'updated_at',
         ]
+
+
+class NotificationDigestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NotificationDigest
+        fields = [
+            'id',
+            'period_start',
+            'period_end',
+            'messages',
+            'applications',
+            'decisions',
+            'saved_searches',
+            'created_at',
+        ]
+
+
+class NotificationSeenBulkSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    vacancy = serializers.IntegerField(required=False)
+    before = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError("one of ids, vacancy or before required")
+        return data
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.authentification.models import HR_STATUSES, USER_STATUSES, NotificationJobs
+from apps.notification.models import Notification
+from apps.notification.services.unread import (
+    job_notifications_created,
+    message_notifications_created,
+)
+
+
+def window_start():
+    return timezone.now() - timedelta(seconds=settings.NOTIFICATION_COALESCE_WINDOW)
+
+
+def merge_into(queryset, **latest):
+    # Fold a new event into the newest unseen row of the same kind and target,
+    # keeping a counter and the latest payload. Returns None when nothing matches.
+    existing = (
+        queryset.filter(is_seen=False, updated_at__gte=window_start())
+        .select_for_update(of=('self',))
+        .order_by('-id')
+        .first()
+    )
+    if existing is None:
+        return None
+
+    latest['updated_at'] = timezone.now()
+    queryset.model.objects.filter(id=existing.id).update(count=F('count') + 1, **latest)
+    existing.refresh_from_db()
+    return existing
+
+
+def notify_message(sender, conversation, message):
+    with transaction.atomic():
+        notification = merge_into(
+            Notification.objects.filter(name='MESSAGE_SENT', sender=sender, conversation=conversation),
+            message=message,
+        )
+        if notification:
+            return notification, False
+
+        notification = Notification.objects.create(
+            name='MESSAGE_SENT', sender=sender, conversation=conversation, message=message
+        )
+        message_notifications_created([notification])
+        return notification, True
+
+
+def application_group(job_apply, jobs_status):
+    # New applications are grouped per vacancy for the HRs,
+    # decisions per application for the applicant.
+    if jobs_status and jobs_status.id in HR_STATUSES:
+        return NotificationJobs.objects.filter(jobs_status__in=HR_STATUSES, job_apply__jobs=job_apply.jobs_id)
+    if jobs_status and jobs_status.id in USER_STATUSES:
+        return NotificationJobs.objects.filter(jobs_status__in=USER_STATUSES, job_apply=job_apply)
+    return None
+
+
+def notify_application(job_apply, jobs_status=None):
+    jobs_status = jobs_status or job_apply.jobs_status
+    with transaction.atomic():
+        group = application_group(job_apply, jobs_status)
+        notification = group is not None and merge_into(
+            group, job_apply=job_apply, jobs_status=jobs_status, user_id=job_apply.user_id
+        )
+        if notification:
+            return notification, False
+
+        notification = NotificationJobs.objects.create(
+            job_apply=job_apply, jobs_status=jobs_status, user_id=job_apply.user_id
+        )
+        job_notifications_created([notification])
+        return notification, True
+
+
+def notify_applications(job_applies, jobs_status):
+    # Bulk variant of notify_application for decisions: one locking SELECT, one
+    # UPDATE for the merged rows and one INSERT for the rest.
+    if jobs_status is None or jobs_status.id not in USER_STATUSES:
+        return {job_apply.id: notify_application(job_apply, jobs_status)[0] for job_apply in job_applies}
+
+    by_id = {job_apply.id: job_apply for job_apply in job_applies}
+    with transaction.atomic():
+        merged = {}
+        for notification in (
+            NotificationJobs.objects.filter(
+                jobs_status__in=USER_STATUSES,
+                job_apply__in=list(by_id),
+                is_seen=False,
+                updated_at__gte=window_start(),
+            )
+            .select_for_update(of=('self',))
+            .order_by('job_apply', '-id')
+        ):
+            merged.setdefault(notification.job_apply_id, notification)
+
+        now = timezone.now()
+        if merged:
+            NotificationJobs.objects.filter(id__in=[n.id for n in merged.values()]).update(
+                count=F('count') + 1, jobs_status=jobs_status, updated_at=now
+            )
+            for notification in merged.values():
+                notification.count += 1
+                notification.jobs_status = jobs_status
+                notification.updated_at = now
+
+        created = NotificationJobs.objects.bulk_create(
+            [
+                NotificationJobs(job_apply=job_apply, jobs_status=jobs_status, user_id=job_apply.user_id)
+                for job_apply_id, job_apply in by_id.items()
+                if job_apply_id not in merged
+            ]
+        )
+        job_notifications_created(created)
+
+    merged.update({notification.job_apply_id: notification for notification in created})
+    return merged
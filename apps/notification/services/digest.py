@@ -0,0 +1,57 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from apps.authentification.models import HR_STATUSES, USER_STATUSES, NotificationJobs, SavedSearchMatch
+from apps.notification.models import Notification, NotificationDigest
+from apps.notification.services.push import publish_to_users
+
+
+def build_digests(period_end=None, hours=24):
+    # One row per user summarising what is still unseen from the period;
+    # re-running for the same period is a no-op.
+    period_end = period_end or timezone.now().replace(minute=0, second=0, microsecond=0)
+    period_start = period_end - timedelta(hours=hours)
+    totals = defaultdict(lambda: {"messages": 0, "applications": 0, "decisions": 0, "saved_searches": 0})
+
+    messages = (
+        Notification.objects.filter(is_seen=False, updated_at__gte=period_start, updated_at__lt=period_end)
+        .values('sender')
+        .annotate(number=Sum('count'))
+    )
+    for row in messages:
+        totals[row['sender']]["messages"] += row['number']
+
+    jobs = NotificationJobs.objects.filter(
+        is_seen=False, updated_at__gte=period_start, updated_at__lt=period_end
+    )
+    for row in jobs.filter(jobs_status__in=USER_STATUSES).values('user').annotate(number=Sum('count')):
+        totals[row['user']]["decisions"] += row['number']
+    for row in (
+        jobs.filter(jobs_status__in=HR_STATUSES)
+        .values('job_apply__jobs__company__hrs')
+        .annotate(number=Sum('count'))
+    ):
+        totals[row['job_apply__jobs__company__hrs']]["applications"] += row['number']
+
+    matches = SavedSearchMatch.objects.filter(
+        is_seen=False, created_at__gte=period_start, created_at__lt=period_end
+    )
+    for row in matches.values('saved_search__user').annotate(number=Count('id')):
+        totals[row['saved_search__user']]["saved_searches"] += row['number']
+
+    digests = [
+        NotificationDigest(user_id=user_id, period_start=period_start, period_end=period_end, **values)
+        for user_id, values in totals.items()
+        if user_id
+    ]
+    NotificationDigest.objects.bulk_create(digests, ignore_conflicts=True, batch_size=1000)
+    publish_to_users(
+        [digest.user_id for digest in digests],
+        "digest.ready",
+        {"period_start": period_start.isoformat(), "period_end": period_end.isoformat()},
+        dedup_key=f"digest.ready:{period_start.isoformat()}:{period_end.isoformat()}",
+    )
+    return len(digests)
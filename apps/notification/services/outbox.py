@@ -0,0 +1,103 @@
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.notification.models import OutboxEvent
+from services import metrics
+
+
+def enqueue(channel, payload, dedup_key=None, delay=None):
+    enqueue_many(channel, [(payload, dedup_key)], delay=delay)
+
+
+def enqueue_many(channel, events, delay=None):
+    # Written in the caller's transaction: the events exist only if the domain
+    # change commits. A repeated dedup key is silently ignored.
+    available_at = timezone.now() + (delay or timedelta())
+    OutboxEvent.objects.bulk_create(
+        [
+            OutboxEvent(
+                channel=channel,
+                payload=payload,
+                dedup_key=dedup_key or f"{channel}:{uuid.uuid4().hex}",
+                available_at=available_at,
+            )
+            for payload, dedup_key in events
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def get_handler(channel):
+    return import_string(settings.OUTBOX_HANDLERS[channel])
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(2 ** attempts, settings.OUTBOX_MAX_RETRY_DELAY))
+
+
+def next_event():
+    return (
+        OutboxEvent.objects.select_for_update(skip_locked=True)
+        .filter(status='PENDING', available_at__lte=timezone.now())
+        .order_by('available_at', 'id')
+        .first()
+    )
+
+
+def dispatch_one(event):
+    # The handler runs in a savepoint: a database error inside it rolls back
+    # only its own writes, and the outcome below can still be saved.
+    try:
+        with transaction.atomic():
+            get_handler(event.channel)(event.payload)
+    except Exception as exc:
+        event.attempts += 1
+        event.last_error = repr(exc)
+        if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            event.status = 'FAILED'
+        else:
+            event.available_at = timezone.now() + retry_delay(event.attempts)
+    else:
+        event.status = 'DISPATCHED'
+        event.dispatched_at = timezone.now()
+    event.save(update_fields=['status', 'attempts', 'last_error', 'available_at', 'dispatched_at'])
+    return event.status
+
+
+def dispatch_batch(batch_size=None):
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    outcomes = Counter()
+
+    for _ in range(batch_size):
+        # One transaction per event: its row is locked only while its own
+        # handler runs, and the outcome commits with the handler's writes. A
+        # crash before that leaves it pending, so delivery is at-least-once.
+        with transaction.atomic():
+            event = next_event()
+            if event is None:
+                break
+            outcomes[dispatch_one(event)] += 1
+
+    metrics.incr("outbox.dispatched", outcomes['DISPATCHED'])
+    metrics.incr("outbox.failed", outcomes['FAILED'])
+    return sum(outcomes.values())
+
+
+def lag_metrics():
+    pending = OutboxEvent.objects.filter(status='PENDING')
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+    result = {
+        "pending": pending.count(),
+        "failed": OutboxEvent.objects.filter(status='FAILED').count(),
+        "lag_seconds": (timezone.now() - oldest).total_seconds() if oldest else 0,
+    }
+    for name, value in result.items():
+        metrics.gauge(f"outbox.{name}", value)
+    return result
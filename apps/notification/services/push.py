@@ -0,0 +1,86 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from apps.authentification.models import HrCompany
+from apps.notification.services.outbox import enqueue, enqueue_many
+
+
+def user_group_name(user_id):
+    return f"notification_user_{user_id}"
+
+
+def publish_to_users(user_ids, event, data, companies=(), dedup_key=None):
+    # Recorded in the outbox; the dispatcher expands company HRs and fans out.
+    user_ids = sorted({user_id for user_id in user_ids if user_id})
+    companies = sorted({company_id for company_id in companies if company_id})
+    if not user_ids and not companies:
+        return
+
+    enqueue(
+        "websocket",
+        {"users": user_ids, "companies": companies, "event": event, "data": data},
+        dedup_key=dedup_key,
+    )
+
+
+def send_to_users(payload):
+    user_ids = set(payload.get("users", []))
+    if payload.get("companies"):
+        user_ids.update(
+            HrCompany.hrs.through.objects.filter(
+                hrcompany_id__in=payload["companies"]
+            ).values_list("customuser_id", flat=True)
+        )
+
+    message = {"type": "notification.event", "event": payload["event"], "data": payload["data"]}
+    channel_layer = get_channel_layer()
+    for user_id in user_ids:
+        async_to_sync(channel_layer.group_send)(user_group_name(user_id), message)
+
+
+def application_event_data(job_apply, notification=None):
+    status = job_apply.jobs_status
+    return {
+        "id": job_apply.id,
+        "job": job_apply.jobs_id,
+        "job_title": job_apply.jobs.title if job_apply.jobs_id else None,
+        "company": job_apply.jobs.company_id if job_apply.jobs_id else None,
+        "user": job_apply.user_id,
+        "resume": job_apply.resume_id,
+        "status": {"id": status.id, "name": status.name} if status else None,
+        "notification": notification.id if notification else None,
+    }
+
+
+def application_dedup_key(event, notification):
+    # A coalesced notification keeps its id, so the counter tells repeats apart
+    return f"{event}:{notification.id}:{notification.count}" if notification else None
+
+
+def publish_application_event(job_apply, event, notification=None):
+    publish_to_users(
+        [job_apply.user_id],
+        event,
+        application_event_data(job_apply, notification),
+        companies=[job_apply.jobs.company_id] if job_apply.jobs_id else (),
+        dedup_key=application_dedup_key(event, notification),
+    )
+
+
+def publish_application_events(job_applies, event, notifications=None):
+    # One outbox row per application, all written with a single INSERT
+    notifications = notifications or {}
+    events = []
+    for job_apply in job_applies:
+        notification = notifications.get(job_apply.id)
+        events.append((
+            {
+                "users": [job_apply.user_id] if job_apply.user_id else [],
+                "companies": [job_apply.jobs.company_id] if job_apply.jobs_id and job_apply.jobs.company_id else [],
+                "event": event,
+                "data": application_event_data(job_apply, notification),
+            },
+            application_dedup_key(event, notification),
+        ))
+    if events:
+        enqueue_many("websocket", events)
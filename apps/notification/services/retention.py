@@ -0,0 +1,159 @@
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from apps.authentification.models import NotificationJobs, SmsHistory
+from apps.notification.models import ArchivedRow, Notification, OutboxEvent
+
+
+def seen_notifications(cutoff):
+    return Notification.objects.filter(is_seen=True, sent_at__lt=cutoff)
+
+
+def seen_job_notifications(cutoff):
+    return NotificationJobs.objects.filter(is_seen=True).filter(
+        Q(updated_at__lt=cutoff) | Q(updated_at__isnull=True, created_at__lt=cutoff.date())
+    )
+
+
+def old_sms_codes(cutoff):
+    # The latest code of every user is still needed for verification
+    latest = SmsHistory.objects.values('user').annotate(latest=Max('id')).values('latest')
+    return SmsHistory.objects.filter(
+        Q(created_at__lt=cutoff) | Q(created_at__isnull=True)
+    ).exclude(id__in=latest)
+
+
+def dispatched_outbox(cutoff):
+    return OutboxEvent.objects.filter(status='DISPATCHED', dispatched_at__lt=cutoff)
+
+
+SOURCES = {
+    "notification": (Notification, seen_notifications),
+    "job_notification": (NotificationJobs, seen_job_notifications),
+    "sms_history": (SmsHistory, old_sms_codes),
+    "outbox": (OutboxEvent, dispatched_outbox),
+}
+
+
+def archive_path(source, started_at):
+    return os.path.join(
+        settings.ARCHIVE_ROOT, source, f"{source}-{started_at:%Y%m%dT%H%M%S}.jsonl.gz"
+    )
+
+
+def archive(source, days=None, batch_size=None, target="file", max_batches=None):
+    model, eligible = SOURCES[source]
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    started_at = timezone.now()
+    cutoff = started_at - timedelta(days=days)
+    path = archive_path(source, started_at)
+    archived = batches = 0
+
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            ids = list(
+                eligible(cutoff).order_by('id')
+                .select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            rows = list(model.objects.filter(id__in=ids).values())
+            if target == "table":
+                ArchivedRow.objects.bulk_create(
+                    [
+                        ArchivedRow(
+                            source=source,
+                            source_id=row['id'],
+                            payload=json.loads(json.dumps(row, cls=DjangoJSONEncoder)),
+                        )
+                        for row in rows
+                    ],
+                    ignore_conflicts=True,
+                )
+            else:
+                # The file is appended before the delete commits; a failed batch
+                # can leave rows in both places, which restore tolerates.
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with gzip.open(path, "at", encoding="utf-8") as archive_file:
+                    for row in rows:
+                        archive_file.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+
+            model.objects.filter(id__in=ids).delete()
+
+        archived += len(ids)
+        batches += 1
+
+    return {
+        "source": source,
+        "archived": archived,
+        "batches": batches,
+        "path": path if archived and target == "file" else None,
+    }
+
+
+def restore_rows(model, rows, batch_size):
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    # bulk_create stamps auto_now fields with the current time; the archived values are put back after
+    stamped = [
+        field.attname for field in fields.values()
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+
+    objects = []
+    for row in rows:
+        values = {}
+        for name, value in row.items():
+            field = fields.get(name)
+            if field is not None:
+                values[name] = field.to_python(value) if value is not None else None
+        objects.append(model(**values))
+    originals = [{name: getattr(obj, name) for name in stamped} for obj in objects]
+
+    with transaction.atomic():
+        model.objects.bulk_create(objects, batch_size=batch_size, ignore_conflicts=True)
+        if stamped and objects:
+            for obj, values in zip(objects, originals):
+                for name, value in values.items():
+                    setattr(obj, name, value)
+            model.objects.bulk_update(objects, [fields[name].name for name in stamped], batch_size=batch_size)
+    return len(objects)
+
+
+def restore_file(source, path, batch_size=None):
+    model, _ = SOURCES[source]
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    restored = 0
+    batch = []
+    with gzip.open(path, "rt", encoding="utf-8") as archive_file:
+        for line in archive_file:
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                restored += restore_rows(model, batch, batch_size)
+                batch = []
+    if batch:
+        restored += restore_rows(model, batch, batch_size)
+    return restored
+
+
+def restore_table(source, batch_size=None):
+    model, _ = SOURCES[source]
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    restored = 0
+    while True:
+        with transaction.atomic():
+            archived = list(ArchivedRow.objects.filter(source=source).order_by('id')[:batch_size])
+            if not archived:
+                return restored
+            restored += restore_rows(model, [row.payload for row in archived], batch_size)
+            ArchivedRow.objects.filter(id__in=[row.id for row in archived]).delete()
@@ -0,0 +1,136 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from apps.authentification.models import HR_STATUSES, USER_STATUSES, HrCompany, NotificationJobs
+from apps.notification.models import Notification
+
+
+def counter_key(kind, user_id):
+    return f"notification:unread:{kind}:{user_id}"
+
+
+def user_role(user):
+    return str(user.groups.values_list('name', flat=True).first())
+
+
+def unread_messages(user):
+    return Notification.objects.filter(sender=user, is_seen=False)
+
+
+def unread_jobs(user, role=None):
+    if (role or user_role(user)) == "user":
+        return NotificationJobs.objects.filter(
+            user=user, is_seen=False, jobs_status__in=USER_STATUSES
+        )
+    return NotificationJobs.objects.filter(
+        job_apply__jobs__company__hrs=user, is_seen=False, jobs_status__in=HR_STATUSES
+    )
+
+
+def unread_counts(user):
+    keys = {kind: counter_key(kind, user.id) for kind in ("messages", "jobs")}
+    cached = cache.get_many(keys.values())
+
+    counts = {}
+    for kind, key in keys.items():
+        value = cached.get(key)
+        if value is None or value < 0:
+            queryset = unread_messages(user) if kind == "messages" else unread_jobs(user)
+            value = queryset.count()
+            cache.set(key, value, settings.NOTIFICATION_UNREAD_CACHE_TTL)
+        counts[kind] = value
+    counts["total"] = counts["messages"] + counts["jobs"]
+    return counts
+
+
+def adjust(kind, deltas):
+    # Applied after commit; a missing key is left alone and recounted on next read.
+    deltas = {user_id: delta for user_id, delta in deltas.items() if user_id and delta}
+    if not deltas:
+        return
+
+    def apply():
+        for user_id, delta in deltas.items():
+            try:
+                cache.incr(counter_key(kind, user_id), delta)
+            except ValueError:
+                pass
+
+    transaction.on_commit(apply)
+
+
+def job_notification_deltas(queryset, sign=1):
+    deltas = Counter()
+    for row in (
+        queryset.filter(jobs_status__in=USER_STATUSES)
+        .values('user')
+        .annotate(number=Count('id'))
+    ):
+        deltas[row['user']] += sign * row['number']
+
+    for row in (
+        queryset.filter(jobs_status__in=HR_STATUSES)
+        .values('job_apply__jobs__company')
+        .annotate(number=Count('id'))
+    ):
+        for hr_id in HrCompany.hrs.through.objects.filter(
+            hrcompany_id=row['job_apply__jobs__company']
+        ).values_list('customuser_id', flat=True):
+            deltas[hr_id] += sign * row['number']
+    return deltas
+
+
+def job_notifications_created(notifications):
+    ids = [notification.id for notification in notifications]
+    adjust("jobs", job_notification_deltas(NotificationJobs.objects.filter(id__in=ids)))
+
+
+def message_notifications_created(notifications):
+    adjust("messages", Counter(notification.sender_id for notification in notifications))
+
+
+def mark_job_notifications(queryset):
+    with transaction.atomic():
+        ids = list(
+            queryset.filter(is_seen=False)
+            .select_for_update(of=('self',))
+            .values_list('id', flat=True)
+        )
+        if not ids:
+            return 0
+
+        marked = NotificationJobs.objects.filter(id__in=ids)
+        adjust("jobs", job_notification_deltas(marked, sign=-1))
+        return marked.update(is_seen=True)
+
+
+def mark_job_notifications_seen(user, ids=None, vacancy=None, before=None):
+    queryset = unread_jobs(user)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    if vacancy is not None:
+        queryset = queryset.filter(job_apply__jobs=vacancy)
+    if before is not None:
+        queryset = queryset.filter(id__lte=before)
+    return mark_job_notifications(queryset)
+
+
+def mark_messages_seen(user, ids=None, before=None):
+    # Skip the UPDATE entirely when the badge already says there is nothing unread
+    if ids is None and before is None and not unread_counts(user)["messages"]:
+        return 0
+
+    queryset = unread_messages(user)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    if before is not None:
+        queryset = queryset.filter(id__lte=before)
+
+    with transaction.atomic():
+        updated = queryset.update(is_seen=True)
+        adjust("messages", {user.id: -updated})
+    return updated
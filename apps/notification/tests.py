@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.authentification.models import CustomUser
+from apps.notification.models import ArchivedRow, Notification
+from apps.notification.services.retention import archive
+
+
+class ArchiveCutoffTest(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user("retention@example.com", "retention")
+
+    def notification(self, days_ago, is_seen=True):
+        notification = Notification.objects.create(name="message", sender=self.user, is_seen=is_seen)
+        # sent_at is auto_now_add, so the age is set after the insert
+        Notification.objects.filter(id=notification.id).update(sent_at=timezone.now() - timedelta(days=days_ago))
+        return notification
+
+    def test_only_seen_notifications_past_the_cutoff_are_archived(self):
+        old_seen = self.notification(31)
+        recent_seen = self.notification(29)
+        old_unseen = self.notification(31, is_seen=False)
+
+        result = archive("notification", days=30, target="table")
+
+        self.assertEqual(result["archived"], 1)
+        self.assertFalse(Notification.objects.filter(id=old_seen.id).exists())
+        self.assertEqual(
+            set(Notification.objects.values_list("id", flat=True)), {recent_seen.id, old_unseen.id}
+        )
+        self.assertEqual(
+            list(ArchivedRow.objects.filter(source="notification").values_list("source_id", flat=True)),
+            [old_seen.id],
+        )
+
+    def test_batches_stop_at_max_batches(self):
+        for _ in range(3):
+            self.notification(31)
+
+        result = archive("notification", days=30, batch_size=1, target="table", max_batches=2)
+
+        self.assertEqual((result["archived"], result["batches"]), (2, 2))
+        self.assertEqual(Notification.objects.count(), 1)
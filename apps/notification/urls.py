@@ -1,9 +1,15 @@
 from django.urls import path
 
 from apps.notification.views.views import (
-    NotificationsViews
+    NotificationDigestListView,
+    NotificationsViews,
+    NotificationSeenView,
+    NotificationUnreadView,
 )
 
 urlpatterns = [
-    path('', NotificationsViews.as_view())
+    path('', NotificationsViews.as_view()),
+    path('unread', NotificationUnreadView.as_view()),
+    path('seen', NotificationSeenView.as_view()),
+    path('digests', NotificationDigestListView.as_view()),
 ]
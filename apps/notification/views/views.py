@@ -1,15 +1,26 @@
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.enrolls.utils.pagination import StandardResultsSetPagination
 from apps.notification.models import (
-    Notification
+    Notification,
+    NotificationDigest,
 )
 from apps.notification.serializers.notification_serializers import (
-    NotificationSerializer
+    NotificationDigestSerializer,
+    NotificationSerializer,
+    NotificationSeenBulkSerializer,
 )
+from apps.notification.services.unread import (
+    mark_messages_seen,
+    unread_counts,
+)
+from services.pagination_method import PaginationFunc
+from services.renderers import UserRenderers
 
 
 class NotificationsViews(APIView):
@@ -38,3 +49,40 @@ class NotificationView(APIView):
             'notification'
         )
         return Response({'msg': 'Send Notification in Websoccet'}, status=status.HTTP_200_OK)
+
+
+class NotificationUnreadView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(unread_counts(request.user), status=status.HTTP_200_OK)
+
+
+class NotificationSeenView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = NotificationSeenBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if 'vacancy' in serializer.validated_data:
+            return Response({"error": "vacancy is not supported for messages"}, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = mark_messages_seen(
+            request.user,
+            ids=serializer.validated_data.get('ids'),
+            before=serializer.validated_data.get('before'),
+        )
+        return Response({"updated": updated, "unread": unread_counts(request.user)}, status=status.HTTP_200_OK)
+
+
+class NotificationDigestListView(APIView, PaginationFunc):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+
+    def get(self, request):
+        queryset = NotificationDigest.objects.filter(user=request.user).order_by('-period_end')
+        serializer = super().page(queryset, NotificationDigestSerializer)
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.resume.services.search import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the search vector and extracted columns of every resume"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        indexed = rebuild(options["batch_size"])
+        self.stdout.write(f"Indexed {indexed} resumes")
@@ -0,0 +1,193 @@
+import re
+from datetime import date
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import transaction
+from django.db.models import BigIntegerField, F, TextField, Value
+from django.db.models.functions import Cast, Least, Round
+
+from apps.authentification.models import ResumeUser
+
+# job_experiences and place_of_study are free-form JSON from the client; these
+# are the key spellings seen for the parts the index needs
+START_KEYS = ("start_date", "start", "from", "date_from", "started_at", "begin")
+END_KEYS = ("end_date", "end", "to", "date_to", "ended_at", "finish")
+POSITION_KEYS = ("position", "title", "role", "job_title")
+YEARS_KEYS = ("years", "experience_years", "duration_years")
+DEGREE_KEYS = ("degree", "level", "education_level")
+CURRENT = ("present", "now", "current", "hozir", "настоящее время")
+DATE = re.compile(r"(\d{4})(?:[-./](\d{1,2}))?")
+
+
+def entries(value):
+    if isinstance(value, dict):
+        return [value] if any(isinstance(item, str) for item in value.values()) else list(value.values())
+    if isinstance(value, list):
+        return value
+    return []
+
+
+def texts(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from texts(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from texts(item)
+
+
+def first(entry, keys):
+    for key in keys:
+        if entry.get(key) not in (None, ""):
+            return entry[key]
+    return None
+
+
+def parse_date(value, today):
+    if value is None:
+        return None
+    if str(value).strip().lower() in CURRENT:
+        return today
+    match = DATE.search(str(value))
+    if not match:
+        return None
+    year, month = int(match.group(1)), int(match.group(2) or 1)
+    return date(year, min(max(month, 1), 12), 1)
+
+
+def experience(job_experiences, today=None):
+    # Total years over merged periods, so overlapping jobs are not counted twice
+    today = today or date.today()
+    periods = []
+    declared = 0.0
+    latest = (None, None)
+    for entry in entries(job_experiences):
+        if not isinstance(entry, dict):
+            continue
+        start = parse_date(first(entry, START_KEYS), today)
+        end_value = first(entry, END_KEYS)
+        end = parse_date(end_value, today) if end_value is not None else (today if start else None)
+        if start and end and end >= start:
+            periods.append((start, end))
+        else:
+            years = first(entry, YEARS_KEYS)
+            try:
+                declared += float(years) if years is not None else 0.0
+            except (TypeError, ValueError):
+                pass
+        position = first(entry, POSITION_KEYS)
+        if position and (latest[0] is None or (start and start >= latest[0])):
+            latest = (start or latest[0], str(position)[:255])
+
+    days = 0
+    current_start = current_end = None
+    for start, end in sorted(periods):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                days += (current_end - current_start).days
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        days += (current_end - current_start).days
+
+    years = round(days / 365.25 + declared, 1)
+    return (years if periods or declared else None), latest[1]
+
+
+def education(resume):
+    degrees = [
+        first(entry, DEGREE_KEYS) for entry in entries(resume.place_of_study) if isinstance(entry, dict)
+    ]
+    degrees = [str(degree) for degree in degrees if degree]
+    if degrees:
+        return degrees[-1][:255].lower()
+    if resume.level_of_education_id and resume.level_of_education.level:
+        return resume.level_of_education.level[:255].lower()
+    return None
+
+
+# Fields document() and the extracted columns are computed from
+DOCUMENT_FIELDS = {
+    "position", "job_tag", "about", "content", "job_experiences", "location", "place_of_study", "level_of_education",
+}
+
+
+def document(resume):
+    # Weighted parts of the tsvector: A position, B summary, C experience, D the rest
+    return {
+        "A": " ".join(filter(None, [resume.position, resume.job_tag.tag if resume.job_tag_id else None])),
+        "B": " ".join(filter(None, [resume.about, resume.content])),
+        "C": " ".join(texts(resume.job_experiences)),
+        "D": " ".join(filter(None, [resume.location, *texts(resume.place_of_study)])),
+    }
+
+
+def vector(parts):
+    config = settings.RESUME_SEARCH_CONFIG
+    combined = None
+    for weight, text in parts.items():
+        part = SearchVector(Value(text, output_field=TextField()), weight=weight, config=config)
+        combined = part if combined is None else combined + part
+    return combined
+
+
+def index_resumes(resume_ids):
+    resumes = ResumeUser.objects.select_related("job_tag", "level_of_education").filter(id__in=resume_ids)
+    with transaction.atomic():
+        for resume in resumes:
+            years, latest_position = experience(resume.job_experiences)
+            ResumeUser.objects.filter(id=resume.id).update(
+                search_vector=vector(document(resume)),
+                experience_years=years,
+                latest_position=latest_position or resume.position,
+                education_level=education(resume),
+            )
+    return len(resume_ids)
+
+
+def rebuild(batch_size=500):
+    indexed = 0
+    last_id = 0
+    while True:
+        ids = list(
+            ResumeUser.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return indexed
+        indexed += index_resumes(ids)
+        last_id = ids[-1]
+
+
+def search(q=None, category=None, level=None, education=None, position=None, location=None,
+           min_experience=None, max_experience=None):
+    queryset = ResumeUser.objects.select_related("user", "job_tag", "level_of_education")
+    if q:
+        query = SearchQuery(q, search_type="websearch", config=settings.RESUME_SEARCH_CONFIG)
+        queryset = queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F("search_vector"), query)
+        ).annotate(
+            # Unique cursor position: the rank in millionths above the id, so
+            # equal or float-rounded ranks can't repeat or skip rows across pages
+            search_position=Cast(Least(Round(F("rank") * 1_000_000), Value(2**31 - 1)), BigIntegerField())
+            * Value(2**32)
+            + F("id"),
+        )
+    if category:
+        queryset = queryset.filter(job_tag=category)
+    if level:
+        queryset = queryset.filter(level_of_education=level)
+    if education:
+        queryset = queryset.filter(education_level=education.lower())
+    if position:
+        queryset = queryset.filter(latest_position__icontains=position)
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+    if min_experience is not None:
+        queryset = queryset.filter(experience_years__gte=min_experience)
+    if max_experience is not None:
+        queryset = queryset.filter(experience_years__lte=max_experience)
+    return queryset
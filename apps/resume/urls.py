@@ -3,10 +3,12 @@ from django.urls import path
 from apps.resume.views.views import (
     ResumeUserDetailsView,
     LevelEducationView,
+    ResumeSearchView,
 
 )
 
 urlpatterns = [
     path('<int:id>', ResumeUserDetailsView.as_view()),
     path('level-education-list', LevelEducationView.as_view()),
+    path('search', ResumeSearchView.as_view()),
 ]
@@ -8,6 +8,7 @@ from rest_framework import serializers
 from apps.authentification.models import (
     ResumeUser,
     LevelEducation, JobCategories, JobApply, )
+from apps.enrolls.services import matching
 
 
 class JobCategoriessListSerializer(serializers.ModelSerializer):
@@ -62,6 +63,8 @@ class ResumesUserListSerializer(serializers.ModelSerializer):
         return representation
 
     def get_job_count(self, obj):
+        if hasattr(obj, 'apply_count'):
+            return obj.apply_count
         filtering_data = JobApply.objects.select_related('resume').filter(
             resume=obj.id
         ).count()
@@ -99,7 +102,46 @@ class ResumeUserCreateSerializer(serializers.ModelSerializer):
         create = ResumeUser.objects.create(**validated_data)
         create.user = self.context.get("user")
         create.save()
+        matching.update_resumes([create.id])
         return create
 
     def update(self, instance, validated_data):
-        return super().update(instance, validated_data)
+        instance = super().update(instance, validated_data)
+        matching.update_resumes([instance.id])
+        return instance
+
+
+class ResumeSearchResultSerializer(ResumesUserListSerializer):
+    rank = serializers.SerializerMethodField()
+
+    class Meta(ResumesUserListSerializer.Meta):
+        fields = ResumesUserListSerializer.Meta.fields + [
+            "experience_years",
+            "latest_position",
+            "education_level",
+            "rank",
+        ]
+
+    def get_rank(self, obj):
+        return getattr(obj, 'rank', None)
+
+
+class MatchedResumeSerializer(ResumesUserListSerializer):
+    match_score = serializers.SerializerMethodField()
+
+    class Meta(ResumesUserListSerializer.Meta):
+        fields = ResumesUserListSerializer.Meta.fields + ["match_score"]
+
+    def get_match_score(self, obj):
+        return self.context.get('scores', {}).get(obj.id)
+
+
+class ResumeSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(required=False, max_length=255)
+    category = serializers.IntegerField(required=False)
+    level = serializers.IntegerField(required=False)
+    education = serializers.CharField(required=False, max_length=255)
+    position = serializers.CharField(required=False, max_length=255)
+    location = serializers.CharField(required=False, max_length=255)
+    min_experience = serializers.FloatField(required=False, min_value=0)
+    max_experience = serializers.FloatField(required=False, min_value=0)
@@ -10,11 +10,17 @@ from apps.authentification.models import (
     LevelEducation,
     ResumeUser,
 )
+from apps.enrolls.services import matching
+from apps.enrolls.utils.pagination import ResumeSearchPagination
+from apps.resume.services.search import search
+from services.pagination_method import Pagination
 from services.renderers import UserRenderers
 from apps.resume.utils.serializers import (
     LevelsEducationSerialzier,
     ResumesUserListSerializer,
     ResumeUserCreateSerializer,
+    ResumeSearchResultSerializer,
+    ResumeSearchSerializer,
 )
 
 
@@ -93,6 +99,7 @@ class ResumeUserDetailsView(APIView):
         if request.user.is_authenticated:
             queryset = get_object_or_404(ResumeUser, id=id)
             if queryset.user == request.user:
+                matching.release("resumes", [queryset.id])
                 queryset.delete()
                 return Response(
                     {"message": "deleted successfully"}, status=status.HTTP_200_OK
@@ -103,3 +110,37 @@ class ResumeUserDetailsView(APIView):
             return Response(
                 {"error": "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED
             )
+
+
+class ResumeSearchView(APIView, Pagination):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+    pagination_class = ResumeSearchPagination
+    serializer_class = ResumeSearchResultSerializer
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="q", type=str),
+            OpenApiParameter(name="category", type=int),
+            OpenApiParameter(name="level", type=int),
+            OpenApiParameter(name="education", type=str),
+            OpenApiParameter(name="position", type=str),
+            OpenApiParameter(name="location", type=str),
+            OpenApiParameter(name="min_experience", type=float),
+            OpenApiParameter(name="max_experience", type=float),
+            OpenApiParameter(name="cursor", type=str),
+        ],
+        description="Full-text resume search with structured filters, best match first",
+    )
+    def get(self, request):
+        if not request.user.groups.filter(name__in=["hr", "admin"]).exists():
+            return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+
+        params = ResumeSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        page = super().paginate_queryset(search(**params.validated_data))
+        serializer = super().get_paginated_response(
+            self.serializer_class(page, many=True, context={"request": request}).data
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -2,6 +2,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
 from django.conf import settings
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -29,6 +30,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     "rest_framework",
     'rest_framework_simplejwt',
@@ -140,6 +142,26 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static_cdn")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Uploads are stored once per content hash, see services/storage.py
+STORAGES = {
+    "default": {"BACKEND": "services.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+# Released blobs are kept this many seconds before collect_media_blobs removes them
+MEDIA_GC_GRACE_PERIOD = 24 * 60 * 60
+MEDIA_GC_BATCH_SIZE = 500
+# Uploads under these prefixes are only served to users allowed to see them
+MEDIA_PRIVATE_PREFIXES = ("chat/",)
+# "x-accel-redirect" (nginx) or "x-sendfile" (Apache, lighttpd) hands the file
+# body to the front proxy; None reads and streams it through the ASGI worker,
+# which is only meant for development
+MEDIA_OFFLOAD = None
+# Internal nginx location that aliases MEDIA_ROOT for X-Accel-Redirect
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+# Names containing a content hash never change, everything else is revalidated
+MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+MEDIA_MAX_AGE = 60 * 60
+
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -184,10 +206,96 @@ SIMPLE_JWT = {
     'AUTH_COOKIE_SECURE': False,
 }
 
-CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+# Shared by the channel layer and the cache: the web workers, the ASGI process
+# and dispatch_outbox have to see the same groups and the same keys
+REDIS_URL = os.environ.get("REDIS_URL", "redis://127.0.0.1:6379")
+
+# dispatch_outbox sends websocket pushes from its own process, so the layer
+# can't be in memory
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "CONFIG": {"hosts": [f"{REDIS_URL}/0"]},
+    }
+}
+
+# Unread counters, funnel and dashboard caches and the outbox metrics are read
+# and invalidated across processes, so the cache is shared too
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"{REDIS_URL}/1",
+    }
+}
+
+NOTIFICATION_UNREAD_CACHE_TTL = 60 * 60
+# HR funnel metrics, dropped from the cache on every status transition
+FUNNEL_CACHE_TTL = 10 * 60
+# Company dashboards; application, vacancy and review writes drop them early,
+# edits made through the admin show up once this expires
+COMPANY_DASHBOARD_CACHE_TTL = 5 * 60
+# Thumbnails rendered for logos, avatars and image attachments, longest side in pixels
+IMAGE_VARIANT_SIZES = (64, 160, 320)
+IMAGE_VARIANT_FORMATS = ("webp", "jpeg")
+IMAGE_VARIANT_WORKERS = 4
+# Text search configuration for resumes; "simple" avoids English-only stemming
+# of Uzbek and Russian text
+RESUME_SEARCH_CONFIG = "simple"
+# Candidate matching: resumes scored per sparse matrix product, and how long the
+# corpus sizes behind the idf weights are cached
+MATCH_BATCH_SIZE = 5000
+MATCH_CORPUS_CACHE_TTL = 10 * 60
+# Vacancy recommendations kept per user in table_recommendation_list; rebuilt
+# nightly by build_recommendations
+RECOMMENDATIONS_SIZE = 50
+# Precomputed similar vacancies per vacancy, and rows scored per block when
+# rebuilding them (a block is rows x active vacancies float32 scores)
+SIMILAR_VACANCIES_SIZE = 10
+SIMILAR_VACANCIES_BLOCK_SIZE = 64
+# An edited vacancy is rescored against its category and the vacancies sharing
+# one of this many of its strongest terms, not the whole corpus
+SIMILAR_VACANCIES_CANDIDATE_TERMS = 8
+# Unique viewers are counted with per-day HyperLogLog sketches; per-user rows
+# in the is_seen / is_look_user tables are only written for the kinds listed.
+# Migration 0032 only deletes the rows of the kinds not listed here
+VACANCY_EXACT_VIEWERS = ()
+# Trending sort: weight of each event and the time after which it counts half
+TRENDING_WEIGHTS = {"application": 5.0, "favorite": 3.0, "view": 1.0}
+TRENDING_HALF_LIFE = 3 * 24 * 60 * 60
+# Estimated Jaccard similarity of title, description and skills above which a
+# vacancy counts as a duplicate of an older one of the same company
+VACANCY_DUPLICATE_THRESHOLD = 0.8
+# Unseen notifications of the same kind and target within this many seconds
+# are merged into one row with a counter
+NOTIFICATION_COALESCE_WINDOW = 15 * 60
+NOTIFICATION_DIGEST_PERIOD_HOURS = 24
+
+# Seen notifications, old sms codes and dispatched outbox rows older than this
+# are moved out by `python manage.py archive_notifications`
+NOTIFICATION_RETENTION_DAYS = 90
+RETENTION_BATCH_SIZE = 1000
+ARCHIVE_ROOT = os.path.join(BASE_DIR, "archive")
+
+# First response per (user, Idempotency-Key, route) is replayed for this long
+IDEMPOTENCY_TTL = 24 * 60 * 60
+
+# Transactional outbox, drained by `python manage.py dispatch_outbox`
+OUTBOX_HANDLERS = {
+    "websocket": "apps.notification.services.push.send_to_users",
+    "email": "apps.authentification.services.email_utils.send_outbox_email",
+    "recommendations": "apps.enrolls.services.recommendations.add_vacancies",
+    "recommendations_build": "apps.enrolls.services.recommendations.build_users",
+    "similar_vacancies": "apps.enrolls.services.neighbors.refresh",
+    "saved_search": "apps.enrolls.services.saved_searches.match_vacancy",
+    "image_variants": "services.images.render_variants",
+}
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 10
+OUTBOX_MAX_RETRY_DELAY = 300
 
 CORS_ORIGIN_ALLOW_ALL = True
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 
 CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:8000",
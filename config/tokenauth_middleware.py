@@ -2,6 +2,7 @@ from channels.db import database_sync_to_async
 from channels.middleware import BaseMiddleware
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ObjectDoesNotExist
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import AccessToken
 
 from apps.authentification.models import CustomUser
@@ -14,7 +15,7 @@ def get_user(token_key):
         user_id = access_token_obj['user_id']
         user = CustomUser.objects.get(id=user_id)
         return user
-    except ObjectDoesNotExist:
+    except (ObjectDoesNotExist, TokenError):
         return AnonymousUser()
 
 
@@ -1,15 +1,14 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path, re_path
 from django.views.generic import TemplateView
-from django.views.static import serve
 from drf_spectacular.views import SpectacularAPIView
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
 from config.views.hr_views import HrListView, HrCompanyAllView
+from config.views.media_views import MediaView
 from config.views.remaining_views import (
     CountryCreateViews,
     CountryGetViews,
@@ -31,6 +30,8 @@ from config.views.vacancy_views import (
     JobVacanciesView,
     JobVacancyCandidatesView,
     JobVacancyResumeView,
+    RecommendedVacanciesView,
+    SimilarVacanciesView,
 )
 
 admin.site.site_url = None
@@ -87,12 +88,16 @@ urlpatterns = [
     path("countries", CountryGetViews.as_view()),
     # get vacancies by filter activated is true
     path("vacancies/", JobVacanciesView.as_view()),
+    # vacancies matching the user's resumes, applications and favorites
+    path("vacancies/recommended", RecommendedVacanciesView.as_view()),
     # get vacancies by hr and admin
     path("vacancy/<int:id>", JobVacanciesDetailsView.as_view()),
     # get vacancies candidates
     path("vacancy/<int:id>/candidates/", JobVacancyCandidatesView.as_view()),
     # get vacancies resume
     path("vacancy/<int:id>/resumes/", JobVacancyResumeView.as_view()),
+    # vacancies similar to this one
+    path("vacancy/<int:id>/similar", SimilarVacanciesView.as_view()),
     # resume GET POST
     path("resumes/", ResumeUserView.as_view()),
     # notifications
@@ -100,13 +105,6 @@ urlpatterns = [
 
 ]
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 urlpatterns += [
-    re_path(
-        r"^media/(?P<path>.*)$",
-        serve,
-        {
-            "document_root": settings.MEDIA_ROOT,
-        },
-    ),
+    re_path(r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"), MediaView.as_view()),
 ]
@@ -0,0 +1,156 @@
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from apps.authentification.models import MediaBlob
+from apps.chat.models import Message
+
+HASHED_NAME = re.compile(r"[0-9a-f]{32,64}")
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# services.images.store names variants "<folder>/variants/<digest>_<size>.<format>"
+VARIANT_NAME = re.compile(r"/variants/[0-9a-f]{32}_(\d+)\.(\w+)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def is_private(name):
+    private = MediaBlob.objects.filter(name=name).values_list("private", flat=True).first()
+    if private is None:
+        # Stored before content addressing; attachments were still private
+        return Message.objects.filter(attachment=name).exists()
+    return private
+
+
+def holding_messages(name):
+    # Exact matches only, each backed by an index: the attachment column, or the
+    # one {"<size>": {"<format>": name}} entry a variant name can sit under
+    variant = VARIANT_NAME.search(name)
+    if variant:
+        size, image_format = variant.groups()
+        return Message.objects.filter(attachment_variants__contains={size: {image_format: name}})
+    return Message.objects.filter(attachment=name)
+
+
+def is_participant(user, name):
+    if not user.is_authenticated:
+        return False
+    return (
+        holding_messages(name)
+        .filter(Q(conversation_id__initiator=user) | Q(conversation_id__receiver=user))
+        .exists()
+    )
+
+
+def etag_for(name, stat):
+    digest = HASHED_NAME.search(os.path.basename(name))
+    if digest:
+        return f'"{digest.group()}"'
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def cache_control(name, private):
+    if private:
+        return "private, max-age=0, must-revalidate"
+    if HASHED_NAME.search(os.path.basename(name)):
+        return f"public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={settings.MEDIA_MAX_AGE}"
+
+
+def byte_range(header, size):
+    # A single "bytes=a-b", "bytes=a-" or "bytes=-n"; anything else is ignored
+    match = RANGE.match(header or "")
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    start, end = match.groups()
+    if start:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    else:
+        start, end = max(size - int(end), 0), size - 1
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+class MediaView(APIView):
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
+
+    def get(self, request, path):
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+        except SuspiciousFileOperation:
+            raise Http404
+        if not os.path.isfile(full_path):
+            raise Http404
+
+        private = is_private(path)
+        if private and not is_participant(request.user, path):
+            return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_403_FORBIDDEN)
+
+        stat = os.stat(full_path)
+        etag = etag_for(path, stat)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": cache_control(path, private),
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+            "Accept-Ranges": "bytes",
+        }
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == "*"):
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+
+        if settings.MEDIA_OFFLOAD == "x-accel-redirect":
+            # nginx serves the body and handles Range requests itself
+            headers["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX.rstrip("/") + "/" + path.lstrip("/")
+            return HttpResponse(content_type=content_type, headers=headers)
+        if settings.MEDIA_OFFLOAD == "x-sendfile":
+            headers["X-Sendfile"] = full_path
+            return HttpResponse(content_type=content_type, headers=headers)
+
+        # If-Range: a changed file is sent whole instead of a mismatched part
+        requested = request.headers.get("Range")
+        if_range = request.headers.get("If-Range")
+        if requested and (not if_range or if_range == etag):
+            span = byte_range(requested, stat.st_size)
+            if span is not None:
+                start, end = span
+                if start >= stat.st_size or start > end:
+                    return HttpResponse(
+                        status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                        headers={"Content-Range": f"bytes */{stat.st_size}"},
+                    )
+                length = end - start + 1
+                response = StreamingHttpResponse(
+                    read_range(full_path, start, length),
+                    status=status.HTTP_206_PARTIAL_CONTENT,
+                    content_type=content_type,
+                    headers=dict(headers, **{"Content-Range": f"bytes {start}-{end}/{stat.st_size}"}),
+                )
+                response["Content-Length"] = str(length)
+                return response
+
+        # Without MEDIA_OFFLOAD the worker reads the file and sends it in chunks;
+        # under ASGI (daphne) there is no sendfile, so production sets MEDIA_OFFLOAD
+        return FileResponse(open(full_path, "rb"), content_type=content_type, headers=headers)
@@ -25,14 +25,18 @@ from services.pagination_method import (
 )
 from services.renderers import UserRenderers
 from apps.authentification.utils.serializers import (
-    UserProfilesSerializer
+    MatchedCandidateSerializer,
 )
+from apps.enrolls.services import duplicates, matching, neighbors, recommendations, trending, viewers
+from apps.enrolls.services.favorites import annotate_vacancies
 from apps.enrolls.utils.pagination import StandardResultsSetPagination
 from apps.enrolls.utils.serializers import (
     JobVacanciesListSerializer,
     JobVacanciesSerializer,
+    MatchedVacancySerializer,
 )
 from apps.resume.utils.serializers import (
+    MatchedResumeSerializer,
     ResumesUserListSerializer,
 )
 
@@ -54,6 +58,7 @@ class JobVacanciesView(APIView, Pagination):
 
     def get(self, request, format=None, *args, **kwargs):
         queryset = JobVacancies.objects.order_by('-id')
+        queryset = self.filter_by_duplicates(queryset, request)
         if request.user.is_authenticated:
             queryset = self.filter_by_user_role(queryset, request)
             queryset = self.filter_by_location(queryset, request)
@@ -66,7 +71,7 @@ class JobVacanciesView(APIView, Pagination):
             queryset = self.filter_by_is_applied(queryset, request)
             queryset = self.filter_by_is_favourite(queryset, request)
             queryset = self.sort_by_count(queryset, request)
-            page = super().paginate_queryset(queryset.order_by('-id'))
+            page = super().paginate_queryset(queryset)
 
             if page is not None:
                 serializer = super().get_paginated_response(
@@ -76,7 +81,7 @@ class JobVacanciesView(APIView, Pagination):
                 serializer = JobVacanciesListSerializer(queryset, many=True, context={'request': request})
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        page = super().paginate_queryset(queryset)
+        page = super().paginate_queryset(self.sort_by_count(queryset, request))
         if page is not None:
             serializer = super().get_paginated_response(
                 JobVacanciesListSerializer(page, many=True, context={'request': request}).data
@@ -198,13 +203,22 @@ class JobVacanciesView(APIView, Pagination):
 
         return queryset
 
+    def filter_by_duplicates(self, queryset, request):
+        # One row per duplicate cluster: its root, the oldest posting
+        if duplicates.collapse_duplicates(request):
+            queryset = queryset.filter(duplicate_of__isnull=True)
+        return queryset
+
     def sort_by_count(self, queryset, request):
         order_by = request.query_params.get("sort", '')
+        if order_by == 'trending':
+            # Decayed applications, views and favorites, read off vacancy_trend_score_idx
+            return trending.order_by_trending(queryset)
         if order_by == 'desc':
-            queryset = queryset.annotate(count=Count('jobs')).order_by('-count')
-        else:
-            queryset = queryset.annotate(count=Count('jobs')).order_by('count')
-        return queryset
+            return queryset.annotate(count=Count('jobs')).order_by('-count', '-id')
+        if order_by == 'asc':
+            return queryset.annotate(count=Count('jobs')).order_by('count', '-id')
+        return queryset.order_by('-id')
 
     @swagger_auto_schema(
         request=JobVacanciesSerializer,
@@ -282,8 +296,7 @@ class JobVacanciesDetailsView(APIView):
         queryset = get_object_or_404(JobVacancies, id=id)
         serializer = JobVacanciesListSerializer(queryset, context={"request": request, 'user': request.user})
 
-        queryset.is_look_user.add(request.user)
-        queryset.save()
+        viewers.record_view(queryset, request.user, "looked")
         if request.user.groups.filter(name__in=["hr", "admin"]).exists():
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response({"error": "You don't have permission to access this resource"}, status=status.HTTP_400_BAD_REQUEST)
@@ -331,6 +344,7 @@ class JobVacanciesDetailsView(APIView):
             return Response({"error": "Token is invalid"}, status=status.HTTP_401_UNAUTHORIZED)
 
         queryset = get_object_or_404(JobVacancies, id=id)
+        matching.release("vacancies", [queryset.id])
         queryset.delete()
 
         return Response({"message": "deleted successfully"}, status=status.HTTP_200_OK)
@@ -340,10 +354,15 @@ class JobVacancyCandidatesView(APIView, Pagination):
     render_classes = [UserRenderers]
     perrmisson_class = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
-    serializer_class = UserProfilesSerializer
+    serializer_class = MatchedCandidateSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["name"]
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="sort", type=str, enum=["match"], description="Best matching candidates first"),
+        ],
+    )
     @swagger_auto_schema(
         request=ResumesUserListSerializer,
         responses={201: ResumesUserListSerializer(many=True)},
@@ -363,44 +382,32 @@ class JobVacancyCandidatesView(APIView, Pagination):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        filter_apply_jobs = (
-            JobApply.objects.select_related("jobs")
-            .filter(Q(jobs=vacancies) & Q(jobs_status=2))
-            .values("resume__user")
-        )
-
-        name = request.query_params.get("name", None)
-        if not bool(name):
-            filter_resume = (
-                ResumeUser.objects.select_related("user")
-                .filter(Q(user__in=filter_apply_jobs))
-                .values("user")
-            )
-
-            instance = CustomUser.objects.filter(id__in=filter_resume)
-            page = super().paginate_queryset(instance)
-            if page is not None:
-                serializer = super().get_paginated_response(
-                    self.serializer_class(page, many=True).data
-                )
-            else:
-                serializer = self.serializer_class(instance, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        applications = JobApply.objects.filter(Q(jobs=vacancies) & Q(jobs_status=2))
+        filter_apply_jobs = applications.values("resume__user")
 
         filter_resume = (
             ResumeUser.objects.select_related("user")
             .filter(Q(user__in=filter_apply_jobs))
             .values("user")
         )
-
         instance = CustomUser.objects.filter(id__in=filter_resume)
-        page = super().paginate_queryset(instance)
-        if page is not None:
-            serializer = super().get_paginated_response(
-                self.serializer_class(page, many=True).data
+
+        if request.query_params.get("sort") == "match":
+            scores = matching.applicant_scores(vacancies, applications)
+            page = super().paginate_queryset(
+                matching.ranked(instance.values_list("id", flat=True), scores)
             )
+            users = instance.in_bulk(page)
+            page = [users[user_id] for user_id in page]
         else:
-            serializer = self.serializer_class(instance, many=True)
+            page = super().paginate_queryset(instance)
+            scores = matching.applicant_scores(
+                vacancies, applications.filter(resume__user__in=[user.id for user in page])
+            )
+
+        serializer = super().get_paginated_response(
+            self.serializer_class(page, many=True, context={"scores": scores}).data
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -408,10 +415,16 @@ class JobVacancyResumeView(APIView, PaginationFunc):
     render_classes = [UserRenderers]
     perrmisson_class = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
-    serializer_class = ResumesUserListSerializer
+    serializer_class = MatchedResumeSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["name"]
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="name", type=str),
+            OpenApiParameter(name="sort", type=str, enum=["match"], description="Best matching resumes first"),
+        ],
+    )
     @swagger_auto_schema(
         request=ResumesUserListSerializer,
         responses={201: ResumesUserListSerializer(many=True)},
@@ -438,6 +451,87 @@ class JobVacancyResumeView(APIView, PaginationFunc):
                 Q(user__in=filter_apply_jobs) & Q(user__username__icontains=name)
             )
 
-        serializer = super().page(instance, self.serializer_class)
+        if request.query_params.get("sort") == "match":
+            scores = matching.resume_scores(vacancies, instance)
+            page = super().paginate_queryset(
+                matching.ranked(instance.values_list("id", flat=True), scores)
+            )
+            resumes = instance.in_bulk(page)
+            page = [resumes[resume_id] for resume_id in page]
+        else:
+            page = super().paginate_queryset(instance)
+            scores = matching.resume_scores(vacancies, instance.filter(id__in=[resume.id for resume in page]))
+
+        serializer = super().get_paginated_response(
+            self.serializer_class(page, many=True, context={"request": request, "scores": scores}).data
+        )
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class RecommendedVacanciesView(APIView, Pagination):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+    serializer_class = MatchedVacancySerializer
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="page", type=int),
+            OpenApiParameter(name="limit", type=int),
+        ],
+        description="Active vacancies matching the user's resumes, applications and favorites, best first",
+    )
+    def get(self, request):
+        matches = recommendations.recommended(request.user)
+        scores = dict(matches)
+
+        page = super().paginate_queryset([vacancy_id for vacancy_id, _ in matches])
+        # Lists are refreshed in the background, skip what was deactivated since
+        vacancies = annotate_vacancies(
+            JobVacancies.objects.filter(id__in=page, is_activate=True)
+            .select_related('job_category', 'job_type', 'company')
+            .prefetch_related('company__hrs__groups', 'company__countries'),
+            request.user,
+        ).in_bulk()
+        page = [vacancies[vacancy_id] for vacancy_id in page if vacancy_id in vacancies]
+
+        serializer = super().get_paginated_response(
+            self.serializer_class(
+                page, many=True, context={'user': request.user, 'request': request, 'scores': scores}
+            ).data
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class SimilarVacanciesView(APIView):
+    render_classes = [UserRenderers]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="limit", type=int),
+        ],
+        description="Active vacancies most similar to this one, from the precomputed neighbor lists",
+    )
+    def get(self, request, id):
+        vacancy = get_object_or_404(JobVacancies, id=id)
+        limit = request.query_params.get("limit")
+        if limit is not None and not limit.isdigit():
+            return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        matches = neighbors.similar(vacancy, int(limit) if limit else None)
+        scores = dict(matches)
+        vacancies = annotate_vacancies(
+            JobVacancies.objects.filter(id__in=scores)
+            .select_related('job_category', 'job_type', 'company')
+            .prefetch_related('company__hrs__groups', 'company__countries'),
+            request.user,
+        ).in_bulk()
+
+        serializer = MatchedVacancySerializer(
+            [vacancies[vacancy_id] for vacancy_id, _ in matches if vacancy_id in vacancies],
+            many=True,
+            context={'user': request.user, 'request': request, 'scores': scores},
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,154 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import UploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.datastructures import MultiValueDict
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.authentification.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+PROCESSING_TIMEOUT = timedelta(minutes=1)
+
+
+def file_digest(upload):
+    digest = hashlib.sha256()
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    upload.seek(0)
+    return {"name": upload.name, "size": upload.size, "sha256": digest.hexdigest()}
+
+
+def canonical(value):
+    # Uploads are reduced to their contents and every value of a repeated
+    # multipart field is kept, so only the same request replays
+    if isinstance(value, UploadedFile):
+        return file_digest(value)
+    if isinstance(value, MultiValueDict):
+        return {key: [canonical(item) for item in items] for key, items in value.lists()}
+    if isinstance(value, dict):
+        return {key: canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [canonical(item) for item in value]
+    return value
+
+
+def fingerprint(request):
+    body = json.dumps(canonical(request.data), sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def cache_key(user_id, route, key):
+    digest = hashlib.sha256(f"{route}\n{key}".encode()).hexdigest()
+    return f"idempotency:{user_id}:{digest}"
+
+
+def replay(record):
+    response = Response(record["response"], status=record["status_code"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def mismatch_response():
+    return Response(
+        {"error": f"{HEADER} was already used with a different request body"},
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    )
+
+
+def claim(user, key, route, request_fingerprint, retry=True):
+    # Returns None when this request owns the key, otherwise the response to send
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                user=user,
+                key=key,
+                route=route,
+                fingerprint=request_fingerprint,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL),
+            )
+        return None
+    except IntegrityError:
+        existing = IdempotencyKey.objects.filter(user=user, key=key, route=route).first()
+
+    # An expired key, or one left unfinished by a crashed worker, is taken over
+    abandoned = (
+        existing is not None
+        and existing.status_code is None
+        and existing.created_at < now - PROCESSING_TIMEOUT
+    )
+    if retry and (existing is None or existing.expires_at <= now or abandoned):
+        if existing is not None:
+            IdempotencyKey.objects.filter(id=existing.id, created_at=existing.created_at).delete()
+        return claim(user, key, route, request_fingerprint, retry=False)
+
+    if existing is None or existing.status_code is None:
+        return Response(
+            {"error": f"A request with this {HEADER} is still being processed"},
+            status=status.HTTP_409_CONFLICT,
+        )
+    if existing.fingerprint != request_fingerprint:
+        return mismatch_response()
+    return replay({"status_code": existing.status_code, "response": existing.response})
+
+
+def idempotent(view_method):
+    # Replays the first response for the same (user, Idempotency-Key, route).
+    # Requests without the header, or from anonymous users, run as before.
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+
+        key = key[:255]
+        route = f"{request.method} {request.path}"[:255]
+        request_fingerprint = fingerprint(request)
+        memo_key = cache_key(request.user.id, route, key)
+
+        cached = cache.get(memo_key)
+        if cached is not None:
+            if cached["fingerprint"] != request_fingerprint:
+                return mismatch_response()
+            return replay(cached)
+
+        early = claim(request.user, key, route, request_fingerprint)
+        if early is not None:
+            return early
+
+        lookup = IdempotencyKey.objects.filter(user=request.user, key=key, route=route)
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            lookup.delete()
+            raise
+
+        # Server errors and non-JSON responses (redirects) are not remembered,
+        # so the client can retry them.
+        if not isinstance(response, Response) or response.status_code >= 500:
+            lookup.delete()
+            return response
+
+        data = json.loads(json.dumps(response.data, cls=DjangoJSONEncoder, default=str))
+        lookup.update(status_code=response.status_code, response=data)
+        cache.set(
+            memo_key,
+            {"fingerprint": request_fingerprint, "status_code": response.status_code, "response": data},
+            settings.IDEMPOTENCY_TTL,
+        )
+        return response
+
+    return wrapper
+
+
+def purge_expired():
+    return IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()[0]
@@ -0,0 +1,142 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from apps.notification.services.outbox import enqueue
+from services.storage import release, variant_names
+
+logger = logging.getLogger("images")
+
+# Pillow releases the GIL while decoding, resizing and encoding, so the
+# variants of one upload are rendered side by side on these threads
+pool = ThreadPoolExecutor(max_workers=settings.IMAGE_VARIANT_WORKERS, thread_name_prefix="image-variants")
+
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+
+def render(content, size, image_format):
+    with Image.open(BytesIO(content)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image_format == "jpeg" or image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB" if image_format == "jpeg" else "RGBA")
+        image.thumbnail((size, size), Image.LANCZOS)
+        output = BytesIO()
+        image.save(output, **SAVE_OPTIONS[image_format])
+        return output.getvalue()
+
+
+def store(data, folder, size, image_format):
+    # Named after the rendered bytes: an unchanged image maps to the same file
+    # and a replaced one never collides with URLs cached by clients
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    return default_storage.save(f"{folder}/variants/{digest}_{size}.{image_format}", ContentFile(data))
+
+
+def is_image(content):
+    try:
+        with Image.open(BytesIO(content)) as image:
+            image.verify()
+        return True
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        return False
+
+
+def generate_variants(field_file):
+    # {"<size>": {"webp": name, "jpeg": name}}, empty for files that aren't images
+    if not field_file:
+        return {}
+    field_file.open("rb")
+    try:
+        content = field_file.read()
+    finally:
+        field_file.close()
+    if not is_image(content):
+        return {}
+
+    # Variants follow the field's upload_to, which also keeps chat thumbnails private
+    upload_to = getattr(field_file.field, "upload_to", "")
+    folder = upload_to.rstrip("/") if isinstance(upload_to, str) and upload_to else "variants"
+    # Only the rendering runs on the pool; storage writes stay on the calling
+    # thread so they share its database connection and transaction
+    jobs = {
+        (size, image_format): pool.submit(render, content, size, image_format)
+        for size in settings.IMAGE_VARIANT_SIZES
+        for image_format in settings.IMAGE_VARIANT_FORMATS
+    }
+    variants = {}
+    for (size, image_format), job in jobs.items():
+        try:
+            data = job.result()
+        except Exception:
+            logger.exception("Could not render %s at %s as %s", field_file.name, size, image_format)
+            continue
+        variants.setdefault(str(size), {})[image_format] = store(data, folder, size, image_format)
+    return variants
+
+
+def refresh_variants(instance, field_name):
+    # Written with update() so the rest of the row and its save() hooks are left
+    # alone, and only while the row still holds the file that was rendered
+    field_file = getattr(instance, field_name)
+    previous = variant_names(getattr(instance, f"{field_name}_variants"))
+    variants = generate_variants(field_file)
+    updated = type(instance).objects.filter(pk=instance.pk, **{field_name: field_file.name}).update(
+        **{f"{field_name}_variants": variants}
+    )
+    if not updated:
+        # Replaced or deleted while rendering; these variants belong to nobody
+        release(*variant_names(variants))
+        return {}
+    setattr(instance, f"{field_name}_variants", variants)
+    # Every stored variant holds its own reference, the new ones included
+    release(*previous)
+    return variants
+
+
+def schedule_variants(instance, field_name):
+    """
+    Drops the variants of the replaced file and leaves the rendering of the
+    new ones to the outbox dispatcher, so it runs after the upload commits and
+    outside the request or consumer that stored it.
+    """
+    previous = variant_names(getattr(instance, f"{field_name}_variants"))
+    if previous:
+        setattr(instance, f"{field_name}_variants", {})
+        type(instance).objects.filter(pk=instance.pk).update(**{f"{field_name}_variants": {}})
+        release(*previous)
+    name = getattr(instance, field_name).name
+    if name:
+        # No dedup key: storage names follow the content, so the same image
+        # uploaded again has the same name and still needs its variants back
+        enqueue(
+            "image_variants",
+            {"model": instance._meta.label, "pk": instance.pk, "field": field_name, "name": name},
+        )
+
+
+def render_variants(payload):
+    # Outbox handler; a file replaced since it was scheduled has its own event
+    instance = apps.get_model(payload["model"]).objects.filter(pk=payload["pk"]).first()
+    if instance is None or getattr(instance, payload["field"]).name != payload["name"]:
+        return
+    refresh_variants(instance, payload["field"])
+
+
+def variant_urls(variants, request=None):
+    urls = {}
+    for size, names in (variants or {}).items():
+        urls[size] = {}
+        for image_format, name in names.items():
+            url = default_storage.url(name)
+            urls[size][image_format] = request.build_absolute_uri(url) if request else url
+    return urls
@@ -0,0 +1,29 @@
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger("metrics")
+
+
+def metric_key(name):
+    return f"metrics:{name}"
+
+
+def gauge(name, value):
+    cache.set(metric_key(name), value, None)
+    logger.info("%s=%s", name, value)
+
+
+def incr(name, value=1):
+    key = metric_key(name)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, value)
+    except ValueError:
+        cache.set(key, value, None)
+    logger.info("%s+=%s", name, value)
+
+
+def read(*names):
+    values = cache.get_many([metric_key(name) for name in names])
+    return {name: values.get(metric_key(name)) for name in names}
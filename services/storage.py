@@ -0,0 +1,164 @@
+import hashlib
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from apps.authentification.models import MediaBlob
+from services import metrics
+
+# Every column that can point at a stored file; "<field>_variants" holds the
+# rendered thumbnails of the same upload
+REFERENCES = (
+    ("authentification.CustomUser", "avatar"),
+    ("authentification.HrCompany", "logo"),
+    ("chat.Message", "attachment"),
+)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every upload once, as blobs/<aa>/<sha256><ext>. Saving content
+    that is already stored returns the existing name and takes another
+    reference; delete() only drops a reference, the file itself is removed
+    by collect() once nothing holds it.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Names are decided by the content in _save, never by a random suffix
+        return name
+
+    def digest(self, content):
+        sha256 = hashlib.sha256()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        if hasattr(content, "seek"):
+            content.seek(0)
+        return sha256.hexdigest()
+
+    def blob_name(self, digest, name):
+        extension = os.path.splitext(name)[1].lower()[:16]
+        return f"blobs/{digest[:2]}/{digest}{extension}"
+
+    def _save(self, name, content):
+        digest = self.digest(content)
+        private = name.startswith(settings.MEDIA_PRIVATE_PREFIXES)
+        with transaction.atomic():
+            blob, created = MediaBlob.objects.select_for_update().get_or_create(
+                sha256=digest,
+                defaults={
+                    "name": self.blob_name(digest, name),
+                    "size": content.size,
+                    "refcount": 1,
+                    "private": private,
+                },
+            )
+            if not created:
+                # The same bytes uploaded somewhere public are public from then on
+                MediaBlob.objects.filter(id=blob.id).update(
+                    refcount=F("refcount") + 1,
+                    released_at=None,
+                    private=F("private") if private else False,
+                )
+                metrics.incr("media.deduplicated")
+            # The file can be missing after a rolled back upload or a manual cleanup
+            if not self.exists(blob.name):
+                super()._save(blob.name, content)
+        return blob.name
+
+    def delete(self, name):
+        released = MediaBlob.objects.filter(name=name).update(
+            refcount=Greatest(F("refcount") - 1, 0), released_at=timezone.now()
+        )
+        if not released:
+            # Files stored before this backend are still owned by a single row
+            super().delete(name)
+
+
+def variant_names(variants):
+    return [name for names in (variants or {}).values() for name in names.values()]
+
+
+def release(*names):
+    for name in names:
+        if name:
+            default_storage.delete(name)
+
+
+def count_references(batch_size):
+    counts = Counter()
+    for label, field_name in REFERENCES:
+        model = apps.get_model(label)
+        rows = (
+            model.objects.exclude(**{f"{field_name}__isnull": True})
+            .exclude(**{field_name: ""})
+            .values_list(field_name, f"{field_name}_variants")
+            .order_by()
+        )
+        for name, variants in rows.iterator(chunk_size=batch_size):
+            counts[name] += 1
+            counts.update(variant_names(variants))
+    return counts
+
+
+def recount(batch_size=None):
+    # Rebuilds refcounts from the referencing columns; catches drift from admin
+    # edits and cascaded deletes that never call storage.delete()
+    batch_size = batch_size or settings.MEDIA_GC_BATCH_SIZE
+    counts = count_references(batch_size)
+    now = timezone.now()
+    changed = 0
+    last_id = 0
+    while True:
+        blobs = list(MediaBlob.objects.filter(id__gt=last_id).order_by("id")[:batch_size])
+        if not blobs:
+            break
+        stale = []
+        for blob in blobs:
+            refcount = counts.get(blob.name, 0)
+            if refcount != blob.refcount:
+                if refcount == 0:
+                    blob.released_at = now
+                blob.refcount = refcount
+                stale.append(blob)
+        MediaBlob.objects.bulk_update(stale, ["refcount", "released_at"])
+        changed += len(stale)
+        last_id = blobs[-1].id
+    return changed
+
+
+def collect(batch_size=None, grace=None, max_batches=None):
+    # Blobs released for longer than the grace period are deleted batch by
+    # batch; a re-upload in the meantime puts the refcount back above zero
+    batch_size = batch_size or settings.MEDIA_GC_BATCH_SIZE
+    grace = settings.MEDIA_GC_GRACE_PERIOD if grace is None else grace
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    storage = FileSystemStorage()
+    collected = batches = 0
+
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            blobs = list(
+                MediaBlob.objects.filter(refcount__lte=0, released_at__lt=cutoff)
+                .order_by("id")
+                .select_for_update(skip_locked=True)[:batch_size]
+            )
+            if not blobs:
+                break
+            for blob in blobs:
+                storage.delete(blob.name)
+            MediaBlob.objects.filter(id__in=[blob.id for blob in blobs]).delete()
+        collected += len(blobs)
+        batches += 1
+
+    metrics.incr("media.collected", collected)
+    return {"collected": collected, "batches": batches}